@@ -0,0 +1,194 @@
+"""OneBot 多连接负载均衡。
+
+FrontMatter:
+    sidebar_position: 10
+    description: onebot.balancer 模块
+"""
+
+import math
+import time
+import asyncio
+from collections import deque
+from collections.abc import Iterator, Awaitable
+from typing import Any, Generic, TypeVar, Callable, Optional
+
+T = TypeVar("T")
+
+LATENCY_SAMPLES = 128
+"""用于计算对冲延迟的最近调用耗时样本数"""
+MIN_HEDGE_SAMPLES = 16
+"""样本数不足时不进行对冲请求"""
+COOLDOWN_INITIAL = 1.0
+"""首次失败后暂停使用该地址的时间（秒）"""
+COOLDOWN_MAX = 60.0
+"""最长暂停使用时间（秒）"""
+
+
+class Endpoint(Generic[T]):
+    """API 调用目标，如 HTTP API 地址或 WebSocket 连接。"""
+
+    def __init__(self, target: T) -> None:
+        self.target = target
+        self.outstanding: int = 0
+        """正在进行的调用数"""
+        self.failures: int = 0
+        """连续失败次数"""
+        self.down_until: float = 0
+        """在此时间之前视为不可用"""
+
+    def healthy(self, now: float) -> bool:
+        return self.down_until <= now
+
+    def succeed(self) -> None:
+        self.failures = 0
+        self.down_until = 0
+
+    def fail(self, now: float) -> None:
+        self.failures += 1
+        cooldown = min(COOLDOWN_MAX, COOLDOWN_INITIAL * 2 ** (self.failures - 1))
+        self.down_until = now + cooldown
+
+
+class EndpointPool(Generic[T]):
+    """同一 Bot 的多个 API 调用目标。
+
+    每次调用选择正在进行调用数最少的可用目标，调用因网络错误失败的目标
+    将在一段时间内不被选择。启用对冲时，若调用在最近调用耗时的 p95 内
+    未返回，则向另一个目标再次发起请求并采用先返回的结果。
+
+    参数:
+        targets: 初始调用目标
+    """
+
+    def __init__(self, targets: tuple[T, ...] = ()) -> None:
+        self.endpoints: list[Endpoint[T]] = [Endpoint(target) for target in targets]
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def __iter__(self) -> Iterator[T]:
+        return (endpoint.target for endpoint in self.endpoints)
+
+    def __contains__(self, target: Any) -> bool:
+        return any(endpoint.target == target for endpoint in self.endpoints)
+
+    def add(self, target: T) -> None:
+        """添加调用目标。"""
+        if target not in self:
+            self.endpoints.append(Endpoint(target))
+
+    def remove(self, target: T) -> int:
+        """移除调用目标，返回剩余目标数。"""
+        self.endpoints = [e for e in self.endpoints if e.target != target]
+        return len(self.endpoints)
+
+    def pick(self, exclude: Optional[Endpoint[T]] = None) -> Optional[Endpoint[T]]:
+        """选择调用目标，全部不可用时选择最早恢复的目标。"""
+        candidates = [e for e in self.endpoints if e is not exclude]
+        if not candidates:
+            return None
+        now = time.monotonic()
+        if healthy := [e for e in candidates if e.healthy(now)]:
+            return min(healthy, key=lambda e: e.outstanding)
+        return min(candidates, key=lambda e: e.down_until)
+
+    def hedge_delay(self) -> Optional[float]:
+        """对冲请求的等待时间，即最近调用耗时的 p95。"""
+        if len(self._latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[math.ceil(len(latencies) * 0.95) - 1]
+
+    async def call(
+        self,
+        func: Callable[[T], Awaitable[Any]],
+        is_failure: Callable[[Exception], bool],
+        hedge: bool = False,
+    ) -> Any:
+        """选择目标并调用 API。
+
+        参数:
+            func: 以调用目标为参数发起请求的函数
+            is_failure: 判断异常是否表示目标不可用
+            hedge: 是否允许对冲请求，仅应用于只读调用
+        """
+        if (endpoint := self.pick()) is None:
+            raise LookupError("No endpoint available")
+        if (
+            not hedge
+            or len(self.endpoints) < 2
+            or (delay := self.hedge_delay()) is None
+        ):
+            return await self._call(endpoint, func, is_failure)
+
+        primary = asyncio.create_task(self._call(endpoint, func, is_failure))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            # 超时未返回或因网络错误提前失败时向另一个目标请求
+            if (not done or self._failed(primary, is_failure)) and (
+                backup := self.pick(exclude=endpoint)
+            ) is not None:
+                tasks.add(
+                    asyncio.create_task(
+                        self._call(backup, func, is_failure, sample=False)
+                    )
+                )
+
+            error: BaseException = LookupError("No endpoint available")
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if (exception := task.exception()) is None:
+                        return task.result()
+                    # 非网络错误同样是有效的响应
+                    elif not isinstance(exception, Exception) or not is_failure(
+                        exception
+                    ):
+                        raise exception
+                    error = exception
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _failed(task: asyncio.Task, is_failure: Callable[[Exception], bool]) -> bool:
+        exception = task.exception()
+        return isinstance(exception, Exception) and is_failure(exception)
+
+    async def _call(
+        self,
+        endpoint: Endpoint[T],
+        func: Callable[[T], Awaitable[Any]],
+        is_failure: Callable[[Exception], bool],
+        sample: bool = True,
+    ) -> Any:
+        """调用目标，`sample` 为真时记录耗时。
+
+        对冲请求只记录首个请求的耗时，首个请求被取消时同样记录已等待的时间，
+        避免对冲后只留下较快的样本使对冲延迟逐渐变短。
+        """
+        endpoint.outstanding += 1
+        start = time.monotonic()
+        try:
+            result = await func(endpoint.target)
+        except asyncio.CancelledError:
+            if sample:
+                self._latencies.append(time.monotonic() - start)
+            raise
+        except Exception as e:
+            if is_failure(e):
+                endpoint.fail(time.monotonic())
+            else:
+                endpoint.succeed()
+            raise
+        finally:
+            endpoint.outstanding -= 1
+        endpoint.succeed()
+        if sample:
+            self._latencies.append(time.monotonic() - start)
+        return result
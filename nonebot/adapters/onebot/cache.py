@@ -0,0 +1,140 @@
+"""OneBot API 响应缓存。
+
+FrontMatter:
+    sidebar_position: 6
+    description: onebot.cache 模块
+"""
+
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+from collections.abc import Hashable, Awaitable
+
+MISSING = object()
+NO_CACHE_PARAMS = frozenset({"_timeout", "no_cache"})
+"""不参与缓存键计算的参数"""
+
+
+def freeze(value: Any) -> Hashable:
+    """将 API 参数转换为可哈希的缓存键。
+
+    异常:
+        TypeError: 参数中包含无法哈希的对象
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    hash(value)
+    return value
+
+
+class ResponseCache:
+    """带过期时间的 LRU API 响应缓存。
+
+    仅缓存成功的调用结果，相同参数的并发调用只会发出一次请求。
+    缓存结果由所有调用方共享，请勿修改返回的数据。
+
+    参数:
+        ttls: 各 API 的缓存时间（秒），未配置的 API 不缓存
+        maxsize: 最大缓存条目数，超出时淘汰最久未使用的条目
+    """
+
+    def __init__(self, ttls: dict[str, float], maxsize: int = 1024) -> None:
+        self.ttls = ttls
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._pending: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_cached(self, api: str) -> bool:
+        """API 是否启用了缓存"""
+        return self.ttls.get(api, 0) > 0
+
+    async def call(
+        self,
+        self_id: str,
+        api: str,
+        params: dict[str, Any],
+        func: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """优先使用缓存调用 API。
+
+        参数 `no_cache` 为真时跳过缓存直接请求，并以结果刷新缓存。
+
+        参数:
+            self_id: 调用 API 的 Bot ID
+            api: API 名称
+            params: API 参数
+            func: 实际发起请求的函数
+        """
+        if (
+            not self.is_cached(api)
+            or (key := self._make_key(self_id, api, params)) is None
+        ):
+            return await func()
+
+        if (
+            not params.get("no_cache")
+            and (result := self._get_entry(key)) is not MISSING
+        ):
+            return result
+
+        # 请求在独立的任务中执行，单个调用方被取消不会影响其他调用方
+        if (task := self._pending.get(key)) is None:
+            task = asyncio.create_task(func())
+            task.add_done_callback(
+                lambda t: self._on_done(key, self.ttls.get(api, 0), t)
+            )
+            self._pending[key] = task
+        return await asyncio.shield(task)
+
+    def delete(self, self_id: str, api: str, params: dict[str, Any]) -> None:
+        """清除指定参数的缓存结果。"""
+        if (key := self._make_key(self_id, api, params)) is not None:
+            self._entries.pop(key, None)
+
+    def invalidate(self, self_id: str) -> None:
+        """清除指定 Bot 的全部缓存结果。"""
+        for key in [key for key in self._entries if key[0] == self_id]:
+            del self._entries[key]
+
+    def _make_key(
+        self, self_id: str, api: str, params: dict[str, Any]
+    ) -> Optional[tuple[str, str, Hashable]]:
+        try:
+            return (
+                self_id,
+                api,
+                freeze({k: v for k, v in params.items() if k not in NO_CACHE_PARAMS}),
+            )
+        except TypeError:
+            return None
+
+    def _get_entry(self, key: Hashable) -> Any:
+        if (entry := self._entries.get(key)) is None:
+            return MISSING
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return result
+
+    def _set_entry(self, key: Hashable, ttl: float, result: Any) -> None:
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _on_done(self, key: Hashable, ttl: float, task: asyncio.Task) -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        if task.cancelled():
+            return
+        # 标记异常已被获取，避免所有调用方均被取消时产生警告
+        if task.exception() is None and ttl > 0:
+            self._set_entry(key, ttl, task.result())
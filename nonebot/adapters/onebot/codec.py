@@ -0,0 +1,138 @@
+"""OneBot 数据编解码器。
+
+提供基于标准库 `json`、`orjson` 与 `msgspec` 的 JSON 编解码实现，
+可选依赖未安装时自动回退至标准库实现。
+
+FrontMatter:
+    sidebar_position: 4
+    description: onebot.codec 模块
+"""
+
+import json
+import dataclasses
+from typing import Any, Union, Literal, Callable
+
+CodecName = Literal["json", "orjson", "msgspec"]
+
+
+class Codec:
+    """JSON 编解码器基类，默认使用标准库 `json` 实现。
+
+    参数:
+        default: 无法直接序列化的对象的转换函数，与 `json.dumps` 的 `default` 参数一致
+    """
+
+    name: str = "json"
+
+    def __init__(self, default: Callable[[Any], Any]) -> None:
+        self.default = default
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """解码 JSON 数据。"""
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        """编码为 JSON 字符串。"""
+        return json.dumps(obj, default=self.default)
+
+
+class ORJSONCodec(Codec):
+    """基于 `orjson` 的编解码器。"""
+
+    name = "orjson"
+
+    def __init__(self, default: Callable[[Any], Any]) -> None:
+        import orjson
+
+        super().__init__(default)
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+        # 与标准库保持一致: 非字符串键转为字符串，datetime 与数据类交由 default 处理
+        self._option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self._dumps(obj, default=self.default, option=self._option).decode()
+
+
+class MsgspecCodec(Codec):
+    """基于 `msgspec` 的编解码器。"""
+
+    name = "msgspec"
+
+    def __init__(self, default: Callable[[Any], Any]) -> None:
+        import msgspec
+
+        super().__init__(default)
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder(enc_hook=default)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self._encoder.encode(self._prepare(obj)).decode()
+
+    def _prepare(self, obj: Any) -> Any:
+        # msgspec 原生编码数据类，与其他编解码器一致交由 default 处理
+        # 仅复制包含数据类的容器，其余对象原样交由 msgspec 编码
+        if isinstance(obj, dict):
+            prepared = None
+            for key, value in obj.items():
+                if type(value) in _SCALARS:
+                    continue
+                if (new := self._prepare(value)) is not value:
+                    if prepared is None:
+                        prepared = dict(obj)
+                    prepared[key] = new
+            return obj if prepared is None else prepared
+        elif isinstance(obj, (list, tuple)):
+            prepared = None
+            for index, value in enumerate(obj):
+                if type(value) in _SCALARS:
+                    continue
+                if (new := self._prepare(value)) is not value:
+                    if prepared is None:
+                        prepared = list(obj)
+                    prepared[index] = new
+            return obj if prepared is None else prepared
+        elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            return self._prepare(self.default(obj))
+        return obj
+
+
+_SCALARS = frozenset((str, int, float, bool, type(None), bytes))
+
+
+CODECS: dict[str, type[Codec]] = {
+    "json": Codec,
+    "orjson": ORJSONCodec,
+    "msgspec": MsgspecCodec,
+}
+
+
+def get_codec(name: str, default: Callable[[Any], Any]) -> Codec:
+    """获取指定名称的编解码器。
+
+    若对应的可选依赖未安装，则回退至标准库 `json` 实现，
+    可通过返回值的 `name` 属性判断实际使用的编解码器。
+
+    参数:
+        name: 编解码器名称
+        default: 无法直接序列化的对象的转换函数
+
+    异常:
+        ValueError: 未知的编解码器名称
+    """
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec {name!r}")
+    try:
+        return CODECS[name](default)
+    except ImportError:
+        return Codec(default)
@@ -10,13 +10,15 @@ from typing import Any, Union, Generic, TypeVar, Optional
 
 from pygtrie import StringTrie
 from nonebot.utils import logger_wrapper
-from nonebot.compat import ModelField, model_fields
+from nonebot.compat import ModelField, TypeAdapter, model_fields
 from nonebot.typing import origin_is_literal, all_literal_values
 
 from nonebot.adapters import Event
+from nonebot.adapters.onebot.compat import union_type_adapter
 
 E = TypeVar("E", bound=Event)
 SEPARATOR = "/"
+CACHE_SIZE = 1024
 
 
 class Collator(Generic[E]):
@@ -31,8 +33,13 @@ class Collator(Generic[E]):
 
         self.models = models
         self.keys = keys
+        self._raw_keys = tuple(
+            k for key in keys for k in (key if isinstance(key, tuple) else (key,))
+        )
 
         self.tree = StringTrie(separator=SEPARATOR)
+        self._cache: dict[tuple[Any, ...], tuple[type[E], ...]] = {}
+        self._validators: dict[tuple[type[E], ...], TypeAdapter[E]] = {}
         self._refresh_tree()
 
     def add_model(self, *model: type[E]):
@@ -40,11 +47,70 @@ class Collator(Generic[E]):
         self._refresh_tree()
 
     def get_model(self, data: dict[str, Any]) -> list[type[E]]:
+        return list(self._get_models(data))
+
+    def get_validator(
+        self, data: dict[str, Any], fallback: Optional["Collator[E]"] = None
+    ) -> Optional[TypeAdapter[E]]:
+        """获取事件对应的校验器。
+
+        校验器按 `get_model` 返回的顺序依次尝试各模型，返回第一个校验成功的结果，
+        相同模型列表的校验器只会构造一次。
+
+        参数:
+            data: 事件数据
+            fallback: 当前模型均校验失败时继续尝试的 Collator
+        """
+        key = self._get_models(data)
+        if fallback is not None:
+            key += fallback._get_models(data)
+        if not key:
+            return None
+
+        if (validator := self._validators.get(key)) is None:
+            validator = self._validators[key] = union_type_adapter(key)
+        return validator
+
+    def peek(self, data: dict[str, Any]) -> tuple[Any, ...]:
+        """提取数据中用于路由的键值，不进行校验与模型匹配。
+
+        对于同级键，取第一个存在的值。
+
+        参数:
+            data: 事件数据
+        """
+        return tuple(
+            (
+                next((data[k] for k in key if data.get(k) is not None), None)
+                if isinstance(key, tuple)
+                else data.get(key)
+            )
+            for key in self.keys
+        )
+
+    def _get_models(self, data: dict[str, Any]) -> tuple[type[E], ...]:
+        # 实际出现的键值组合很少，以原始键值缓存搜索结果
+        raw_key = tuple(data.get(k) for k in self._raw_keys)
+        try:
+            return self._cache[raw_key]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable value
+            return self._search_models(data)
+
+        models = self._search_models(data)
+        if len(self._cache) < CACHE_SIZE:
+            self._cache[raw_key] = models
+        return models
+
+    def _search_models(self, data: dict[str, Any]) -> tuple[type[E], ...]:
         key = self._key_from_dict(data)
-        return [model.value for model in self.tree.prefixes(key)][::-1]
+        return tuple(model.value for model in self.tree.prefixes(key))[::-1]
 
     def _refresh_tree(self):
         self.tree.clear()
+        self._cache.clear()
+        self._validators.clear()
         for model in self.models:
             key = self._key_from_model(model)
             if key in self.tree:
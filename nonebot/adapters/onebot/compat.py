@@ -1,12 +1,22 @@
-from typing import Literal, overload
+from typing import Any, Union, Literal, Annotated, overload
 
-from nonebot.compat import PYDANTIC_V2
+from nonebot.compat import PYDANTIC_V2, TypeAdapter
 
-__all__ = ("model_validator",)
+__all__ = ("model_validator", "union_type_adapter")
 
 
 if PYDANTIC_V2:
+    from pydantic import Field
     from pydantic import model_validator as model_validator
+
+    def union_type_adapter(types: tuple[type[Any], ...]) -> TypeAdapter[Any]:
+        """构造按顺序依次尝试各类型的联合类型校验器。"""
+        if len(types) == 1:
+            return TypeAdapter(types[0])
+        return TypeAdapter(
+            Annotated[Union[types], Field(union_mode="left_to_right")]  # type: ignore
+        )
+
 else:
     from pydantic import root_validator
 
@@ -18,3 +28,7 @@ else:
 
     def model_validator(*, mode: Literal["before", "after"]):
         return root_validator(pre=mode == "before", allow_reuse=True)
+
+    def union_type_adapter(types: tuple[type[Any], ...]) -> TypeAdapter[Any]:
+        """构造按顺序依次尝试各类型的联合类型校验器。"""
+        return TypeAdapter(Union[types])  # type: ignore
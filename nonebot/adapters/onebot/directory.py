@@ -0,0 +1,193 @@
+"""OneBot 联系人目录。
+
+在 Bot 连接时预先拉取群组、好友等信息，并根据通知事件增量更新，
+使常用的查询 API 无需访问网络即可返回。
+
+FrontMatter:
+    sidebar_position: 7
+    description: onebot.directory 模块
+"""
+
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from collections.abc import Hashable, Iterable, Coroutine
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Generic,
+    TypeVar,
+    Callable,
+    ClassVar,
+    Optional,
+)
+
+from nonebot.utils import logger_wrapper
+
+from nonebot.adapters import Bot
+
+from .cache import MISSING
+
+if TYPE_CHECKING:
+    from .cache import ResponseCache
+
+B = TypeVar("B", bound=Bot)
+
+
+class Table:
+    """以 ID 索引的记录集合。
+
+    仅在完整拉取过列表后才能作为列表返回，单条记录可随时读写。
+
+    参数:
+        ttl: 完整列表的有效期（秒），为 0 时不过期
+    """
+
+    def __init__(self, ttl: float = 0) -> None:
+        self.records: dict[Hashable, dict[str, Any]] = {}
+        self.complete: bool = False
+        self.ttl = ttl
+        self.loaded_at: float = 0
+        """最近一次拉取完整列表的时间"""
+        self.loading: bool = False
+        """是否正在后台重新拉取"""
+
+    def __contains__(self, id: Hashable) -> bool:
+        return id in self.records
+
+    def fill(self, records: Iterable[dict[str, Any]], key: str) -> None:
+        """以完整列表替换全部记录。"""
+        self.records = {record[key]: record for record in records}
+        self.complete = True
+        self.loaded_at = time.monotonic()
+
+    def expired(self) -> bool:
+        """完整列表是否已超过有效期。"""
+        return self.complete and 0 < self.ttl <= time.monotonic() - self.loaded_at
+
+    def expire(self) -> None:
+        """标记列表已过时，重新拉取前不再作为列表返回。"""
+        self.complete = False
+
+    def get(self, id: Hashable) -> Any:
+        """获取记录，不存在时返回 `MISSING`。"""
+        return self.records.get(id, MISSING)
+
+    def list(self) -> Any:
+        """获取记录列表，列表不完整时返回 `MISSING`。"""
+        return list(self.records.values()) if self.complete else MISSING
+
+    def put(self, id: Hashable, record: dict[str, Any]) -> None:
+        self.records[id] = record
+
+    @abstractmethod
+    def update(self, id: Hashable, **fields: Any) -> None:
+        """更新已存在记录的字段。"""
+        if (record := self.records.get(id)) is not None:
+            self.records[id] = {**record, **fields}
+
+    def remove(self, id: Hashable) -> None:
+        self.records.pop(id, None)
+
+
+class Directory(ABC, Generic[B]):
+    """Bot 联系人目录基类。
+
+    参数:
+        bot: 目录所属的 Bot
+        name: 日志名称
+        ttl: 列表的有效期（秒），超过后查询时在后台重新拉取，为 0 时仅依赖事件更新
+    """
+
+    events: ClassVar[frozenset[str]] = frozenset()
+    """更新目录所需的事件名称前缀，配置为忽略时仍会解析以更新目录"""
+
+    def __init__(self, bot: B, name: str, ttl: float = 0) -> None:
+        self.bot = bot
+        self.ttl = ttl
+        self.logger = logger_wrapper(name)
+        self.tasks: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """在后台拉取目录数据。"""
+        self.spawn(self.warm())
+
+    def close(self) -> None:
+        """取消所有后台任务。"""
+        for task in self.tasks:
+            task.cancel()
+        self.tasks.clear()
+
+    @abstractmethod
+    async def warm(self) -> None:
+        """拉取目录数据。"""
+
+    @abstractmethod
+    def lookup(self, api: str, params: dict[str, Any]) -> Any:
+        """查询 API 结果，目录中不存在时返回 `MISSING`。"""
+
+    @abstractmethod
+    def update(self, event: Any) -> None:
+        """根据事件更新目录。"""
+
+    def read(
+        self,
+        table: Table,
+        id: Hashable,
+        reload: Callable[[], Coroutine[Any, Any, Any]],
+    ) -> Any:
+        """读取记录，列表已过期时在后台重新拉取并返回 `MISSING`。"""
+        return table.get(id) if self._fresh(table, reload) else MISSING
+
+    def read_list(
+        self, table: Table, reload: Callable[[], Coroutine[Any, Any, Any]]
+    ) -> Any:
+        """读取记录列表，列表已过期时在后台重新拉取并返回 `MISSING`。"""
+        return table.list() if self._fresh(table, reload) else MISSING
+
+    async def fetch(self, api: str, **params: Any) -> Any:
+        """绕过目录与 API 响应缓存请求 API，仍受 API 并发限制。"""
+        adapter: Any = self.bot.adapter
+        return await adapter._limited_request(self.bot, api, **params)
+
+    def spawn(self, coro: Coroutine[Any, Any, Any]) -> None:
+        """在后台执行目录更新，失败时仅记录日志。"""
+        task = asyncio.create_task(self._run(coro))
+        task.add_done_callback(self.tasks.discard)
+        self.tasks.add(task)
+
+    def invalidate(self, api: str, **params: Any) -> None:
+        """清除 API 响应缓存中与目录变化相关的结果。"""
+        cache: Optional["ResponseCache"] = getattr(
+            self.bot.adapter, "response_cache", None
+        )
+        if cache is not None:
+            cache.delete(self.bot.self_id, api, params)
+
+    def _fresh(
+        self, table: Table, reload: Callable[[], Coroutine[Any, Any, Any]]
+    ) -> bool:
+        if not table.expired():
+            return True
+        if not table.loading:
+            table.loading = True
+            self.spawn(self._reload(table, reload))
+        return False
+
+    async def _reload(
+        self, table: Table, reload: Callable[[], Coroutine[Any, Any, Any]]
+    ) -> None:
+        try:
+            await reload()
+        finally:
+            table.loading = False
+
+    async def _run(self, coro: Coroutine[Any, Any, Any]) -> None:
+        try:
+            await coro
+        except Exception as e:
+            self.logger(
+                "WARNING",
+                f"Failed to update directory for bot {self.bot.self_id}",
+                e,
+            )
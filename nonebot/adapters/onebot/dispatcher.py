@@ -0,0 +1,387 @@
+"""OneBot 事件分发。
+
+以固定数量的工作协程处理事件，事件突增时在有界队列中排队，
+而不是为每个事件创建一个任务。
+
+FrontMatter:
+    sidebar_position: 11
+    description: onebot.dispatcher 模块
+"""
+
+import asyncio
+from enum import IntEnum
+from itertools import chain
+from collections import deque
+from dataclasses import field, dataclass
+from typing import Any, Literal, Callable, Optional
+from collections.abc import Mapping, Hashable, Awaitable, Collection
+
+from nonebot.utils import logger_wrapper
+
+from .store import ResultStore
+
+OverflowPolicy = Literal["block", "drop_oldest", "drop_newest"]
+"""事件队列已满时的处理策略：等待队列空位、丢弃最早排队的事件或丢弃新事件"""
+EventOrdering = Literal["session", "group"]
+"""按会话或群组（频道）顺序处理事件"""
+Job = Callable[[], Awaitable[Any]]
+OnDrop = Optional[Callable[[], None]]
+
+
+class EventPriority(IntEnum):
+    """事件优先级，值越小越优先处理。"""
+
+    MENTION = 0
+    """提及 Bot 的消息事件，如私聊消息、@Bot 的群消息"""
+    MESSAGE = 1
+    """其他消息事件"""
+    NOTICE = 2
+    """通知与请求事件"""
+    META = 3
+    """元事件"""
+
+
+DEFAULT_PRIORITIES: dict[str, EventPriority] = {
+    "message": EventPriority.MESSAGE,
+    "notice": EventPriority.NOTICE,
+    "request": EventPriority.NOTICE,
+    "meta_event": EventPriority.META,
+    "meta": EventPriority.META,
+}
+"""各类事件的默认优先级，OneBot V11 与 V12 的元事件分别以 `meta_event` 与 `meta` 开头"""
+
+
+def match_event_name(name: str, prefixes: Collection[str]) -> bool:
+    """事件名称是否以集合中的任一名称为前缀，如 `notice` 匹配 `notice.group_upload`。"""
+    if not prefixes:
+        return False
+    prefix = ""
+    for part in name.split("."):
+        prefix = f"{prefix}.{part}" if prefix else part
+        if prefix in prefixes:
+            return True
+    return False
+
+
+def get_event_priority(
+    name: str, priorities: Mapping[str, EventPriority]
+) -> EventPriority:
+    """按最长匹配的事件名称前缀获取事件优先级，未配置的前缀使用默认优先级。"""
+    priority = EventPriority.MESSAGE
+    prefix = ""
+    for part in name.split("."):
+        prefix = f"{prefix}.{part}" if prefix else part
+        matched = priorities.get(prefix, DEFAULT_PRIORITIES.get(prefix))
+        if matched is not None:
+            priority = matched
+    return priority
+
+
+@dataclass
+class DispatchStats:
+    """事件分发统计信息。"""
+
+    queued: int = 0
+    """正在排队的事件数"""
+    max_queued: int = 0
+    """排队事件数的最大值"""
+    dispatched: int = 0
+    """已开始处理的事件数"""
+    dropped: int = 0
+    """因队列已满丢弃的事件数"""
+    shed: dict[EventPriority, int] = field(
+        default_factory=lambda: dict.fromkeys(EventPriority, 0)
+    )
+    """各优先级被丢弃的事件数"""
+    lanes: int = 0
+    """有事件正在处理或排队的会话数"""
+
+
+class _Job:
+    __slots__ = ("func", "on_drop", "priority")
+
+    def __init__(self, func: Job, on_drop: OnDrop, priority: EventPriority) -> None:
+        self.func = func
+        self.on_drop = on_drop
+        self.priority = priority
+
+
+class _Lane:
+    """同一会话的事件队列，同一时间只有一个工作协程处理。"""
+
+    __slots__ = ("jobs", "key", "ready", "running")
+
+    def __init__(self, key: Optional[Hashable]) -> None:
+        self.key = key
+        self.jobs: deque[_Job] = deque()
+        self.ready: Optional[EventPriority] = None
+        """所在的调度队列，未等待调度时为 `None`"""
+        self.running: bool = False
+
+
+class EventDispatcher:
+    """以固定数量的工作协程处理事件。
+
+    分发时指定会话键的事件按到达顺序依次处理，不同会话的事件并行处理；
+    会话没有待处理的事件时即回收。工作协程在首次分发事件时于当前事件循环中启动。
+
+    优先级高的事件先被调度。队列已满时先丢弃优先级更低的排队事件，
+    没有更低优先级的事件时按 `overflow` 处理，`drop_oldest` 仅丢弃同一优先级的事件。
+
+    参数:
+        name: 日志名称
+        workers: 工作协程数
+        queue_size: 排队事件数上限，为 0 时不限制
+        overflow: 事件队列已满时的处理策略
+    """
+
+    def __init__(
+        self,
+        name: str,
+        workers: int,
+        queue_size: int,
+        overflow: OverflowPolicy = "block",
+    ) -> None:
+        self.logger = logger_wrapper(name)
+        self.workers = workers
+        self.queue_size = queue_size
+        self.overflow: OverflowPolicy = overflow
+        self._stats = DispatchStats()
+        self._pending: int = 0
+        self._queued: dict[EventPriority, int] = dict.fromkeys(EventPriority, 0)
+        self._lanes: dict[Hashable, _Lane] = {}
+        self._ready: dict[EventPriority, deque[_Lane]] = {
+            priority: deque() for priority in EventPriority
+        }
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def dispatch(
+        self,
+        job: Job,
+        droppable: bool = False,
+        key: Optional[Hashable] = None,
+        on_drop: OnDrop = None,
+        priority: EventPriority = EventPriority.MESSAGE,
+    ) -> bool:
+        """将事件处理加入队列，事件被丢弃时返回 `False`。
+
+        参数:
+            job: 处理事件的函数
+            droppable: 队列已满时是否直接丢弃该事件
+            key: 会话键，相同会话键的事件依次处理，为 `None` 时不保证顺序
+            on_drop: 事件未被处理而丢弃时的回调
+            priority: 事件优先级
+        """
+        self._start()
+        new = _Job(job, on_drop, priority)
+        async with self._not_full:
+            if self._full() and not self._shed(priority):
+                if droppable or self.overflow == "drop_newest":
+                    self._discard(new)
+                    return False
+                elif self.overflow == "drop_oldest":
+                    if not self._drop_oldest(priority):
+                        self._discard(new)
+                        return False
+                else:
+                    await self._not_full.wait_for(lambda: not self._full())
+
+            lane = self._lanes.get(key) if key is not None else None
+            if lane is None:
+                lane = _Lane(key)
+                if key is not None:
+                    self._lanes[key] = lane
+            # 会话正在处理或等待调度时，事件在会话队列中等待
+            lane.jobs.append(new)
+            self._pending += 1
+            self._queued[priority] += 1
+            self._stats.max_queued = max(self._stats.max_queued, self._pending)
+            if lane.ready is None and not lane.running:
+                self._schedule(lane)
+            elif lane.ready is not None and priority < lane.ready:
+                # 提升等待调度的会话的优先级
+                self._ready[lane.ready].remove(lane)
+                self._schedule(lane)
+        return True
+
+    def blocking(self, droppable: bool, priority: EventPriority) -> bool:
+        """分发该事件时是否需要等待队列空位。"""
+        return (
+            self.overflow == "block"
+            and not droppable
+            and self._full()
+            and not any(
+                self._queued[lower] for lower in EventPriority if lower > priority
+            )
+        )
+
+    def stats(self) -> DispatchStats:
+        """获取事件分发统计信息。"""
+        return DispatchStats(
+            queued=self._pending,
+            max_queued=self._stats.max_queued,
+            dispatched=self._stats.dispatched,
+            dropped=self._stats.dropped,
+            shed=self._stats.shed.copy(),
+            lanes=len(self._lanes),
+        )
+
+    async def close(self) -> None:
+        """停止所有工作协程，丢弃排队中的事件。"""
+        tasks, self._tasks = self._tasks, set()
+        self._loop = None
+        self._reset()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._reset()
+        lock = asyncio.Lock()
+        self._not_empty = asyncio.Condition(lock)
+        self._not_full = asyncio.Condition(lock)
+        self._tasks = {loop.create_task(self._worker()) for _ in range(self.workers)}
+
+    def _reset(self) -> None:
+        self._lanes.clear()
+        for ready in self._ready.values():
+            ready.clear()
+        self._queued = dict.fromkeys(EventPriority, 0)
+        self._pending = 0
+
+    def _full(self) -> bool:
+        return 0 < self.queue_size <= self._pending
+
+    def _schedule(self, lane: _Lane) -> None:
+        lane.ready = min(job.priority for job in lane.jobs)
+        self._ready[lane.ready].append(lane)
+        self._not_empty.notify()
+
+    def _discard(self, job: _Job) -> None:
+        self._stats.dropped += 1
+        self._stats.shed[job.priority] += 1
+        if job.on_drop is not None:
+            job.on_drop()
+
+    def _shed(self, priority: EventPriority) -> bool:
+        """丢弃一个优先级低于 `priority` 的排队事件，从最低优先级开始。"""
+        return any(
+            self._queued[lower] and self._drop_oldest(lower)
+            for lower in sorted(EventPriority, reverse=True)
+            if lower > priority
+        )
+
+    def _drop_oldest(self, priority: EventPriority) -> bool:
+        """丢弃指定优先级中最早等待调度的事件。"""
+        # 也可能在其他优先级的会话或正在处理的会话中排队
+        lanes = chain(
+            self._ready[priority], *self._ready.values(), self._lanes.values()
+        )
+        for lane in lanes:
+            job = next((job for job in lane.jobs if job.priority == priority), None)
+            if job is None:
+                continue
+            lane.jobs.remove(job)
+            self._pending -= 1
+            self._queued[priority] -= 1
+            self._discard(job)
+            if not lane.jobs and lane.ready is not None:
+                self._ready[lane.ready].remove(lane)
+                self._lanes.pop(lane.key, None)
+            return True
+        return False
+
+    def _has_ready(self) -> bool:
+        return any(self._ready.values())
+
+    async def _worker(self) -> None:
+        while True:
+            async with self._not_empty:
+                await self._not_empty.wait_for(self._has_ready)
+                lane = next(ready for ready in self._ready.values() if ready).popleft()
+                lane.ready = None
+                lane.running = True
+                job = lane.jobs.popleft()
+                self._pending -= 1
+                self._queued[job.priority] -= 1
+                self._not_full.notify()
+            self._stats.dispatched += 1
+            try:
+                await job.func()
+            except Exception as e:
+                self.logger(
+                    "ERROR",
+                    "<r><bg #f8bbd0>Error while handling event</bg #f8bbd0></r>",
+                    e,
+                )
+            finally:
+                async with self._not_empty:
+                    lane.running = False
+                    if lane.jobs:
+                        # 排到队尾，避免繁忙的会话占用工作协程
+                        self._schedule(lane)
+                    elif lane.key is not None:
+                        self._lanes.pop(lane.key, None)
+
+
+class DispatchBacklog:
+    """连接上等待分发的事件。
+
+    分发需要等待队列空位时，事件在此按到达顺序排队，由后台任务依次分发，
+    读取协程得以继续读取 API 调用结果。排队事件数达到上限时读取协程才等待；
+    若该连接上有等待结果的 API 调用，则丢弃新事件而不等待，
+    以免事件处理等待的调用结果无法送达。
+
+    参数:
+        maxsize: 排队事件数上限
+        result_store: 连接的 API 调用结果存储
+    """
+
+    def __init__(
+        self, maxsize: int, result_store: Optional[ResultStore] = None
+    ) -> None:
+        self.maxsize = max(maxsize, 1)
+        self.jobs: deque[Job] = deque()
+        self.result_store = result_store
+        self._task: Optional[asyncio.Task] = None
+        self._not_full = asyncio.Event()
+        if result_store is not None:
+            result_store.on_fetch.append(self._not_full.set)
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    async def put(self, job: Job) -> bool:
+        """将事件的分发加入队列，队列已满时等待，事件被丢弃时返回 `False`。"""
+        while len(self.jobs) >= self.maxsize:
+            if self.result_store is not None and self.result_store.pending:
+                return False
+            self._not_full.clear()
+            await self._not_full.wait()
+        self.jobs.append(job)
+        if self._task is None:
+            self._task = asyncio.create_task(self._drain())
+        return True
+
+    async def close(self) -> None:
+        """停止分发，丢弃排队中的事件。"""
+        if (task := self._task) is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.jobs.clear()
+        self._not_full.set()
+
+    async def _drain(self) -> None:
+        try:
+            while self.jobs:
+                # 分发完成前保留在队列中，之后的事件在其后排队
+                await self.jobs[0]()
+                self.jobs.popleft()
+                self._not_full.set()
+        finally:
+            self._task = None
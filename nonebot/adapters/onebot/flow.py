@@ -0,0 +1,80 @@
+"""OneBot WebSocket 读取流量控制。
+
+FrontMatter:
+    sidebar_position: 12
+    description: onebot.flow 模块
+"""
+
+import asyncio
+from typing import Any, Callable
+from collections.abc import Awaitable
+
+from .store import ResultStore
+
+
+class FlowControl:
+    """按正在处理的事件数控制连接的读取。
+
+    正在处理的事件数达到高水位时暂停读取，协议端的发送将因 TCP 缓冲区写满而减慢，
+    降到低水位时恢复读取。暂停期间该连接上有等待结果的 API 调用时仍继续读取，
+    以免事件处理等待的调用结果无法送达；此时读取到的事件暂缓分发，恢复后再分发，
+    暂缓的事件数超过 `DispatchBacklog` 上限时丢弃新事件。
+
+    参数:
+        high: 暂停读取的正在处理事件数
+        low: 恢复读取的正在处理事件数
+        result_store: 连接的 API 调用结果存储
+    """
+
+    def __init__(self, high: int, low: int, result_store: ResultStore) -> None:
+        self.high = high
+        self.low = min(low, high - 1)
+        self.in_flight: int = 0
+        """正在处理的事件数"""
+        self.paused: bool = False
+        """是否已暂停读取"""
+        self.pauses: int = 0
+        """暂停读取的次数"""
+        self.result_store = result_store
+        self._resume = asyncio.Event()
+        result_store.on_fetch.append(self._resume.set)
+
+    def track(self, func: Callable[[], Awaitable[Any]]) -> Callable[[], Awaitable[Any]]:
+        """开始跟踪一个事件的处理，返回的函数执行结束后停止跟踪。"""
+        self.in_flight += 1
+
+        async def _run() -> Any:
+            try:
+                return await func()
+            finally:
+                self.release()
+
+        return _run
+
+    def release(self) -> None:
+        """事件处理结束或被丢弃。"""
+        self.in_flight -= 1
+        if self.paused and self.in_flight <= self.low:
+            self.paused = False
+            self._resume.set()
+
+    async def wait(self) -> None:
+        """读取下一帧前调用，暂停期间等待恢复或新的 API 调用。"""
+        self.check()
+        while self.paused and not self.result_store.pending:
+            self._resume.clear()
+            await self._resume.wait()
+
+    async def acquire(self) -> None:
+        """分发暂缓的事件前调用，暂停期间等待恢复。"""
+        self.check()
+        while self.paused:
+            self._resume.clear()
+            await self._resume.wait()
+
+    def check(self) -> bool:
+        """检查正在处理的事件数，返回是否暂停读取。"""
+        if not self.paused and self.in_flight >= self.high:
+            self.paused = True
+            self.pauses += 1
+        return self.paused
@@ -0,0 +1,138 @@
+"""OneBot API 自适应并发限制。
+
+FrontMatter:
+    sidebar_position: 9
+    description: onebot.limiter 模块
+"""
+
+import time
+import asyncio
+from collections import deque
+from collections.abc import Awaitable
+from typing import Any, Callable, Optional
+
+BACKOFF_INITIAL = 0.5
+"""首次过载后的退避时间（秒）"""
+BACKOFF_MAX = 30.0
+"""最长退避时间（秒）"""
+IDEMPOTENT_PREFIXES = ("get_", "can_")
+"""幂等 API 的名称前缀，仅这些 API 会在过载时自动重试"""
+
+
+def is_idempotent(api: str) -> bool:
+    """API 是否可以安全地重试"""
+    return api.startswith(IDEMPOTENT_PREFIXES)
+
+
+class AIMDLimiter:
+    """加性增、乘性减（AIMD）的 API 并发限制器。
+
+    调用成功时并发上限缓慢增长，过载时减半并暂停新的调用一段时间，
+    连续过载时退避时间成倍增长。
+
+    参数:
+        max_limit: 并发上限的最大值，同时也是初始值
+        min_limit: 并发上限的最小值
+        decrease: 过载时并发上限的缩小倍数
+    """
+
+    def __init__(
+        self, max_limit: int, min_limit: int = 1, decrease: float = 0.5
+    ) -> None:
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.decrease = decrease
+        self.limit: float = max_limit
+        """当前并发上限"""
+        self.in_flight: int = 0
+        """正在进行的调用数"""
+        self._backoff: float = 0
+        self._resume_at: float = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(self) -> None:
+        """等待调用许可。"""
+        if not self._waiters and self._available(time.monotonic()):
+            self.in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已获得许可但调用方被取消
+                self.release()
+            else:
+                self._waiters.remove(future)
+            raise
+
+    def release(self, overloaded: Optional[bool] = None) -> None:
+        """释放调用许可。
+
+        参数:
+            overloaded: 调用是否因过载失败，为 `None` 时不调整并发上限
+        """
+        self.in_flight -= 1
+        now = time.monotonic()
+        if overloaded:
+            # 退避期间失败的调用属于同一次过载，只缩小一次
+            if now >= self._resume_at:
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+                self._backoff = min(BACKOFF_MAX, self._backoff * 2 or BACKOFF_INITIAL)
+                self._resume_at = now + self._backoff
+        elif overloaded is not None:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._backoff = 0
+        self._wake()
+
+    async def call(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        is_overloaded: Callable[[Exception], bool],
+        retries: int = 0,
+    ) -> Any:
+        """在并发限制下调用 API。
+
+        参数:
+            func: 实际发起请求的函数
+            is_overloaded: 判断异常是否表示过载
+            retries: 过载时的最大重试次数，重试前等待退避结束
+        """
+        for attempt in range(retries + 1):
+            await self.acquire()
+            overloaded: Optional[bool] = None
+            try:
+                result = await func()
+                overloaded = False
+                return result
+            except Exception as e:
+                overloaded = is_overloaded(e)
+                if not overloaded or attempt >= retries:
+                    raise
+            finally:
+                self.release(overloaded)
+
+    def _available(self, now: float) -> bool:
+        return self.in_flight < int(self.limit) and now >= self._resume_at
+
+    def _wake(self) -> None:
+        now = time.monotonic()
+        while self._waiters and self._available(now):
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+        if self._waiters and now < self._resume_at and self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_at(
+                loop.time() + self._resume_at - now, self._on_resume
+            )
+
+    def _on_resume(self) -> None:
+        self._timer = None
+        self._wake()
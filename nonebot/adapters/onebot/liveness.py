@@ -0,0 +1,102 @@
+"""OneBot 心跳存活状态。
+
+心跳事件由适配器直接记录，
+仅在有事件响应器或事件预处理、后处理函数时才交给 NoneBot 处理。
+
+FrontMatter:
+    sidebar_position: 13
+    description: onebot.liveness 模块
+"""
+
+import time
+from typing import Any, Optional
+from dataclasses import dataclass
+
+from nonebot.matcher import matchers
+from nonebot.message import _event_preprocessors, _event_postprocessors
+
+HEARTBEAT_TOLERANCE = 2
+"""超过心跳间隔的该倍数时间未收到心跳时视为失联"""
+
+
+@dataclass
+class Liveness:
+    """Bot 的心跳状态。"""
+
+    last_seen: float
+    """最近一次收到心跳的时间，为 `time.monotonic()` 的值"""
+    interval: float
+    """心跳间隔（秒）"""
+    good: Optional[bool] = None
+    """协议端报告的状态是否符合预期，未报告时为 `None`"""
+    heartbeats: int = 0
+    """收到的心跳次数"""
+
+
+class LivenessTracker:
+    """记录各 Bot 最近一次心跳的时间与状态。"""
+
+    def __init__(self) -> None:
+        self.bots: dict[str, Liveness] = {}
+
+    def beat(self, self_id: str, interval: int, good: Optional[bool] = None) -> None:
+        """记录一次心跳。
+
+        参数:
+            self_id: Bot ID
+            interval: 心跳间隔（毫秒）
+            good: 协议端报告的状态，为 `None` 时保持不变
+        """
+        now = time.monotonic()
+        if (liveness := self.bots.get(self_id)) is None:
+            liveness = self.bots[self_id] = Liveness(now, interval / 1000)
+        liveness.last_seen = now
+        liveness.interval = interval / 1000
+        if good is not None:
+            liveness.good = good
+        liveness.heartbeats += 1
+
+    def get(self, self_id: str) -> Optional[Liveness]:
+        """获取 Bot 的心跳状态，未收到过心跳时返回 `None`。"""
+        return self.bots.get(self_id)
+
+    def is_alive(self, self_id: str) -> Optional[bool]:
+        """Bot 是否按时发送心跳，未收到过心跳时返回 `None`。"""
+        if (liveness := self.bots.get(self_id)) is None:
+            return None
+        deadline = liveness.last_seen + liveness.interval * HEARTBEAT_TOLERANCE
+        return time.monotonic() <= deadline
+
+    def remove(self, self_id: str) -> None:
+        """移除 Bot 的心跳状态。"""
+        self.bots.pop(self_id, None)
+
+
+_subscribed: dict[str, tuple[tuple[Any, ...], bool]] = {}
+"""各事件类型的检查结果与检查时的注册状态"""
+
+
+def _registry_key() -> tuple[Any, ...]:
+    # 注册或移除事件响应器时对应优先级的列表长度改变，无需逐个检查
+    return (
+        len(_event_preprocessors),
+        len(_event_postprocessors),
+        *((priority, id(m), len(m)) for priority, m in matchers.items()),
+    )
+
+
+def is_subscribed(event_type: str) -> bool:
+    """是否有事件响应器或事件预处理、后处理函数可能处理该类型的事件。
+
+    结果按事件响应器的注册状态缓存，注册或移除后重新检查。
+    """
+    key = _registry_key()
+    if (cached := _subscribed.get(event_type)) is not None and cached[0] == key:
+        return cached[1]
+    subscribed = bool(_event_preprocessors or _event_postprocessors) or any(
+        matcher.type in ("", event_type)
+        for priority_matchers in matchers.values()
+        for matcher in priority_matchers
+    )
+    _subscribed[event_type] = (key, subscribed)
+    return subscribed
@@ -0,0 +1,258 @@
+"""OneBot 消息发送调度。
+
+FrontMatter:
+    sidebar_position: 8
+    description: onebot.scheduler 模块
+"""
+
+import time
+import asyncio
+from enum import IntEnum
+from collections import deque
+from contextvars import ContextVar
+from typing import Literal, Optional
+from collections.abc import Generator
+from dataclasses import field, dataclass
+from contextlib import suppress, contextmanager
+
+LimitScope = Literal["bot", "group", "user"]
+"""速率限制的范围"""
+SendTarget = tuple[Literal["group", "user"], str]
+"""消息发送目标，`(范围, ID)`"""
+
+PRUNE_THRESHOLD = 1024
+"""目标令牌桶数量超过该值时清理已回满的令牌桶"""
+
+
+class SendPriority(IntEnum):
+    """消息发送优先级，数值越小越优先。"""
+
+    INTERACTIVE = 0
+    """交互式回复，如 `bot.send`"""
+    BULK = 1
+    """批量发送，如直接调用发送消息 API"""
+
+
+send_priority: ContextVar[SendPriority] = ContextVar(
+    "send_priority", default=SendPriority.BULK
+)
+"""当前上下文中发送消息的优先级"""
+
+
+@contextmanager
+def use_priority(priority: SendPriority) -> Generator[None, None, None]:
+    """在上下文中以指定优先级发送消息。
+
+    用法:
+        ```python
+        with use_priority(SendPriority.BULK):
+            await bot.send(event, "message")
+        ```
+    """
+    token = send_priority.set(priority)
+    try:
+        yield
+    finally:
+        send_priority.reset(token)
+
+
+class TokenBucket:
+    """令牌桶。
+
+    参数:
+        rate: 每秒生成的令牌数
+        burst: 令牌桶容量
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens: float = self.burst
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """距离下一个令牌可用的时间（秒）。"""
+        self.refill(now)
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+    def full(self, now: float) -> bool:
+        """令牌桶是否已回满，回满的令牌桶与新建的等价。"""
+        self.refill(now)
+        return self.tokens >= self.burst
+
+
+@dataclass
+class SendStats:
+    """Bot 发送调度统计信息。"""
+
+    queued: dict[SendPriority, int] = field(default_factory=dict)
+    """各优先级正在等待发送的消息数"""
+    sent: int = 0
+    """已调度发送的消息数"""
+    total_wait: float = 0
+    """累计等待时间（秒）"""
+    max_wait: float = 0
+    """最长等待时间（秒）"""
+
+
+@dataclass
+class _Waiter:
+    target: Optional[SendTarget]
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class _BotQueue:
+    def __init__(self, queue_size: int) -> None:
+        self.lanes: dict[SendPriority, deque[_Waiter]] = {
+            priority: deque() for priority in SendPriority
+        }
+        self.slots: dict[SendPriority, asyncio.Semaphore] = {
+            priority: asyncio.Semaphore(queue_size) for priority in SendPriority
+        }
+        self.bucket: Optional[TokenBucket] = None
+        self.targets: dict[SendTarget, TokenBucket] = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.stats = SendStats()
+
+
+class SendScheduler:
+    """按 Bot、群、用户限速的消息发送调度器。
+
+    每个 Bot 按优先级分为多个队列，高优先级的消息优先获得令牌；
+    某个目标的令牌不足时不会阻塞发往其他目标的消息。
+    每个队列的长度有限，队列已满时调用方等待。
+
+    参数:
+        rates: 各范围每秒允许发送的消息数，未配置的范围不限速
+        bursts: 各范围允许的突发消息数，默认为 1
+        queue_size: 每个 Bot 各优先级队列的最大长度
+    """
+
+    def __init__(
+        self,
+        rates: dict[LimitScope, float],
+        bursts: Optional[dict[LimitScope, int]] = None,
+        queue_size: int = 100,
+    ) -> None:
+        self.rates = {scope: rate for scope, rate in rates.items() if rate > 0}
+        self.bursts = bursts or {}
+        self.queue_size = queue_size
+        self._queues: dict[str, _BotQueue] = {}
+
+    def stats(self, self_id: str) -> SendStats:
+        """获取 Bot 的发送统计信息。"""
+        if (queue := self._queues.get(self_id)) is None:
+            return SendStats()
+        queue.stats.queued = {
+            priority: len(lane) for priority, lane in queue.lanes.items()
+        }
+        return queue.stats
+
+    async def acquire(
+        self,
+        self_id: str,
+        target: Optional[SendTarget],
+        priority: Optional[SendPriority] = None,
+    ) -> float:
+        """等待发送许可。
+
+        参数:
+            self_id: 发送消息的 Bot ID
+            target: 消息发送目标
+            priority: 优先级，默认为上下文中的优先级
+
+        返回:
+            等待时间（秒）
+        """
+        if priority is None:
+            priority = send_priority.get()
+        queue = self._get_queue(self_id)
+        async with queue.slots[priority]:
+            loop = asyncio.get_running_loop()
+            waiter = _Waiter(target, loop.create_future(), time.monotonic())
+            queue.lanes[priority].append(waiter)
+            self._pump(queue, loop)
+            try:
+                return await waiter.future
+            finally:
+                # 调用方被取消时移出队列
+                with suppress(ValueError):
+                    queue.lanes[priority].remove(waiter)
+
+    def remove(self, self_id: str) -> None:
+        """清除 Bot 的令牌桶，等待中的调用不受影响。"""
+        if (queue := self._queues.get(self_id)) is not None and not any(
+            queue.lanes.values()
+        ):
+            if queue.timer is not None:
+                queue.timer.cancel()
+            del self._queues[self_id]
+
+    def _get_queue(self, self_id: str) -> _BotQueue:
+        if (queue := self._queues.get(self_id)) is None:
+            queue = self._queues[self_id] = _BotQueue(self.queue_size)
+            if "bot" in self.rates:
+                queue.bucket = self._create_bucket("bot")
+        return queue
+
+    def _create_bucket(self, scope: LimitScope) -> TokenBucket:
+        return TokenBucket(self.rates[scope], self.bursts.get(scope, 1))
+
+    def _get_bucket(
+        self, queue: _BotQueue, target: Optional[SendTarget], now: float
+    ) -> Optional[TokenBucket]:
+        if target is None or target[0] not in self.rates:
+            return None
+        if (bucket := queue.targets.get(target)) is None:
+            if len(queue.targets) >= PRUNE_THRESHOLD:
+                queue.targets = {
+                    key: bucket
+                    for key, bucket in queue.targets.items()
+                    if not bucket.full(now)
+                }
+            bucket = queue.targets[target] = self._create_bucket(target[0])
+        return bucket
+
+    def _pump(self, queue: _BotQueue, loop: asyncio.AbstractEventLoop) -> None:
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+
+        now = time.monotonic()
+        next_delay: Optional[float] = None
+        for lane in queue.lanes.values():
+            for waiter in list(lane):
+                if queue.bucket is not None and (delay := queue.bucket.delay(now)):
+                    next_delay = delay if next_delay is None else min(next_delay, delay)
+                    break
+                bucket = self._get_bucket(queue, waiter.target, now)
+                if bucket is not None and (delay := bucket.delay(now)):
+                    # 目标令牌不足时继续调度其他目标的消息
+                    next_delay = delay if next_delay is None else min(next_delay, delay)
+                    continue
+
+                lane.remove(waiter)
+                if waiter.future.done():
+                    continue
+                if queue.bucket is not None:
+                    queue.bucket.consume()
+                if bucket is not None:
+                    bucket.consume()
+                wait = now - waiter.enqueued_at
+                queue.stats.sent += 1
+                queue.stats.total_wait += wait
+                queue.stats.max_wait = max(queue.stats.max_wait, wait)
+                waiter.future.set_result(wait)
+
+        if next_delay is not None:
+            queue.timer = loop.call_at(
+                loop.time() + next_delay, self._pump, queue, loop
+            )
@@ -0,0 +1,138 @@
+"""OneBot HTTP 客户端会话管理。
+
+FrontMatter:
+    sidebar_position: 5
+    description: onebot.session 模块
+"""
+
+import asyncio
+import contextlib
+from typing import Optional
+from collections.abc import AsyncIterator
+
+from nonebot.utils import logger_wrapper
+from nonebot.drivers import HTTPVersion, HTTPClientMixin, HTTPClientSession
+
+
+class SessionManager:
+    """按 API 地址复用长连接的 HTTP 客户端会话。
+
+    会话可在 Bot 连接时预先创建，复用底层连接池以避免每次请求重新建立 TCP/TLS 连接。
+    关闭会话时等待该会话上正在进行的请求完成。
+
+    参数:
+        name: 日志名称
+        driver: 支持 HTTP 客户端的驱动器
+        headers: 会话的公共请求头，如鉴权信息
+        http2: 是否尝试使用 HTTP/2，驱动器不支持时回退至 HTTP/1.1
+    """
+
+    def __init__(
+        self,
+        name: str,
+        driver: HTTPClientMixin,
+        headers: Optional[dict[str, str]] = None,
+        http2: bool = False,
+    ) -> None:
+        self.logger = logger_wrapper(name)
+        self.driver = driver
+        self.headers = headers
+        self.version = HTTPVersion.H2 if http2 else HTTPVersion.H11
+        self._sessions: dict[str, HTTPClientSession] = {}
+        self._outstanding: dict[int, int] = {}
+        self._idle: dict[int, asyncio.Event] = {}
+
+    def __contains__(self, api_root: str) -> bool:
+        return api_root in self._sessions
+
+    async def get(self, api_root: str) -> HTTPClientSession:
+        """获取 API 地址对应的会话，不存在时创建。
+
+        参数:
+            api_root: API 地址
+        """
+        if (session := self._sessions.get(api_root)) is not None:
+            return session
+
+        session = await self._create_session()
+        # 并发创建时保留先完成的会话
+        if (existing := self._sessions.get(api_root)) is not None:
+            await session.close()
+            return existing
+        self._sessions[api_root] = session
+        return session
+
+    async def open(self, api_root: str) -> None:
+        """预先创建 API 地址对应的会话，失败时在首次调用时重试。
+
+        参数:
+            api_root: API 地址
+        """
+        try:
+            await self.get(api_root)
+        except Exception as e:
+            self.logger("WARNING", f"Failed to open HTTP session for {api_root}", e)
+
+    @contextlib.asynccontextmanager
+    async def use(self, api_root: str) -> AsyncIterator[HTTPClientSession]:
+        """获取会话发送一次请求，会话在请求完成前不会被关闭。
+
+        参数:
+            api_root: API 地址
+        """
+        session = await self.get(api_root)
+        key = id(session)
+        self._outstanding[key] = self._outstanding.get(key, 0) + 1
+        try:
+            yield session
+        finally:
+            self._outstanding[key] -= 1
+            if not self._outstanding[key]:
+                del self._outstanding[key]
+                if (idle := self._idle.pop(key, None)) is not None:
+                    idle.set()
+
+    async def close(self, api_root: str, timeout: Optional[float] = None) -> None:
+        """等待正在进行的请求完成后关闭 API 地址对应的会话。
+
+        参数:
+            api_root: API 地址
+            timeout: 等待请求完成的最长时间，为 `None` 时不限制
+        """
+        if (session := self._sessions.pop(api_root, None)) is None:
+            return
+        if (key := id(session)) in self._outstanding:
+            idle = self._idle.setdefault(key, asyncio.Event())
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(idle.wait(), timeout)
+            self._idle.pop(key, None)
+        with contextlib.suppress(Exception):
+            await session.close()
+
+    async def close_all(self, timeout: Optional[float] = None) -> None:
+        """关闭所有会话。
+
+        参数:
+            timeout: 等待请求完成的最长时间，为 `None` 时不限制
+        """
+        await asyncio.gather(
+            *(self.close(api_root, timeout) for api_root in list(self._sessions))
+        )
+
+    async def _create_session(self) -> HTTPClientSession:
+        try:
+            session = self.driver.get_session(
+                headers=self.headers, version=self.version
+            )
+            await session.setup()
+        except (RuntimeError, ImportError):
+            if self.version == HTTPVersion.H11:
+                raise
+            self.logger(
+                "WARNING",
+                f"Current driver does not support HTTP/{self.version.value}, "
+                "fallback to HTTP/1.1",
+            )
+            self.version = HTTPVersion.H11
+            return await self._create_session()
+        return session
@@ -6,19 +6,41 @@ FrontMatter:
 """
 
 import sys
+import heapq
 import asyncio
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 
 class ResultStore:
+    """API 调用结果存储。
+
+    每个连接使用独立的实例，调用超时由按截止时间排序的堆统一调度，
+    连接断开时通过 `close` 使所有等待中的调用立即失败。
+    """
+
     def __init__(self) -> None:
         self._seq: int = 1
         self._futures: dict[int, asyncio.Future] = {}
+        self._deadlines: list[tuple[float, int]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._exception: Optional[BaseException] = None
+        self.on_fetch: list[Callable[[], None]] = []
+        """开始等待调用结果时的回调"""
 
     @property
     def current_seq(self) -> int:
         return self._seq
 
+    @property
+    def pending(self) -> int:
+        """等待结果的调用数"""
+        return len(self._futures)
+
+    @property
+    def closed(self) -> bool:
+        """是否已关闭"""
+        return self._exception is not None
+
     def get_seq(self) -> int:
         s = self._seq
         self._seq = (self._seq + 1) % sys.maxsize
@@ -27,13 +49,74 @@ class ResultStore:
     def add_result(self, result: dict[str, Any]):
         echo = result.get("echo")
         if isinstance(echo, str) and echo.isdecimal():
-            if future := self._futures.get(int(echo)):
+            if (future := self._futures.get(int(echo))) and not future.done():
                 future.set_result(result)
 
     async def fetch(self, seq: int, timeout: Optional[float]) -> dict[str, Any]:
-        future = asyncio.get_event_loop().create_future()
+        """等待指定序号的调用结果。
+
+        异常:
+            asyncio.TimeoutError: 等待超时
+            BaseException: 存储已关闭，抛出 `close` 时传入的异常
+        """
+        if self._exception is not None:
+            raise self._exception
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
         self._futures[seq] = future
+        for callback in self.on_fetch:
+            callback()
+        if timeout is not None:
+            heapq.heappush(self._deadlines, (loop.time() + timeout, seq))
+            self._schedule(loop)
         try:
-            return await asyncio.wait_for(future, timeout)
+            return await future
         finally:
             del self._futures[seq]
+            if len(self._deadlines) > 2 * len(self._futures):
+                self._compact()
+
+    def close(self, exception: BaseException) -> None:
+        """关闭存储，所有等待中以及之后的调用均以 `exception` 失败。
+
+        参数:
+            exception: 调用失败时抛出的异常
+        """
+        self._exception = exception
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._deadlines.clear()
+        for future in self._futures.values():
+            if not future.done():
+                future.set_exception(exception)
+
+    def _compact(self) -> None:
+        """移除已结束调用的截止时间，已结束的调用多于等待中的调用时执行。"""
+        self._deadlines = [
+            deadline for deadline in self._deadlines if deadline[1] in self._futures
+        ]
+        heapq.heapify(self._deadlines)
+        if not self._deadlines and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop) -> None:
+        if not self._deadlines:
+            return
+        deadline = self._deadlines[0][0]
+        if self._timer is not None:
+            if self._timer.when() <= deadline:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(deadline, self._expire, loop)
+
+    def _expire(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._timer = None
+        now = loop.time()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, seq = heapq.heappop(self._deadlines)
+            if (future := self._futures.get(seq)) and not future.done():
+                future.set_exception(asyncio.TimeoutError())
+        self._schedule(loop)
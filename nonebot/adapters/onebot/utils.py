@@ -9,12 +9,16 @@ import re
 from io import BytesIO
 from pathlib import Path
 from base64 import b64encode
+from functools import lru_cache
 from collections.abc import Iterable
-from typing import Union, Optional, Annotated
+from typing import Any, Union, Optional, Annotated
 
 from pydantic import AnyUrl
 from nonebot.utils import escape_tag
 from nonebot.compat import PYDANTIC_V2
+from nonebot.log import logger, logger_id
+
+from nonebot import get_driver
 
 RICH_REGEX = (
     r"\[(?P<type>[a-zA-Z0-9-_.]+)"
@@ -27,6 +31,7 @@ RICH_REGEX = (
     r")?"
     r"\]"
 )
+RICH_PATTERN = re.compile(RICH_REGEX)
 
 
 def rich_escape(s: str, escape_comma: bool = True) -> str:
@@ -58,7 +63,7 @@ def rich_unescape(s: str) -> str:
 
 def iter_rich_message(msg: str) -> Iterable[tuple[str, str]]:
     text_begin = 0
-    for segment in re.finditer(RICH_REGEX, msg):
+    for segment in RICH_PATTERN.finditer(msg):
         if pre_text := msg[text_begin : segment.pos + segment.start()]:
             yield "text", pre_text
 
@@ -78,6 +83,63 @@ def highlight_rich_message(msg: str) -> Iterable[str]:
             yield f"<le>{escape_tag(seg_str)}</le>"
 
 
+WS_CLOSED = "WebSocket connection closed"
+"""WebSocket 连接断开导致 API 调用失败时的错误原因"""
+
+
+def log_enabled(level: str) -> bool:
+    """判断指定等级的日志是否会被输出。
+
+    以 NoneBot 配置项 `log_level` 以及其他日志输出的最低等级作为判断依据，
+    用于在日志等级未启用时跳过日志内容的构造。
+
+    参数:
+        level: 日志等级名称
+    """
+    try:
+        log_level = get_driver().config.log_level
+    except ValueError:  # driver not initialized
+        return True
+    return _log_enabled(level, log_level, _sink_level())
+
+
+_sink_levels: tuple[Any, Optional[int]] = (None, None)
+"""上次检查的日志输出集合与其最低等级"""
+
+
+def _sink_level() -> Optional[int]:
+    """NoneBot 默认日志输出以外的日志输出的最低等级，没有其他输出时返回 `None`。"""
+    global _sink_levels
+    try:
+        handlers = logger._core.handlers  # type: ignore
+    except AttributeError:  # loguru 内部结构变化时视为全部输出
+        return 0
+    # loguru 添加或移除日志输出时替换整个字典，未替换时沿用上次的结果
+    cached, level = _sink_levels
+    if handlers is cached:
+        return level
+    level = min(
+        (handler.levelno for id, handler in handlers.items() if id != logger_id),
+        default=None,
+    )
+    _sink_levels = (handlers, level)
+    return level
+
+
+@lru_cache(maxsize=64)
+def _log_enabled(
+    level: str, log_level: Union[int, str], sink_level: Optional[int]
+) -> bool:
+    try:
+        levelno = logger.level(level).no
+        if isinstance(log_level, str):
+            log_level = logger.level(log_level).no
+    except ValueError:  # unknown custom level
+        return True
+    # NoneBot 默认输出按 log_level 过滤，其他输出按自身等级过滤
+    return levelno >= log_level or (sink_level is not None and levelno >= sink_level)
+
+
 def get_auth_bearer(access_token: Optional[str] = None) -> Optional[str]:
     if not access_token:
         return None
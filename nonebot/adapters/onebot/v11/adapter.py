@@ -6,12 +6,12 @@ FrontMatter:
 """
 
 import hmac
-import json
 import asyncio
 import inspect
 import contextlib
-from collections.abc import Generator
+from functools import partial
 from typing_extensions import override
+from collections.abc import Hashable, Generator
 from typing import Any, Union, Callable, Optional, cast
 
 from nonebot.exception import WebSocketClosed
@@ -31,18 +31,42 @@ from nonebot.drivers import (
 )
 
 from nonebot import get_plugin_config
+from nonebot.adapters import Bot as BaseBot
 from nonebot.adapters import Adapter as BaseAdapter
+from nonebot.adapters.onebot.flow import FlowControl
 from nonebot.adapters.onebot.collator import Collator
 from nonebot.adapters.onebot.store import ResultStore
-from nonebot.adapters.onebot.utils import get_auth_bearer
+from nonebot.adapters.onebot.balancer import EndpointPool
+from nonebot.adapters.onebot.codec import Codec, get_codec
+from nonebot.adapters.onebot.session import SessionManager
+from nonebot.adapters.onebot.scheduler import SendScheduler
+from nonebot.adapters.onebot.cache import MISSING, ResponseCache
+from nonebot.adapters.onebot.limiter import AIMDLimiter, is_idempotent
+from nonebot.adapters.onebot.liveness import LivenessTracker, is_subscribed
+from nonebot.adapters.onebot.utils import WS_CLOSED, log_enabled, get_auth_bearer
+from nonebot.adapters.onebot.dispatcher import (
+    Job,
+    EventPriority,
+    DispatchBacklog,
+    EventDispatcher,
+    match_event_name,
+    get_event_priority,
+)
 
 from . import event
 from .bot import Bot
 from .config import Config
-from .utils import log, handle_api_result
-from .event import Event, LifecycleMetaEvent
+from .directory import Directory
 from .message import Message, MessageSegment
-from .exception import NetworkError, ApiNotAvailable, OneBotV11AdapterException
+from .quick import QuickOperation, quick_operation
+from .utils import SEND_APIS, log, get_send_target, handle_api_result
+from .event import Event, MessageEvent, HeartbeatMetaEvent, LifecycleMetaEvent
+from .exception import (
+    ActionFailed,
+    NetworkError,
+    ApiNotAvailable,
+    OneBotV11AdapterException,
+)
 
 RECONNECT_INTERVAL = 3.0
 DEFAULT_MODELS: list[type[Event]] = []
@@ -53,6 +77,16 @@ for model_name in dir(event):
     DEFAULT_MODELS.append(model)
 
 
+class CustomEncoder(DataclassEncoder):
+    """OneBot V11 使用的 `JSONEncoder`"""
+
+    @override
+    def default(self, o):
+        if isinstance(o, MessageSegment):
+            return o.to_dict()
+        return super().default(o)
+
+
 class Adapter(BaseAdapter):
     event_models = Collator(
         "OneBot V11",
@@ -71,7 +105,64 @@ class Adapter(BaseAdapter):
         super().__init__(driver, **kwargs)
         self.onebot_config: Config = get_plugin_config(Config)
         """OneBot V11 配置"""
+        self.codec: Codec = get_codec(
+            self.onebot_config.onebot_codec, CustomEncoder().default
+        )
+        """OneBot V11 JSON 编解码器"""
+        self.api_roots: dict[str, EndpointPool[str]] = {
+            self_id: EndpointPool(
+                tuple(
+                    str(url).rstrip("/") + "/"
+                    for url in (urls if isinstance(urls, list) else [urls])
+                )
+            )
+            for self_id, urls in self.onebot_config.onebot_api_roots.items()
+        }
+        """各 Bot 的 HTTP API 请求地址"""
+        self.http_sessions: Optional[SessionManager] = None
+        """HTTP API 请求会话，仅在驱动器支持 HTTP 客户端时可用"""
+        self.response_cache: Optional[ResponseCache] = (
+            ResponseCache(
+                self.onebot_config.onebot_api_cache_ttl,
+                self.onebot_config.onebot_api_cache_size,
+            )
+            if self.onebot_config.onebot_api_cache_ttl
+            else None
+        )
+        """API 响应缓存，未配置缓存时间时不启用"""
+        self.directories: dict[str, Directory] = {}
+        """各 Bot 的联系人目录，仅在启用 `onebot_use_directory` 时可用"""
+        self.send_scheduler: Optional[SendScheduler] = (
+            SendScheduler(
+                self.onebot_config.onebot_send_rate_limits,
+                self.onebot_config.onebot_send_bursts,
+                self.onebot_config.onebot_send_queue_size,
+            )
+            if self.onebot_config.onebot_send_rate_limits
+            else None
+        )
+        """消息发送调度器，未配置发送速率限制时不启用"""
+        self.dispatcher: Optional[EventDispatcher] = (
+            EventDispatcher(
+                self.get_name(),
+                self.onebot_config.onebot_event_workers,
+                self.onebot_config.onebot_event_queue_size,
+                self.onebot_config.onebot_event_overflow,
+            )
+            if self.onebot_config.onebot_event_workers > 0
+            else None
+        )
+        """事件分发器，未配置 `onebot_event_workers` 时为每个事件创建任务"""
+        self.liveness = LivenessTracker()
+        """各 Bot 的心跳状态"""
+        self.limiters: dict[str, AIMDLimiter] = {}
+        """各 Bot 的 API 并发限制器，仅在配置 `onebot_api_max_concurrency` 时可用"""
         self.connections: dict[str, WebSocket] = {}
+        """各 Bot 的 WebSocket 连接，多连接时为其中最早建立的连接"""
+        self.connection_pools: dict[str, EndpointPool[WebSocket]] = {}
+        """各 Bot 的全部 WebSocket 连接，API 调用在其中负载均衡"""
+        self.result_stores: dict[WebSocket, ResultStore] = {}
+        """各 WebSocket 连接的 API 调用结果存储"""
         self.tasks: set["asyncio.Task"] = set()
         self._setup()
 
@@ -82,6 +173,26 @@ class Adapter(BaseAdapter):
         return "OneBot V11"
 
     def _setup(self) -> None:
+        if self.codec.name != self.onebot_config.onebot_codec:
+            log(
+                "WARNING",
+                f"Codec {self.onebot_config.onebot_codec} is not installed, "
+                f"fallback to {self.codec.name}",
+            )
+
+        if isinstance(self.driver, HTTPClientMixin):
+            headers = {"Content-Type": "application/json"}
+            if self.onebot_config.onebot_access_token is not None:
+                headers["Authorization"] = (
+                    "Bearer " + self.onebot_config.onebot_access_token
+                )
+            self.http_sessions = SessionManager(
+                self.get_name(),
+                self.driver,
+                headers,
+                self.onebot_config.onebot_api_http2,
+            )
+
         if isinstance(self.driver, ASGIMixin):
             http_setup = HTTPServerSetup(
                 URL("/onebot/v11/"),
@@ -158,63 +269,175 @@ class Adapter(BaseAdapter):
             return_exceptions=True,
         )
 
+        if self.dispatcher is not None:
+            await self.dispatcher.close()
+        if self.http_sessions is not None:
+            await self.http_sessions.close_all(self.config.api_timeout)
+
     @override
-    async def _call_api(self, bot: Bot, api: str, **data: Any) -> Any:
-        websocket = self.connections.get(bot.self_id, None)
-        timeout: float = data.get("_timeout", self.config.api_timeout)
-        log("DEBUG", f"Calling API <y>{api}</y>")
+    def bot_connect(self, bot: BaseBot) -> None:
+        super().bot_connect(bot)
+        # 预先建立 HTTP API 会话，首次调用无需等待会话创建
+        if self.http_sessions is not None:
+            for api_root in self.api_roots.get(bot.self_id, ()):
+                task = asyncio.create_task(self.http_sessions.open(api_root))
+                task.add_done_callback(self.tasks.discard)
+                self.tasks.add(task)
+        if self.onebot_config.onebot_use_directory:
+            directory = self.directories[bot.self_id] = Directory(
+                cast(Bot, bot), self.onebot_config.onebot_directory_ttl
+            )
+            directory.start()
 
-        if websocket:
-            seq = self._result_store.get_seq()
-            json_data = json.dumps(
-                {"action": api, "params": data, "echo": str(seq)},
-                cls=DataclassEncoder,
+    @override
+    def bot_disconnect(self, bot: BaseBot) -> None:
+        super().bot_disconnect(bot)
+        self.liveness.remove(bot.self_id)
+        self.limiters.pop(bot.self_id, None)
+        if (directory := self.directories.pop(bot.self_id, None)) is not None:
+            directory.close()
+        if self.response_cache is not None:
+            self.response_cache.invalidate(bot.self_id)
+        if self.send_scheduler is not None:
+            self.send_scheduler.remove(bot.self_id)
+        # 没有其他 Bot 使用该地址时关闭对应的会话
+        if self.http_sessions is not None and (
+            api_roots := self.api_roots.get(bot.self_id)
+        ):
+            in_use = {
+                api_root
+                for self_id in self.bots
+                for api_root in self.api_roots.get(self_id, ())
+            }
+            for api_root in api_roots:
+                if api_root in self.http_sessions and api_root not in in_use:
+                    task = asyncio.create_task(
+                        self.http_sessions.close(api_root, self.config.api_timeout)
+                    )
+                    task.add_done_callback(self.tasks.discard)
+                    self.tasks.add(task)
+
+    @override
+    async def _call_api(self, bot: Bot, api: str, **data: Any) -> Any:
+        if (
+            (directory := self.directories.get(bot.self_id)) is not None
+            and not data.get("no_cache")
+            and (result := directory.lookup(api, data)) is not MISSING
+        ):
+            return result
+        if self.send_scheduler is not None and api in SEND_APIS:
+            await self.send_scheduler.acquire(bot.self_id, get_send_target(api, data))
+        if (
+            api in SEND_APIS
+            and (operation := quick_operation.get()) is not None
+            and operation.claim(api, data)
+        ):
+            # 快速回复不返回消息 ID
+            return {}
+        request = partial(self._limited_request, bot, api, **data)
+        if self.response_cache is not None:
+            result = await self.response_cache.call(bot.self_id, api, data, request)
+        else:
+            result = await request()
+        if bot.message_history is not None:
+            bot.message_history.add_sent(bot.self_id, api, data, result)
+        return result
+
+    async def _limited_request(self, bot: Bot, api: str, **data: Any) -> Any:
+        """在 API 并发限制内请求 API，幂等 API 过载时重试。"""
+        request = partial(self._request_api, bot, api, **data)
+        if (limiter := self._get_limiter(bot.self_id)) is None:
+            return await request()
+        retries = self.onebot_config.onebot_api_retries if is_idempotent(api) else 0
+        return await limiter.call(request, self._is_overloaded, retries)
+
+    def _get_limiter(self, self_id: str) -> Optional[AIMDLimiter]:
+        if self.onebot_config.onebot_api_max_concurrency <= 0:
+            return None
+        if (limiter := self.limiters.get(self_id)) is None:
+            limiter = self.limiters[self_id] = AIMDLimiter(
+                self.onebot_config.onebot_api_max_concurrency
             )
-            await websocket.send(json_data)
-            try:
-                return handle_api_result(await self._result_store.fetch(seq, timeout))
-            except asyncio.TimeoutError:
-                raise NetworkError(f"WebSocket call api {api} timeout") from None
+        return limiter
+
+    def _is_overloaded(self, e: Exception) -> bool:
+        if isinstance(e, NetworkError):
+            # 连接断开不代表协议端过载
+            return e.msg != WS_CLOSED
+        return (
+            isinstance(e, ActionFailed)
+            and e.info.get("retcode") in self.onebot_config.onebot_api_overload_retcodes
+        )
 
-        elif isinstance(self.driver, HTTPClientMixin):
-            api_root = str(self.onebot_config.onebot_api_roots.get(bot.self_id))
-            if not api_root:
+    async def _request_api(self, bot: Bot, api: str, **data: Any) -> Any:
+        websockets = self.connection_pools.get(bot.self_id)
+        timeout: float = data.get("_timeout", self.config.api_timeout)
+        hedge = self.onebot_config.onebot_api_hedging and is_idempotent(api)
+        if log_enabled("DEBUG"):
+            log("DEBUG", f"Calling API <y>{api}</y>")
+
+        if websockets:
+            return await websockets.call(
+                partial(self._ws_request, api, data, timeout),
+                self._is_network_error,
+                hedge,
+            )
+        elif self.http_sessions is not None:
+            if not (api_roots := self.api_roots.get(bot.self_id)):
                 raise ApiNotAvailable
-            elif not api_root.endswith("/"):
-                api_root += "/"
+            return await api_roots.call(
+                partial(self._http_request, api, data, timeout),
+                self._is_network_error,
+                hedge,
+            )
+        else:
+            raise ApiNotAvailable
 
-            headers = {"Content-Type": "application/json"}
-            if self.onebot_config.onebot_access_token is not None:
-                headers["Authorization"] = (
-                    "Bearer " + self.onebot_config.onebot_access_token
-                )
+    async def _ws_request(
+        self, api: str, data: dict[str, Any], timeout: float, websocket: WebSocket
+    ) -> Any:
+        if not (result_store := self.result_stores.get(websocket)):
+            raise NetworkError(WS_CLOSED)
+        seq = result_store.get_seq()
+        json_data = self.codec.dumps({"action": api, "params": data, "echo": str(seq)})
+        await websocket.send(json_data)
+        try:
+            return handle_api_result(await result_store.fetch(seq, timeout))
+        except asyncio.TimeoutError:
+            raise NetworkError(f"WebSocket call api {api} timeout") from None
+
+    async def _http_request(
+        self, api: str, data: dict[str, Any], timeout: float, api_root: str
+    ) -> Any:
+        assert self.http_sessions is not None
+        request = Request(
+            "POST",
+            api_root + api,
+            timeout=timeout,
+            content=self.codec.dumps(data),
+        )
 
-            request = Request(
-                "POST",
-                api_root + api,
-                headers=headers,
-                timeout=timeout,
-                content=json.dumps(data, cls=DataclassEncoder),
+        try:
+            async with self.http_sessions.use(api_root) as session:
+                response = await session.request(request)
+
+            if 200 <= response.status_code < 300:
+                if not response.content:
+                    raise ValueError("Empty response")
+                result = self.codec.loads(response.content)
+                return handle_api_result(result)
+            raise NetworkError(
+                f"HTTP request received unexpected "
+                f"status code: {response.status_code}"
             )
+        except OneBotV11AdapterException:
+            raise
+        except Exception as e:
+            raise NetworkError("HTTP request failed") from e
 
-            try:
-                response = await self.driver.request(request)
-
-                if 200 <= response.status_code < 300:
-                    if not response.content:
-                        raise ValueError("Empty response")
-                    result = json.loads(response.content)
-                    return handle_api_result(result)
-                raise NetworkError(
-                    f"HTTP request received unexpected "
-                    f"status code: {response.status_code}"
-                )
-            except OneBotV11AdapterException:
-                raise
-            except Exception as e:
-                raise NetworkError("HTTP request failed") from e
-        else:
-            raise ApiNotAvailable
+    @staticmethod
+    def _is_network_error(e: Exception) -> bool:
+        return isinstance(e, NetworkError)
 
     async def _handle_http(self, request: Request) -> Response:
         self_id = request.headers.get("x-self-id")
@@ -230,20 +453,57 @@ class Adapter(BaseAdapter):
             return response
 
         if data := request.content:
-            json_data = json.loads(data)
+            json_data = self.codec.loads(data)
+            if self._is_ignored(json_data):
+                return Response(204)
             if event := self.json_to_event(json_data):
                 if not (bot := self.bots.get(self_id, None)):
                     bot = Bot(self, self_id)
                     self.bot_connect(bot)
                     log("INFO", f"<y>Bot {escape_tag(self_id)}</y> connected")
                 bot = cast(Bot, bot)
-                task = asyncio.create_task(bot.handle_event(event))
-                task.add_done_callback(self.tasks.discard)
-                self.tasks.add(task)
+                if (
+                    self.onebot_config.onebot_quick_operation_timeout > 0
+                    and isinstance(event, MessageEvent)
+                    # 快速回复不返回消息 ID，无法记录到近期消息中
+                    and bot.message_history is None
+                ):
+                    return await self._handle_quick_operation(bot, event)
+                await self._dispatch(bot, event)
         else:
             return Response(400, content="Invalid request body")
         return Response(204)
 
+    async def _handle_quick_operation(self, bot: Bot, event: MessageEvent) -> Response:
+        """处理事件并等待首次回复，作为快速操作返回。"""
+        operation = QuickOperation(event)
+        handled = asyncio.get_running_loop().create_future()
+
+        async def _handle() -> None:
+            token = quick_operation.set(operation)
+            try:
+                await bot.handle_event(event)
+            finally:
+                quick_operation.reset(token)
+                if not handled.done():
+                    handled.set_result(None)
+
+        if not await self._dispatch(bot, event, handle=_handle):
+            return Response(204)
+        # 事件处理结束或超时后仍未回复时，之后的回复通过 API 发送
+        await asyncio.wait(
+            (operation.future, handled),
+            timeout=self.onebot_config.onebot_quick_operation_timeout,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if (content := operation.close()) is None:
+            return Response(204)
+        return Response(
+            200,
+            headers={"Content-Type": "application/json"},
+            content=self.codec.dumps(content),
+        )
+
     async def _handle_ws(self, websocket: WebSocket) -> None:
         self_id = websocket.request.headers.get("x-self-id")
 
@@ -252,7 +512,7 @@ class Adapter(BaseAdapter):
             log("WARNING", "Missing X-Self-ID Header")
             await websocket.close(1008, "Missing X-Self-ID Header")
             return
-        elif self_id in self.bots:
+        elif self_id in self.bots and not self.onebot_config.onebot_multi_connection:
             log("WARNING", f"There's already a bot {self_id}, ignored")
             await websocket.close(1008, "Duplicate X-Self-ID")
             return
@@ -265,20 +525,29 @@ class Adapter(BaseAdapter):
             return
 
         await websocket.accept()
-        bot = Bot(self, self_id)
-        self.bot_connect(bot)
-        self.connections[self_id] = websocket
-
-        log("INFO", f"<y>Bot {escape_tag(self_id)}</y> connected")
+        if (bot := cast(Optional[Bot], self.bots.get(self_id))) is None:
+            bot = Bot(self, self_id)
+            self.bot_connect(bot)
+            log("INFO", f"<y>Bot {escape_tag(self_id)}</y> connected")
+        else:
+            log("INFO", f"<y>Bot {escape_tag(self_id)}</y> added a connection")
+        self._add_connection(self_id, websocket)
+        result_store = self.result_stores[websocket] = ResultStore()
+        flow = self._get_flow_control(result_store)
+        backlog = DispatchBacklog(
+            self.onebot_config.onebot_ws_backlog_size, result_store
+        )
 
         try:
             while True:
+                if flow is not None:
+                    await flow.wait()
                 data = await websocket.receive()
-                json_data = json.loads(data)
-                if event := self.json_to_event(json_data):
-                    task = asyncio.create_task(bot.handle_event(event))
-                    task.add_done_callback(self.tasks.discard)
-                    self.tasks.add(task)
+                json_data = self.codec.loads(data)
+                if self._is_ignored(json_data):
+                    continue
+                if event := self.json_to_event(json_data, result_store=result_store):
+                    await self._dispatch(bot, event, flow, backlog)
         except WebSocketClosed:
             log("WARNING", f"WebSocket for Bot {escape_tag(self_id)} closed by peer")
         except Exception as e:
@@ -291,8 +560,10 @@ class Adapter(BaseAdapter):
         finally:
             with contextlib.suppress(Exception):
                 await websocket.close()
-            self.connections.pop(self_id, None)
-            self.bot_disconnect(bot)
+            await backlog.close()
+            self._close_result_store(websocket)
+            if not self._remove_connection(self_id, websocket):
+                self.bot_disconnect(bot)
 
     def _check_signature(self, request: Request) -> Optional[Response]:
         x_signature = request.headers.get("x-signature")
@@ -345,11 +616,23 @@ class Adapter(BaseAdapter):
                         "DEBUG",
                         f"WebSocket Connection to {escape_tag(str(url))} established",
                     )
+                    result_store = self.result_stores[ws] = ResultStore()
+                    flow = self._get_flow_control(result_store)
+                    backlog = DispatchBacklog(
+                        self.onebot_config.onebot_ws_backlog_size, result_store
+                    )
                     try:
                         while True:
+                            if flow is not None:
+                                await flow.wait()
                             data = await ws.receive()
-                            json_data = json.loads(data)
-                            event = self.json_to_event(json_data)
+                            json_data = self.codec.loads(data)
+                            # lifecycle event is required to setup the bot
+                            if bot and self._is_ignored(json_data):
+                                continue
+                            event = self.json_to_event(
+                                json_data, result_store=result_store
+                            )
                             if not event:
                                 continue
                             if not bot:
@@ -358,17 +641,8 @@ class Adapter(BaseAdapter):
                                     or event.sub_type != "connect"
                                 ):
                                     continue
-                                self_id = event.self_id
-                                bot = Bot(self, str(self_id))
-                                self.bot_connect(bot)
-                                self.connections[str(self_id)] = ws
-                                log(
-                                    "INFO",
-                                    f"<y>Bot {escape_tag(str(self_id))}</y> connected",
-                                )
-                            task = asyncio.create_task(bot.handle_event(event))
-                            task.add_done_callback(self.tasks.discard)
-                            self.tasks.add(task)
+                                bot = self._connect_forward(str(event.self_id), ws)
+                            await self._dispatch(bot, event, flow, backlog)
                     except WebSocketClosed as e:
                         log(
                             "ERROR",
@@ -387,9 +661,11 @@ class Adapter(BaseAdapter):
                             e,
                         )
                     finally:
+                        await backlog.close()
+                        self._close_result_store(ws)
                         if bot:
-                            self.connections.pop(bot.self_id, None)
-                            self.bot_disconnect(bot)
+                            if not self._remove_connection(bot.self_id, ws):
+                                self.bot_disconnect(bot)
                             bot = None
 
             except Exception as e:
@@ -402,6 +678,183 @@ class Adapter(BaseAdapter):
 
             await asyncio.sleep(RECONNECT_INTERVAL)
 
+    def _connect_forward(self, self_id: str, websocket: WebSocket) -> Bot:
+        """正向 WebSocket 收到连接事件时连接 Bot，允许多连接时复用已连接的 Bot。"""
+        bot = cast(Optional[Bot], self.bots.get(self_id))
+        if bot is None or not self.onebot_config.onebot_multi_connection:
+            self.connections.pop(self_id, None)
+            self.connection_pools.pop(self_id, None)
+            bot = Bot(self, self_id)
+            self.bot_connect(bot)
+            log("INFO", f"<y>Bot {escape_tag(self_id)}</y> connected")
+        else:
+            log("INFO", f"<y>Bot {escape_tag(self_id)}</y> added a connection")
+        self._add_connection(self_id, websocket)
+        return bot
+
+    def _add_connection(self, self_id: str, websocket: WebSocket) -> None:
+        self.connection_pools.setdefault(self_id, EndpointPool()).add(websocket)
+        self.connections.setdefault(self_id, websocket)
+
+    def _remove_connection(self, self_id: str, websocket: WebSocket) -> int:
+        """移除 Bot 的 WebSocket 连接，返回剩余连接数。"""
+        if (websockets := self.connection_pools.get(self_id)) is None:
+            return 0
+        if not (remaining := websockets.remove(websocket)):
+            del self.connection_pools[self_id]
+            self.connections.pop(self_id, None)
+        elif self.connections.get(self_id) is websocket:
+            self.connections[self_id] = next(iter(websockets))
+        return remaining
+
+    def _close_result_store(self, websocket: WebSocket) -> None:
+        """连接断开时使该连接上所有等待中的 API 调用立即失败。"""
+        if result_store := self.result_stores.pop(websocket, None):
+            result_store.close(NetworkError(WS_CLOSED))
+
+    async def _dispatch(
+        self,
+        bot: Bot,
+        event: Event,
+        flow: Optional[FlowControl] = None,
+        backlog: Optional[DispatchBacklog] = None,
+        handle: Optional[Job] = None,
+    ) -> bool:
+        """分发事件，队列已满时按配置等待或丢弃，事件被丢弃时返回 `False`。
+
+        WebSocket 连接传入 `backlog` 时，暂停读取期间读取到的事件
+        与需要等待队列空位的事件在其中排队，读取协程得以继续读取 API 调用结果。
+
+        参数:
+            handle: 处理事件的函数，默认为 `bot.handle_event`
+        """
+        if (directory := self.directories.get(bot.self_id)) is not None:
+            # 在排队与丢弃前更新目录，未被处理的事件同样生效
+            directory.update(event)
+        if self.onebot_config.onebot_use_directory and match_event_name(
+            event.get_event_name(), self.onebot_config.onebot_ignored_events
+        ):
+            return False
+        if isinstance(event, HeartbeatMetaEvent):
+            # 心跳在适配器内记录，不为无人处理的心跳创建任务
+            self.liveness.beat(bot.self_id, event.interval, event.status.good)
+            if not self._forward_heartbeat(event):
+                return False
+
+        if handle is None:
+            handle = partial(bot.handle_event, event)
+        dispatcher = self.dispatcher
+        droppable = match_event_name(
+            event.get_event_name(), self.onebot_config.onebot_event_droppable
+        )
+        priority = self._get_priority(event)
+
+        async def _enqueue() -> bool:
+            job = handle
+            if flow is not None:
+                await flow.acquire()
+                job = flow.track(handle)
+            if dispatcher is None:
+                task = asyncio.create_task(job())
+                task.add_done_callback(self.tasks.discard)
+                self.tasks.add(task)
+                return True
+            if await dispatcher.dispatch(
+                job,
+                droppable,
+                self._get_order_key(bot, event),
+                flow.release if flow is not None else None,
+                priority,
+            ):
+                return True
+            log("DEBUG", f"Event queue is full, dropped {event.get_event_name()}")
+            return False
+
+        if backlog is not None and (
+            backlog
+            or (flow is not None and flow.check())
+            or (dispatcher is not None and dispatcher.blocking(droppable, priority))
+        ):
+            if await backlog.put(_enqueue):
+                return True
+            log(
+                "WARNING",
+                "Event backlog is full while waiting for API results, "
+                f"dropped {event.get_event_name()}",
+            )
+            return False
+        return await _enqueue()
+
+    def _forward_heartbeat(self, event: Event) -> bool:
+        """心跳事件是否交给 NoneBot 处理，没有事件响应器与事件处理函数时跳过。"""
+        return self.onebot_config.onebot_forward_heartbeat or is_subscribed(
+            event.get_type()
+        )
+
+    def _get_flow_control(self, result_store: ResultStore) -> Optional[FlowControl]:
+        """创建 WebSocket 连接的读取流量控制，未配置高水位时不启用。"""
+        if (high := self.onebot_config.onebot_ws_high_water) <= 0:
+            return None
+        low = self.onebot_config.onebot_ws_low_water
+        return FlowControl(high, high // 2 if low is None else low, result_store)
+
+    def _get_priority(self, event: Event) -> EventPriority:
+        """获取事件优先级，私聊和提及 Bot 的消息优先于其他消息。"""
+        priority = get_event_priority(
+            event.get_event_name(), self.onebot_config.onebot_event_priorities
+        )
+        if priority == EventPriority.MESSAGE and self._is_mention(event):
+            return EventPriority.MENTION
+        return priority
+
+    @staticmethod
+    def _is_mention(event: Event) -> bool:
+        """消息事件是否为私聊或 @Bot 的消息。"""
+        if not isinstance(event, MessageEvent):
+            return False
+        if event.message_type == "private":
+            return True
+        # to_me 在事件处理前才检查，这里检查原始消息
+        self_id = str(event.self_id)
+        return any(
+            segment.type == "at" and str(segment.data.get("qq")) == self_id
+            for segment in event.original_message
+        )
+
+    def _get_order_key(self, bot: Bot, event: Event) -> Optional[Hashable]:
+        """获取事件的会话键，没有会话的事件不保证处理顺序。"""
+        ordering = self.onebot_config.onebot_event_ordering
+        if ordering is None:
+            return None
+        if ordering == "group" and (group_id := getattr(event, "group_id", None)):
+            return (bot.self_id, "group", group_id)
+        try:
+            return (bot.self_id, event.get_session_id())
+        except ValueError:
+            return None
+
+    def _is_ignored(self, json_data: Any) -> bool:
+        """根据路由键判断是否在完整解析前丢弃事件。
+
+        仅读取 `post_type` 等路由字段拼接事件名称，API 调用返回数据不会被丢弃。
+        """
+        ignored = self.onebot_config.onebot_ignored_events
+        if not ignored or not isinstance(json_data, dict):
+            return False
+
+        name = ""
+        matched = False
+        for value in self.event_models.peek(json_data):
+            if not value:
+                break
+            name = f"{name}.{value}" if name else str(value)
+            matched = matched or name in ignored
+        # 联系人目录依赖的事件仍需解析，更新目录后再丢弃
+        return matched and not (
+            self.onebot_config.onebot_use_directory
+            and match_event_name(name, Directory.events)
+        )
+
     @classmethod
     def add_custom_model(cls, *model: type[Event]) -> None:
         """插入或覆盖一个自定义的 Event 类型。
@@ -419,14 +872,16 @@ class Adapter(BaseAdapter):
         yield from cls.event_models.get_model(data)
 
     @classmethod
-    def json_to_event(cls, json_data: Any) -> Optional[Event]:
+    def json_to_event(
+        cls, json_data: Any, *, result_store: Optional[ResultStore] = None
+    ) -> Optional[Event]:
         """将 json 数据转换为 Event 对象。
 
-        如果为 API 调用返回数据且提供了 Event 对应 Bot，则将数据存入 ResultStore。
+        如果为 API 调用返回数据，则将数据存入 ResultStore。
 
         参数:
             json_data: json 数据
-            self_id: 当前 Event 对应的 Bot
+            result_store: 数据所属连接的 ResultStore，未提供时使用适配器默认存储
 
         返回:
             Event 对象，如果解析失败或为 API 调用返回数据，则返回 None
@@ -435,17 +890,17 @@ class Adapter(BaseAdapter):
             return None
 
         if "post_type" not in json_data:
-            cls._result_store.add_result(json_data)
+            (result_store or cls._result_store).add_result(json_data)
             return
 
         try:
-            for model in cls.get_event_model(json_data):
+            event = None
+            if validator := cls.event_models.get_validator(json_data):
                 try:
-                    event = type_validate_python(model, json_data)
-                    break
+                    event = validator.validate_python(json_data)
                 except Exception as e:
                     log("DEBUG", "Event Parser Error", e)
-            else:
+            if event is None:
                 event = type_validate_python(Event, json_data)
 
             return event
@@ -6,17 +6,50 @@ FrontMatter:
 """
 
 import re
+from copy import deepcopy
+from itertools import islice
 from typing_extensions import override
-from typing import Any, Union, Callable
+from typing import TYPE_CHECKING, Any, Union, Callable, Optional
 
 from nonebot.message import handle_event
 from nonebot.compat import model_dump, type_validate_python
 
 from nonebot.adapters import Bot as BaseBot
+from nonebot.adapters.onebot.scheduler import SendPriority, use_priority
 
 from .utils import log
-from .message import Message, MessageSegment
+from .history import MessageHistory
 from .event import Event, Reply, MessageEvent
+from .message import Message, MessageSegment
+
+if TYPE_CHECKING:
+    from .adapter import Adapter
+
+
+def _copy_on_write(event: MessageEvent) -> None:
+    """在修改消息段前，复制 `event.message` 中与 `event.original_message` 共享的消息段。
+
+    参数:
+        event: MessageEvent 对象
+    """
+    shared = {id(seg) for seg in event.original_message}
+    for index, seg in enumerate(event.message):
+        if id(seg) in shared:
+            event.message[index] = MessageSegment(seg.type, deepcopy(seg.data))
+
+
+def _reduce(event: MessageEvent) -> None:
+    """合并 `event.message` 内连续的纯文本段。
+
+    参数:
+        event: MessageEvent 对象
+    """
+    if any(
+        prev.type == "text" and seg.type == "text"
+        for prev, seg in zip(event.message, islice(event.message, 1, None))
+    ):
+        _copy_on_write(event)
+        event.message.reduce()
 
 
 async def _check_reply(bot: "Bot", event: MessageEvent) -> None:
@@ -32,13 +65,22 @@ async def _check_reply(bot: "Bot", event: MessageEvent) -> None:
         return
     msg_seg = event.message[index]
     try:
-        event.reply = type_validate_python(
-            Reply, await bot.get_msg(message_id=int(msg_seg.data["id"]))
+        message_id = int(msg_seg.data["id"])
+        reply = (
+            bot.message_history.get(message_id)
+            if bot.message_history is not None
+            else None
         )
+        if reply is None:
+            reply = type_validate_python(
+                Reply, await bot.get_msg(message_id=message_id)
+            )
+        event.reply = reply
     except Exception as e:
         log("WARNING", f"Error when getting message reply info: {e!r}")
         return
 
+    _copy_on_write(event)
     if event.reply.sender.user_id is not None:
         # ensure string comparation
         if str(event.reply.sender.user_id) == str(event.self_id):
@@ -73,6 +115,7 @@ def _check_at_me(bot: "Bot", event: MessageEvent) -> None:
 
     # ensure message not empty
     if not event.message:
+        _copy_on_write(event)
         event.message.append(MessageSegment.text(""))
 
     if event.message_type == "private":
@@ -87,6 +130,7 @@ def _check_at_me(bot: "Bot", event: MessageEvent) -> None:
         # check the first segment
         if _is_at_me_seg(event.message[0]):
             event.to_me = True
+            _copy_on_write(event)
             event.message.pop(0)
             if event.message and event.message[0].type == "text":
                 event.message[0].data["text"] = event.message[0].data["text"].lstrip()
@@ -115,6 +159,7 @@ def _check_at_me(bot: "Bot", event: MessageEvent) -> None:
 
             if _is_at_me_seg(last_msg_seg):
                 event.to_me = True
+                _copy_on_write(event)
                 del event.message[i:]
 
         if not event.message:
@@ -142,7 +187,8 @@ def _check_nickname(bot: "Bot", event: MessageEvent) -> None:
     if m := re.search(rf"^({nickname_regex})([\s,，]*|$)", first_text, re.IGNORECASE):
         log("DEBUG", f"User is calling me {m[1]}")
         event.to_me = True
-        first_msg_seg.data["text"] = first_text[m.end() :]
+        _copy_on_write(event)
+        event.message[0].data["text"] = first_text[m.end() :]
 
 
 async def send(
@@ -195,14 +241,30 @@ class Bot(BaseBot):
     OneBot v11 协议 Bot 适配。
     """
 
+    adapter: "Adapter"
+
     send_handler: Callable[["Bot", Event, Union[str, Message, MessageSegment]], Any] = (
         send
     )
 
+    def __init__(self, adapter: "Adapter", self_id: str):
+        super().__init__(adapter, self_id)
+        config = adapter.onebot_config
+        self.message_history: Optional[MessageHistory] = (
+            MessageHistory(
+                config.onebot_reply_cache_size, config.onebot_reply_cache_ttl
+            )
+            if config.onebot_reply_cache_size > 0
+            else None
+        )
+        """近期收发消息记录，未配置 `onebot_reply_cache_size` 时不启用"""
+
     async def handle_event(self, event: Event) -> None:
         """处理收到的事件。"""
         if isinstance(event, MessageEvent):
-            event.message.reduce()
+            if self.message_history is not None:
+                self.message_history.add_event(event)
+            _reduce(event)
             await _check_reply(self, event)
             _check_at_me(self, event)
             _check_nickname(self, event)
@@ -234,4 +296,5 @@ class Bot(BaseBot):
             NetworkError: 网络错误
             ActionFailed: API 调用失败
         """
-        return await self.__class__.send_handler(self, event, message, **kwargs)
+        with use_priority(SendPriority.INTERACTIVE):
+            return await self.__class__.send_handler(self, event, message, **kwargs)
@@ -5,12 +5,19 @@ FrontMatter:
     description: onebot.v11.config 模块
 """
 
-from typing import Optional
+from typing import Union, Optional
 
 from pydantic import Field, AnyUrl, BaseModel
 from nonebot.compat import PYDANTIC_V2, ConfigDict
 
 from nonebot.adapters.onebot.utils import WSUrl
+from nonebot.adapters.onebot.codec import CodecName
+from nonebot.adapters.onebot.scheduler import LimitScope
+from nonebot.adapters.onebot.dispatcher import (
+    EventOrdering,
+    EventPriority,
+    OverflowPolicy,
+)
 
 
 class Config(BaseModel):
@@ -24,10 +31,99 @@ class Config(BaseModel):
     """OneBot HTTP 上报数据签名口令"""
     onebot_ws_urls: set[WSUrl] = Field(default_factory=set, alias="onebot_v11_ws_urls")
     """OneBot 正向 Websocket 连接目标 URL 集合"""
-    onebot_api_roots: dict[str, AnyUrl] = Field(
+    onebot_api_roots: dict[str, Union[AnyUrl, list[AnyUrl]]] = Field(
         default_factory=dict, alias="onebot_v11_api_roots"
     )
-    """OneBot HTTP API 请求地址字典"""
+    """OneBot HTTP API 请求地址字典，同一 Bot 可以配置多个地址"""
+    onebot_api_hedging: bool = Field(default=False, alias="onebot_v11_api_hedging")
+    """只读 API 在最近调用耗时的 p95 内未返回时，向另一个地址或连接再次请求"""
+    onebot_multi_connection: bool = Field(
+        default=False, alias="onebot_v11_multi_connection"
+    )
+    """允许同一 Bot 同时使用多个 WebSocket 连接，API 调用在连接间负载均衡"""
+    onebot_api_http2: bool = Field(default=False, alias="onebot_v11_api_http2")
+    """HTTP API 请求使用 HTTP/2，驱动器不支持时回退至 HTTP/1.1"""
+    onebot_api_cache_ttl: dict[str, float] = Field(
+        default_factory=dict, alias="onebot_v11_api_cache_ttl"
+    )
+    """API 响应缓存时间（秒），键为 API 名称，为空时不启用缓存"""
+    onebot_api_cache_size: int = Field(default=1024, alias="onebot_v11_api_cache_size")
+    """API 响应缓存最大条目数"""
+    onebot_api_max_concurrency: int = Field(
+        default=0, alias="onebot_v11_api_max_concurrency"
+    )
+    """每个 Bot 同时进行的 API 调用数上限，过载时自动缩小，为 0 时不限制"""
+    onebot_api_overload_retcodes: set[int] = Field(
+        default_factory=set, alias="onebot_v11_api_overload_retcodes"
+    )
+    """视为过载的 API 错误码，网络错误始终视为过载"""
+    onebot_api_retries: int = Field(default=0, alias="onebot_v11_api_retries")
+    """幂等 API（`get_`、`can_` 开头）过载时的自动重试次数，需启用并发限制"""
+    onebot_use_directory: bool = Field(default=False, alias="onebot_v11_use_directory")
+    """在 Bot 连接时拉取群组、好友等联系人目录，并根据通知事件增量更新"""
+    onebot_directory_ttl: float = Field(default=3600, alias="onebot_v11_directory_ttl")
+    """目录中的列表超过该时间（秒）后在查询时重新拉取，为 0 时仅依赖事件更新"""
+    onebot_send_rate_limits: dict[LimitScope, float] = Field(
+        default_factory=dict, alias="onebot_v11_send_rate_limits"
+    )
+    """发送消息速率限制（条/秒），键为 `bot`, `group`, `user`，为空时不启用发送调度"""
+    onebot_send_bursts: dict[LimitScope, int] = Field(
+        default_factory=dict, alias="onebot_v11_send_bursts"
+    )
+    """各范围允许的突发消息数，默认为 1"""
+    onebot_send_queue_size: int = Field(default=100, alias="onebot_v11_send_queue_size")
+    """每个 Bot 各优先级等待发送的最大消息数，队列已满时调用方等待"""
+    onebot_reply_cache_size: int = Field(default=0, alias="onebot_v11_reply_cache_size")
+    """本地记录的近期收发消息条数，用于构造回复信息，为 0 时每次调用 `get_msg`"""
+    onebot_reply_cache_ttl: float = Field(
+        default=600, alias="onebot_v11_reply_cache_ttl"
+    )
+    """近期收发消息的保留时间（秒）"""
+    onebot_quick_operation_timeout: float = Field(
+        default=0, alias="onebot_v11_quick_operation_timeout"
+    )
+    """HTTP 上报时等待回复作为快速操作返回的最长时间（秒），为 0 时不启用"""
+    onebot_ignored_events: set[str] = Field(
+        default_factory=set, alias="onebot_v11_ignored_events"
+    )
+    """在解析前丢弃的事件名称集合，按事件名称前缀匹配，如 `notice.group_upload`"""
+    onebot_event_workers: int = Field(default=0, alias="onebot_v11_event_workers")
+    """处理事件的工作协程数，为 0 时每个事件创建一个任务"""
+    onebot_event_queue_size: int = Field(
+        default=1000, alias="onebot_v11_event_queue_size"
+    )
+    """等待处理的事件队列长度，为 0 时不限制"""
+    onebot_event_overflow: OverflowPolicy = Field(
+        default="block", alias="onebot_v11_event_overflow"
+    )
+    """事件队列已满时的处理策略"""
+    onebot_event_droppable: set[str] = Field(
+        default_factory=set, alias="onebot_v11_event_droppable"
+    )
+    """事件队列已满时直接丢弃的事件名称集合，按事件名称前缀匹配"""
+    onebot_event_ordering: Optional[EventOrdering] = Field(
+        default=None, alias="onebot_v11_event_ordering"
+    )
+    """同一会话或群组的事件依次处理，需要配置 `onebot_event_workers`"""
+    onebot_event_priorities: dict[str, EventPriority] = Field(
+        default_factory=dict, alias="onebot_v11_event_priorities"
+    )
+    """按事件名称前缀覆盖事件优先级，值越小越优先，需要配置 `onebot_event_workers`"""
+    onebot_ws_backlog_size: int = Field(default=100, alias="onebot_v11_ws_backlog_size")
+    """WebSocket 连接上等待事件队列空位的事件数上限，达到上限时暂停读取，
+    有等待结果的 API 调用时丢弃新事件"""
+    onebot_ws_high_water: int = Field(default=0, alias="onebot_v11_ws_high_water")
+    """WebSocket 连接正在处理的事件数达到该值时暂停读取，为 0 时不限制"""
+    onebot_ws_low_water: Optional[int] = Field(
+        default=None, alias="onebot_v11_ws_low_water"
+    )
+    """暂停读取后恢复读取的正在处理事件数，默认为高水位的一半"""
+    onebot_forward_heartbeat: bool = Field(
+        default=False, alias="onebot_v11_forward_heartbeat"
+    )
+    """始终将心跳事件交给 NoneBot 处理，默认仅在有事件响应器处理元事件时处理"""
+    onebot_codec: CodecName = Field(default="json", alias="onebot_v11_codec")
+    """OneBot JSON 编解码器，可选 `json`, `orjson`, `msgspec`，未安装时回退至 `json`"""
 
     if PYDANTIC_V2:
         model_config = ConfigDict(populate_by_name=True)
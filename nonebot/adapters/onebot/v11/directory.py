@@ -0,0 +1,162 @@
+"""OneBot v11 联系人目录。
+
+FrontMatter:
+    sidebar_position: 10
+    description: onebot.v11.directory 模块
+"""
+
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from nonebot.adapters.onebot.cache import MISSING
+from nonebot.adapters.onebot.directory import Table
+from nonebot.adapters.onebot.directory import Directory as BaseDirectory
+
+from .event import (
+    Event,
+    GroupMessageEvent,
+    FriendAddNoticeEvent,
+    GroupAdminNoticeEvent,
+    GroupDecreaseNoticeEvent,
+    GroupIncreaseNoticeEvent,
+)
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+class Directory(BaseDirectory["Bot"]):
+    """OneBot v11 群组、群成员与好友目录。
+
+    提供以下 API 的查询结果:
+
+    - `get_group_list`
+    - `get_group_info`
+    - `get_group_member_list`
+    - `get_group_member_info`
+    - `get_friend_list`
+    """
+
+    events = frozenset(
+        (
+            "notice.group_increase",
+            "notice.group_decrease",
+            "notice.group_admin",
+            "notice.friend_add",
+        )
+    )
+
+    def __init__(self, bot: "Bot", ttl: float = 0) -> None:
+        super().__init__(bot, "OneBot V11", ttl)
+        self.groups = Table(ttl)
+        self.members: dict[int, Table] = {}
+        self.friends = Table(ttl)
+
+    async def warm(self) -> None:
+        await self._run(self._warm_groups())
+        await self._run(self.load_friends())
+
+    async def _warm_groups(self) -> None:
+        await self.load_groups()
+        for group_id in list(self.groups.records):
+            await self.load_members(group_id)
+
+    async def load_groups(self) -> None:
+        self.invalidate("get_group_list")
+        self.groups.fill(await self.fetch("get_group_list"), "group_id")
+
+    async def load_group(self, group_id: int) -> None:
+        self.invalidate("get_group_list")
+        self.invalidate("get_group_info", group_id=group_id)
+        group = await self.fetch("get_group_info", group_id=group_id)
+        self.groups.put(group_id, group)
+        await self.load_members(group_id)
+
+    async def load_members(self, group_id: int) -> None:
+        self.invalidate("get_group_member_list", group_id=group_id)
+        members = await self.fetch("get_group_member_list", group_id=group_id)
+        self.members.setdefault(group_id, Table(self.ttl)).fill(members, "user_id")
+
+    async def load_member(self, group_id: int, user_id: int) -> None:
+        self._invalidate_member(group_id, user_id)
+        member = await self.fetch(
+            "get_group_member_info", group_id=group_id, user_id=user_id
+        )
+        if (table := self.members.get(group_id)) is not None:
+            table.put(user_id, member)
+
+    async def load_friends(self) -> None:
+        self.invalidate("get_friend_list")
+        self.friends.fill(await self.fetch("get_friend_list"), "user_id")
+
+    def lookup(self, api: str, params: dict[str, Any]) -> Any:
+        try:
+            if api == "get_group_list":
+                return self.read_list(self.groups, self.load_groups)
+            elif api == "get_group_info":
+                return self.read(self.groups, int(params["group_id"]), self.load_groups)
+            elif api == "get_friend_list":
+                return self.read_list(self.friends, self.load_friends)
+            elif api in ("get_group_member_list", "get_group_member_info"):
+                group_id = int(params["group_id"])
+                if (table := self.members.get(group_id)) is None:
+                    return MISSING
+                reload = partial(self.load_members, group_id)
+                if api == "get_group_member_list":
+                    return self.read_list(table, reload)
+                return self.read(table, int(params["user_id"]), reload)
+        except (KeyError, TypeError, ValueError):
+            pass
+        return MISSING
+
+    def update(self, event: Event) -> None:
+        if isinstance(event, GroupMessageEvent):
+            self._update_sender(event)
+        elif isinstance(event, GroupIncreaseNoticeEvent):
+            if event.user_id == event.self_id:
+                self.spawn(self.load_group(event.group_id))
+            else:
+                self.spawn(self.load_member(event.group_id, event.user_id))
+        elif isinstance(event, GroupDecreaseNoticeEvent):
+            if event.user_id == event.self_id or event.sub_type == "kick_me":
+                self._remove_group(event.group_id)
+            else:
+                self._remove_member(event.group_id, event.user_id)
+        elif isinstance(event, GroupAdminNoticeEvent):
+            if (table := self.members.get(event.group_id)) is not None:
+                role = "admin" if event.sub_type == "set" else "member"
+                table.update(event.user_id, role=role)
+                self._invalidate_member(event.group_id, event.user_id)
+        elif isinstance(event, FriendAddNoticeEvent):
+            # 重新拉取完成前好友列表照常请求
+            self.friends.expire()
+            self.invalidate("get_friend_list")
+            self.spawn(self.load_friends())
+
+    def _update_sender(self, event: GroupMessageEvent) -> None:
+        if (table := self.members.get(event.group_id)) is None:
+            return
+        sender = event.sender
+        fields = {
+            key: value
+            for key in ("nickname", "card", "role", "title")
+            if (value := getattr(sender, key)) is not None
+        }
+        if event.user_id in table and fields:
+            table.update(event.user_id, **fields)
+
+    def _remove_group(self, group_id: int) -> None:
+        self.groups.remove(group_id)
+        self.members.pop(group_id, None)
+        self.invalidate("get_group_list")
+        self.invalidate("get_group_info", group_id=group_id)
+        self.invalidate("get_group_member_list", group_id=group_id)
+
+    def _remove_member(self, group_id: int, user_id: int) -> None:
+        if (table := self.members.get(group_id)) is not None:
+            table.remove(user_id)
+        self._invalidate_member(group_id, user_id)
+
+    def _invalidate_member(self, group_id: int, user_id: int) -> None:
+        self.invalidate("get_group_member_list", group_id=group_id)
+        self.invalidate("get_group_member_info", group_id=group_id, user_id=user_id)
@@ -5,17 +5,16 @@ FrontMatter:
     description: onebot.v11.event 模块
 """
 
-from copy import deepcopy
 from typing_extensions import override
 from typing import TYPE_CHECKING, Any, Literal, Optional
 
 from pydantic import BaseModel
 from nonebot.utils import escape_tag
-from nonebot.compat import PYDANTIC_V2, ConfigDict, model_dump
+from nonebot.compat import PYDANTIC_V2, ConfigDict, TypeAdapter, model_dump
 
 from nonebot.adapters import Event as BaseEvent
 from nonebot.adapters.onebot.compat import model_validator
-from nonebot.adapters.onebot.utils import highlight_rich_message
+from nonebot.adapters.onebot.utils import log_enabled, highlight_rich_message
 
 from .message import Message
 from .exception import NoLogException
@@ -23,6 +22,8 @@ from .exception import NoLogException
 if TYPE_CHECKING:
     from .bot import Bot
 
+MESSAGE_ADAPTER = TypeAdapter(Message)
+
 
 class Event(BaseEvent):
     """OneBot v11 协议事件，字段与 OneBot 一致。各事件字段参考 [OneBot 文档]
@@ -46,6 +47,13 @@ class Event(BaseEvent):
     def get_event_description(self) -> str:
         return escape_tag(str(model_dump(self)))
 
+    @override
+    def get_log_string(self) -> str:
+        # 事件日志以 SUCCESS 等级输出，未启用时跳过描述的构造
+        if not log_enabled("SUCCESS"):
+            raise NoLogException
+        return super().get_log_string()
+
     @override
     def get_message(self) -> Message:
         raise ValueError("Event has no message!")
@@ -167,8 +175,11 @@ class MessageEvent(Event):
 
     @model_validator(mode="before")
     def check_message(cls, values: dict[str, Any]) -> dict[str, Any]:
+        # 两个字段为不同的消息对象但共享消息段，Bot 处理事件修改消息段前才会复制
         if "message" in values:
-            values["original_message"] = deepcopy(values["message"])
+            message = MESSAGE_ADAPTER.validate_python(values["message"])
+            values["original_message"] = message
+            values["message"] = Message(message)
         return values
 
     @override
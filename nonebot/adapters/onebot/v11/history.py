@@ -0,0 +1,100 @@
+"""OneBot v11 近期消息记录。
+
+FrontMatter:
+    sidebar_position: 11
+    description: onebot.v11.history 模块
+"""
+
+import time
+from typing import Any, Optional
+from collections import OrderedDict
+
+from nonebot.compat import type_validate_python
+
+from .message import Message, MessageSegment
+from .event import Reply, Sender, MessageEvent
+from .utils import SEND_APIS, get_message_type
+
+
+class MessageHistory:
+    """Bot 近期收发消息的环形缓冲区。
+
+    用于在本地构造消息中的回复信息，未命中时才需要调用 `get_msg`。
+
+    参数:
+        maxsize: 最大记录条数，超出时丢弃最早的记录
+        ttl: 记录保留时间（秒）
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._records: OrderedDict[int, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add_event(self, event: MessageEvent) -> None:
+        """记录收到的消息。"""
+        self._add(
+            event.message_id,
+            {
+                "time": event.time,
+                "message_type": event.message_type,
+                "message_id": event.message_id,
+                "real_id": event.message_id,
+                "sender": event.sender,
+                "message": event.original_message,
+            },
+        )
+
+    def add_sent(
+        self, self_id: str, api: str, params: dict[str, Any], result: Any
+    ) -> None:
+        """记录 Bot 发送的消息。
+
+        参数:
+            self_id: Bot ID
+            api: 发送消息的 API 名称
+            params: API 参数
+            result: API 调用结果
+        """
+        if api not in SEND_APIS or not isinstance(result, dict):
+            return
+        if (message_id := result.get("message_id")) is None:
+            return
+
+        message = params.get("message", "")
+        if params.get("auto_escape") and isinstance(message, str):
+            message = MessageSegment.text(message)
+        self._add(
+            int(message_id),
+            {
+                "time": int(time.time()),
+                "message_type": get_message_type(api, params),
+                "message_id": message_id,
+                "real_id": message_id,
+                "sender": Sender(user_id=int(self_id) if self_id.isdigit() else None),
+                "message": Message(message),
+            },
+        )
+
+    def get(self, message_id: int) -> Optional[Reply]:
+        """获取消息的回复信息，不存在或已过期时返回 `None`。"""
+        if (record := self._records.get(message_id)) is None:
+            return None
+        added_at, data = record
+        if added_at + self.ttl <= time.monotonic():
+            del self._records[message_id]
+            return None
+        # 回复信息可能被修改，不与原消息共享消息段
+        message = Message(
+            MessageSegment(seg.type, seg.data.copy()) for seg in data["message"]
+        )
+        return type_validate_python(Reply, {**data, "message": message})
+
+    def _add(self, message_id: int, data: dict[str, Any]) -> None:
+        self._records[message_id] = (time.monotonic(), data)
+        self._records.move_to_end(message_id)
+        while len(self._records) > self.maxsize:
+            self._records.popitem(last=False)
@@ -5,12 +5,11 @@ FrontMatter:
     description: onebot.v11.message 模块
 """
 
-import re
 from io import BytesIO
 from pathlib import Path
 from functools import partial
-from typing import Union, Optional
 from collections.abc import Iterable
+from typing import Any, Union, Optional
 from typing_extensions import Self, override
 
 from nonebot.adapters.onebot.utils import b2s, f2s
@@ -19,7 +18,7 @@ from nonebot.adapters.onebot.utils import rich_escape
 from nonebot.adapters.onebot.utils import truncate as trunc
 from nonebot.adapters import MessageSegment as BaseMessageSegment
 
-from .utils import escape, unescape
+from .utils import escape, unescape, iter_cqcode
 
 
 class MessageSegment(BaseMessageSegment["Message"]):
@@ -53,6 +52,13 @@ class MessageSegment(BaseMessageSegment["Message"]):
         )
         return f"[{self.type}{':' if params else ''}{params}]"
 
+    def to_dict(self) -> dict[str, Any]:
+        """转换为协议消息段格式，忽略值为 `None` 的参数。"""
+        return {
+            "type": self.type,
+            "data": {k: v for k, v in self.data.items() if v is not None},
+        }
+
     @override
     def __add__(
         self, other: Union[str, "MessageSegment", Iterable["MessageSegment"]]
@@ -297,36 +303,15 @@ class Message(BaseMessage[MessageSegment]):
     @staticmethod
     @override
     def _construct(msg: str) -> Iterable[MessageSegment]:
-        def _iter_message(msg: str) -> Iterable[tuple[str, str]]:
-            text_begin = 0
-            for cqcode in re.finditer(
-                r"\[CQ:(?P<type>[a-zA-Z0-9-_.]+)"
-                r"(?P<params>"
-                r"(?:,[a-zA-Z0-9-_.]+=[^,\]]*)*"
-                r"),?\]",
-                msg,
-            ):
-                yield "text", msg[text_begin : cqcode.pos + cqcode.start()]
-                text_begin = cqcode.pos + cqcode.end()
-                yield cqcode.group("type"), cqcode.group("params").lstrip(",")
-            yield "text", msg[text_begin:]
-
-        for type_, data in _iter_message(msg):
-            if type_ == "text":
-                if data:
-                    # only yield non-empty text segment
-                    yield MessageSegment(type_, {"text": unescape(data)})
-            else:
-                data = {
-                    k: unescape(v)
-                    for k, v in (
-                        x.split("=", maxsplit=1)
-                        for x in filter(
-                            lambda x: x, (x.lstrip() for x in data.split(","))
-                        )
-                    )
-                }
-                yield MessageSegment(type_, data)
+        text_begin = 0
+        for start, end, type_, data in iter_cqcode(msg):
+            # only yield non-empty text segment
+            if start > text_begin:
+                yield MessageSegment.text(unescape(msg[text_begin:start]))
+            text_begin = end
+            yield MessageSegment(type_, data)
+        if text_begin < len(msg):
+            yield MessageSegment.text(unescape(msg[text_begin:]))
 
     @override
     def extract_plain_text(self) -> str:
@@ -0,0 +1,66 @@
+"""OneBot v11 HTTP 上报快速操作。
+
+FrontMatter:
+    sidebar_position: 12
+    description: onebot.v11.quick 模块
+"""
+
+import asyncio
+from typing import Any, Optional
+from contextvars import ContextVar
+
+from .event import MessageEvent
+from .utils import get_send_target
+
+QUICK_REPLY_PARAMS = frozenset(
+    {"message_type", "user_id", "group_id", "message", "auto_escape"}
+)
+"""可以转为快速回复的发送消息 API 参数"""
+
+
+class QuickOperation:
+    """HTTP 上报消息事件的快速回复。
+
+    事件处理中首次向事件来源发送消息时，消息作为上报请求的响应返回，
+    不再单独调用发送消息 API。上报请求返回后不再接受快速回复。
+
+    参数:
+        event: 上报的消息事件
+    """
+
+    def __init__(self, event: MessageEvent) -> None:
+        self.event = event
+        self.future: asyncio.Future[dict[str, Any]] = (
+            asyncio.get_running_loop().create_future()
+        )
+
+    def claim(self, api: str, params: dict[str, Any]) -> bool:
+        """尝试将发送消息 API 调用转为快速回复，成功时返回 `True`。"""
+        if self.future.done() or not set(params) <= QUICK_REPLY_PARAMS:
+            return False
+        if self.event.message_type == "group":
+            target = ("group", str(getattr(self.event, "group_id", None)))
+        else:
+            target = ("user", str(self.event.user_id))
+        if get_send_target(api, params) != target:
+            return False
+
+        # 群聊快速回复默认 @ 发送者，消息中已包含需要的 @
+        operation: dict[str, Any] = {"reply": params["message"], "at_sender": False}
+        if "auto_escape" in params:
+            operation["auto_escape"] = params["auto_escape"]
+        self.future.set_result(operation)
+        return True
+
+    def close(self) -> Optional[dict[str, Any]]:
+        """停止接受快速回复，返回快速操作内容。"""
+        if self.future.done():
+            return self.future.result()
+        self.future.cancel()
+        return None
+
+
+quick_operation: ContextVar[Optional[QuickOperation]] = ContextVar(
+    "quick_operation", default=None
+)
+"""当前事件处理的快速回复，仅在 HTTP 上报时可用"""
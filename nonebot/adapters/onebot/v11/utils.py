@@ -5,15 +5,27 @@ FrontMatter:
     description: onebot.v11.utils 模块
 """
 
+import re
 from typing import Any, Optional
+from collections.abc import Iterator
 
 from nonebot.utils import logger_wrapper
 
+from nonebot.adapters.onebot.scheduler import SendTarget
+
 from .exception import ActionFailed
 
 log = logger_wrapper("OneBot V11")
 
 
+ESCAPE_TABLE = str.maketrans({"&": "&amp;", "[": "&#91;", "]": "&#93;"})
+ESCAPE_COMMA_TABLE = str.maketrans(
+    {"&": "&amp;", "[": "&#91;", "]": "&#93;", ",": "&#44;"}
+)
+UNESCAPE_MAP = {"&amp;": "&", "&#91;": "[", "&#93;": "]", "&#44;": ","}
+UNESCAPE_REGEX = re.compile(r"&(?:amp|#91|#93|#44);")
+
+
 def escape(s: str, *, escape_comma: bool = True) -> str:
     """对字符串进行 CQ 码转义。
 
@@ -21,10 +33,7 @@ def escape(s: str, *, escape_comma: bool = True) -> str:
         s: 需要转义的字符串
         escape_comma: 是否转义逗号（`,`）。
     """
-    s = s.replace("&", "&amp;").replace("[", "&#91;").replace("]", "&#93;")
-    if escape_comma:
-        s = s.replace(",", "&#44;")
-    return s
+    return s.translate(ESCAPE_COMMA_TABLE if escape_comma else ESCAPE_TABLE)
 
 
 def unescape(s: str) -> str:
@@ -33,12 +42,71 @@ def unescape(s: str) -> str:
     参数:
         s: 需要转义的字符串
     """
-    return (
-        s.replace("&#44;", ",")
-        .replace("&#91;", "[")
-        .replace("&#93;", "]")
-        .replace("&amp;", "&")
-    )
+    if "&" not in s:
+        return s
+    return UNESCAPE_REGEX.sub(_unescape_match, s)
+
+
+def _unescape_match(match: "re.Match[str]") -> str:
+    return UNESCAPE_MAP[match[0]]
+
+
+CQCODE_HEAD = "[CQ:"
+CQCODE_NAME_REGEX = re.compile(r"[a-zA-Z0-9-_.]+")
+CQCODE_VALUE_REGEX = re.compile(r"[^,\]]*")
+
+
+def iter_cqcode(msg: str) -> Iterator[tuple[int, int, str, dict[str, str]]]:
+    """扫描字符串中的 CQ 码。
+
+    按顺序返回每个 CQ 码的起止位置、类型与去转义后的参数，时间复杂度与字符串长度呈线性。
+
+    参数:
+        msg: 需要扫描的字符串
+    """
+    length = len(msg)
+    start = msg.find(CQCODE_HEAD)
+    while start != -1:
+        end, result = _parse_cqcode(msg, start, length)
+        if result is not None:
+            yield start, end, *result
+        # 解析失败时，起始于失败位置之前的 CQ 码必然同样解析失败，
+        # 从失败位置继续搜索即可保证每个字符只被扫描常数次
+        start = msg.find(CQCODE_HEAD, end)
+
+
+def _parse_cqcode(
+    msg: str, start: int, length: int
+) -> tuple[int, Optional[tuple[str, dict[str, str]]]]:
+    """从 `start` 处解析 CQ 码。
+
+    成功时返回结束位置与解析结果，失败时返回扫描停止的位置与 `None`。
+    """
+    name = CQCODE_NAME_REGEX.match(msg, start + 4)
+    if name is None:
+        return start + 4, None
+    type_ = name[0]
+    data: dict[str, str] = {}
+
+    index = name.end()
+    while index < length:
+        char = msg[index]
+        if char == "]":
+            return index + 1, (type_, data)
+        elif char != ",":
+            return index, None
+
+        key = CQCODE_NAME_REGEX.match(msg, index + 1)
+        if key is not None and msg.startswith("=", key.end()):
+            value = CQCODE_VALUE_REGEX.match(msg, key.end() + 1)
+            data[key[0]] = unescape(value[0])  # type: ignore
+            index = value.end()  # type: ignore
+        elif msg.startswith("]", index + 1):
+            # trailing comma
+            return index + 2, (type_, data)
+        else:
+            return index + 1 if key is None else key.end(), None
+    return length, None
 
 
 def handle_api_result(result: Optional[dict[str, Any]]) -> Any:
@@ -57,3 +125,28 @@ def handle_api_result(result: Optional[dict[str, Any]]) -> Any:
         if result.get("status") == "failed":
             raise ActionFailed(**result)
         return result.get("data")
+
+
+SEND_APIS = frozenset({"send_msg", "send_private_msg", "send_group_msg"})
+"""发送消息的 API"""
+
+
+def get_message_type(api: str, params: dict[str, Any]) -> str:
+    """获取发送消息 API 调用的消息类型。"""
+    if api == "send_group_msg":
+        return "group"
+    elif api == "send_private_msg":
+        return "private"
+    return params.get("message_type") or (
+        "group" if params.get("group_id") is not None else "private"
+    )
+
+
+def get_send_target(api: str, params: dict[str, Any]) -> Optional[SendTarget]:
+    """获取发送消息 API 调用的发送目标。"""
+    if get_message_type(api, params) == "group":
+        if (group_id := params.get("group_id")) is not None:
+            return ("group", str(group_id))
+    elif (user_id := params.get("user_id")) is not None:
+        return ("user", str(user_id))
+    return None
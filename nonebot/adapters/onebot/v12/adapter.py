@@ -5,19 +5,19 @@ FrontMatter:
     description: onebot.v12.adapter 模块
 """
 
-import json
 import asyncio
 import inspect
 import contextlib
-from collections.abc import Generator
+from functools import partial
 from typing_extensions import override
+from collections.abc import Hashable, Generator, Collection
 from typing import Any, Union, Callable, ClassVar, Optional, cast
 
 import msgpack
 from pygtrie import CharTrie
 from nonebot.utils import escape_tag
 from nonebot.exception import WebSocketClosed
-from nonebot.compat import type_validate_python
+from nonebot.compat import TypeAdapter, type_validate_python
 from nonebot.drivers import (
     URL,
     Driver,
@@ -32,26 +32,66 @@ from nonebot.drivers import (
 )
 
 from nonebot import get_plugin_config
+from nonebot.adapters import Bot as BaseBot
 from nonebot.adapters import Adapter as BaseAdapter
-from nonebot.adapters.onebot.collator import Collator
+from nonebot.adapters.onebot.flow import FlowControl
 from nonebot.adapters.onebot.store import ResultStore
-from nonebot.adapters.onebot.utils import get_auth_bearer
+from nonebot.adapters.onebot.balancer import EndpointPool
+from nonebot.adapters.onebot.codec import Codec, get_codec
+from nonebot.adapters.onebot.session import SessionManager
+from nonebot.adapters.onebot.scheduler import SendScheduler
+from nonebot.adapters.onebot.cache import MISSING, ResponseCache
+from nonebot.adapters.onebot.collator import CACHE_SIZE, Collator
+from nonebot.adapters.onebot.limiter import AIMDLimiter, is_idempotent
+from nonebot.adapters.onebot.liveness import LivenessTracker, is_subscribed
+from nonebot.adapters.onebot.utils import WS_CLOSED, log_enabled, get_auth_bearer
+from nonebot.adapters.onebot.dispatcher import (
+    Job,
+    EventPriority,
+    DispatchBacklog,
+    EventDispatcher,
+    match_event_name,
+    get_event_priority,
+)
 
 from .bot import Bot, send
 from .config import Config
 from . import event, exception
+from .directory import Directory
 from .message import Message, MessageSegment
-from .utils import CustomEncoder, log, msgpack_encoder, flattened_to_nested
-from .event import Event, BotEvent, MetaEvent, ConnectMetaEvent, StatusUpdateMetaEvent
+from .webhook import WebhookActions, webhook_actions
 from .exception import (
     NetworkError,
     ApiNotAvailable,
     ActionMissingField,
     ActionFailedWithRetcode,
 )
+from .utils import (
+    SEND_APIS,
+    CustomEncoder,
+    MsgpackUnpacker,
+    log,
+    get_send_target,
+    msgpack_encoder,
+    flattened_to_nested,
+)
+from .event import (
+    Event,
+    BotEvent,
+    BotStatus,
+    MetaEvent,
+    MessageEvent,
+    ConnectMetaEvent,
+    HeartbeatMetaEvent,
+    StatusUpdateMetaEvent,
+)
 
 RECONNECT_INTERVAL = 3.0
 COLLATOR_KEY = ("type", "detail_type", "sub_type")
+JSON_HEADERS = {"Content-Type": "application/json"}
+MSGPACK_HEADERS = {"Content-Type": "application/msgpack"}
+# 适配器依赖这些元事件管理连接与机器人
+UNIGNORABLE_EVENTS = {("meta", "connect"), ("meta", "status_update")}
 DEFAULT_MODELS: list[type[Event]] = []
 for model_name in dir(event):
     model = getattr(event, model_name)
@@ -86,6 +126,10 @@ class Adapter(BaseAdapter):
 
     _result_store: ClassVar[ResultStore] = ResultStore()
 
+    _collator_cache: ClassVar[
+        dict[tuple[Optional[str], Optional[str]], tuple[Collator[Event], ...]]
+    ] = {}
+
     @classmethod
     @override
     def get_name(cls) -> str:
@@ -95,11 +139,86 @@ class Adapter(BaseAdapter):
     def __init__(self, driver: Driver, **kwargs: Any) -> None:
         super().__init__(driver, **kwargs)
         self.onebot_config: Config = get_plugin_config(Config)
+        self.codec: Codec = get_codec(
+            self.onebot_config.onebot_codec, CustomEncoder().default
+        )
+        # 编码为同步操作，所有连接共用一个 Packer 即可
+        self._packer = msgpack.Packer(default=msgpack_encoder)
+        self.api_roots: dict[str, EndpointPool[str]] = {
+            self_id: EndpointPool(
+                tuple(str(url) for url in (urls if isinstance(urls, list) else [urls]))
+            )
+            for self_id, urls in self.onebot_config.onebot_api_roots.items()
+        }
+        """各 Bot 的 HTTP API 请求地址"""
+        self.http_sessions: Optional[SessionManager] = None
+        """HTTP API 请求会话，仅在驱动器支持 HTTP 客户端时可用"""
+        self.response_cache: Optional[ResponseCache] = (
+            ResponseCache(
+                self.onebot_config.onebot_api_cache_ttl,
+                self.onebot_config.onebot_api_cache_size,
+            )
+            if self.onebot_config.onebot_api_cache_ttl
+            else None
+        )
+        """API 响应缓存，未配置缓存时间时不启用"""
+        self.directories: dict[str, Directory] = {}
+        """各 Bot 的联系人目录，仅在启用 `onebot_use_directory` 时可用"""
+        self.send_scheduler: Optional[SendScheduler] = (
+            SendScheduler(
+                self.onebot_config.onebot_send_rate_limits,
+                self.onebot_config.onebot_send_bursts,
+                self.onebot_config.onebot_send_queue_size,
+            )
+            if self.onebot_config.onebot_send_rate_limits
+            else None
+        )
+        """消息发送调度器，未配置发送速率限制时不启用"""
+        self.dispatcher: Optional[EventDispatcher] = (
+            EventDispatcher(
+                self.get_name(),
+                self.onebot_config.onebot_event_workers,
+                self.onebot_config.onebot_event_queue_size,
+                self.onebot_config.onebot_event_overflow,
+            )
+            if self.onebot_config.onebot_event_workers > 0
+            else None
+        )
+        """事件分发器，未配置 `onebot_event_workers` 时为每个事件创建任务"""
+        self.liveness = LivenessTracker()
+        """各 Bot 的心跳状态"""
+        self.limiters: dict[str, AIMDLimiter] = {}
+        """各 Bot 的 API 并发限制器，仅在配置 `onebot_api_max_concurrency` 时可用"""
         self.connections: dict[str, WebSocket] = {}
+        """各 Bot 的 WebSocket 连接，多连接时为其中最早建立的连接"""
+        self.connection_pools: dict[str, EndpointPool[WebSocket]] = {}
+        """各 Bot 的全部 WebSocket 连接，API 调用在其中负载均衡"""
+        self.result_stores: dict[WebSocket, ResultStore] = {}
+        """各 WebSocket 连接的 API 调用结果存储"""
         self.tasks: set["asyncio.Task"] = set()
         self._setup()
 
     def _setup(self) -> None:
+        if self.codec.name != self.onebot_config.onebot_codec:
+            log(
+                "WARNING",
+                f"Codec {self.onebot_config.onebot_codec} is not installed, "
+                f"fallback to {self.codec.name}",
+            )
+
+        if isinstance(self.driver, HTTPClientMixin):
+            headers = {}
+            if self.onebot_config.onebot_access_token is not None:
+                headers["Authorization"] = (
+                    "Bearer " + self.onebot_config.onebot_access_token
+                )
+            self.http_sessions = SessionManager(
+                self.get_name(),
+                self.driver,
+                headers,
+                self.onebot_config.onebot_api_http2,
+            )
+
         if isinstance(self.driver, ASGIMixin):
             self.setup_http_server(
                 HTTPServerSetup(
@@ -182,11 +301,110 @@ class Adapter(BaseAdapter):
             return_exceptions=True,
         )
 
+        if self.dispatcher is not None:
+            await self.dispatcher.close()
+        if self.http_sessions is not None:
+            await self.http_sessions.close_all(self.config.api_timeout)
+
+    @override
+    def bot_connect(self, bot: BaseBot) -> None:
+        super().bot_connect(bot)
+        # 预先建立 HTTP API 会话，首次调用无需等待会话创建
+        if self.http_sessions is not None:
+            for api_root in self.api_roots.get(bot.self_id, ()):
+                task = asyncio.create_task(self.http_sessions.open(api_root))
+                task.add_done_callback(self.tasks.discard)
+                self.tasks.add(task)
+        if self.onebot_config.onebot_use_directory:
+            directory = self.directories[bot.self_id] = Directory(
+                cast(Bot, bot), self.onebot_config.onebot_directory_ttl
+            )
+            directory.start()
+
+    @override
+    def bot_disconnect(self, bot: BaseBot) -> None:
+        super().bot_disconnect(bot)
+        self.liveness.remove(bot.self_id)
+        self.limiters.pop(bot.self_id, None)
+        if (directory := self.directories.pop(bot.self_id, None)) is not None:
+            directory.close()
+        if self.response_cache is not None:
+            self.response_cache.invalidate(bot.self_id)
+        if self.send_scheduler is not None:
+            self.send_scheduler.remove(bot.self_id)
+        # 没有其他 Bot 使用该地址时关闭对应的会话
+        if self.http_sessions is not None and (
+            api_roots := self.api_roots.get(bot.self_id)
+        ):
+            in_use = {
+                api_root
+                for self_id in self.bots
+                for api_root in self.api_roots.get(self_id, ())
+            }
+            for api_root in api_roots:
+                if api_root in self.http_sessions and api_root not in in_use:
+                    task = asyncio.create_task(
+                        self.http_sessions.close(api_root, self.config.api_timeout)
+                    )
+                    task.add_done_callback(self.tasks.discard)
+                    self.tasks.add(task)
+
     @override
     async def _call_api(self, bot: Bot, api: str, **data: Any) -> Any:
-        websocket = self.connections.get(bot.self_id)
+        if (
+            (directory := self.directories.get(bot.self_id)) is not None
+            and not data.get("no_cache")
+            and (result := directory.lookup(api, data)) is not MISSING
+        ):
+            return result
+        if self.send_scheduler is not None and api in SEND_APIS:
+            await self.send_scheduler.acquire(bot.self_id, get_send_target(api, data))
+        if (
+            api in SEND_APIS
+            and (actions := webhook_actions.get()) is not None
+            and actions.add(bot.self_id, api, data)
+        ):
+            # 作为响应动作发送时没有返回值
+            return {}
+        request = partial(self._limited_request, bot, api, **data)
+        if self.response_cache is not None:
+            return await self.response_cache.call(bot.self_id, api, data, request)
+        return await request()
+
+    async def _limited_request(self, bot: Bot, api: str, **data: Any) -> Any:
+        """在 API 并发限制内请求 API，幂等 API 过载时重试。"""
+        request = partial(self._request_api, bot, api, **data)
+        if (limiter := self._get_limiter(bot.self_id)) is None:
+            return await request()
+        retries = self.onebot_config.onebot_api_retries if is_idempotent(api) else 0
+        return await limiter.call(request, self._is_overloaded, retries)
+
+    def _get_limiter(self, self_id: str) -> Optional[AIMDLimiter]:
+        if self.onebot_config.onebot_api_max_concurrency <= 0:
+            return None
+        if (limiter := self.limiters.get(self_id)) is None:
+            limiter = self.limiters[self_id] = AIMDLimiter(
+                self.onebot_config.onebot_api_max_concurrency
+            )
+        return limiter
+
+    def _is_overloaded(self, e: Exception) -> bool:
+        if isinstance(e, NetworkError):
+            # 连接断开不代表协议端过载
+            return e.msg != WS_CLOSED
+        elif isinstance(e, exception.IAmTired):
+            return True
+        return (
+            isinstance(e, ActionFailedWithRetcode)
+            and e.retcode in self.onebot_config.onebot_api_overload_retcodes
+        )
+
+    async def _request_api(self, bot: Bot, api: str, **data: Any) -> Any:
+        websockets = self.connection_pools.get(bot.self_id)
         timeout: float = data.get("_timeout", self.config.api_timeout)
-        log("DEBUG", f"Calling API <y>{api}</y>")
+        hedge = self.onebot_config.onebot_api_hedging and is_idempotent(api)
+        if log_enabled("DEBUG"):
+            log("DEBUG", f"Calling API <y>{api}</y>")
 
         action_data = {
             "action": api,
@@ -201,71 +419,96 @@ class Adapter(BaseAdapter):
         else:
             use_msgpack = self.onebot_config.onebot_use_msgpack
 
-        if websocket:
-            seq = self._result_store.get_seq()
-            action_data["echo"] = str(seq)
-            encoded_data = (
-                msgpack.packb(action_data, default=msgpack_encoder)
-                if use_msgpack
-                else json.dumps(action_data, cls=CustomEncoder)
+        if websockets:
+            return await websockets.call(
+                partial(self._ws_request, action_data, use_msgpack, timeout),
+                self._is_network_error,
+                hedge,
             )
-            await websocket.send(encoded_data)  # type: ignore
-            try:
-                return self._handle_api_result(
-                    await self._result_store.fetch(seq, timeout)
-                )
-            except asyncio.TimeoutError:
-                raise NetworkError(f"WebSocket call api {api} timeout") from None
-
-        elif isinstance(self.driver, HTTPClientMixin):
-            api_url = str(self.onebot_config.onebot_api_roots.get(bot.self_id))
-            if not api_url:
+        elif self.http_sessions is not None:
+            if not (api_urls := self.api_roots.get(bot.self_id)):
                 raise ApiNotAvailable
+            return await api_urls.call(
+                partial(self._http_request, action_data, use_msgpack, timeout),
+                self._is_network_error,
+                hedge,
+            )
+        else:
+            raise ApiNotAvailable
 
-            headers = {
-                "Content-Type": (
-                    "application/msgpack" if use_msgpack else "application/json"
-                )
-            }
-            if self.onebot_config.onebot_access_token is not None:
-                headers["Authorization"] = (
-                    "Bearer " + self.onebot_config.onebot_access_token
-                )
+    async def _ws_request(
+        self,
+        action_data: dict[str, Any],
+        use_msgpack: bool,
+        timeout: float,
+        websocket: WebSocket,
+    ) -> Any:
+        if not (result_store := self.result_stores.get(websocket)):
+            raise NetworkError(WS_CLOSED)
+        seq = result_store.get_seq()
+        # 每个连接使用各自的 echo，不修改共享的请求数据
+        action_data = {**action_data, "echo": str(seq)}
+        encoded_data = (
+            self._packer.pack(action_data)
+            if use_msgpack
+            else self.codec.dumps(action_data)
+        )
+        await websocket.send(encoded_data)  # type: ignore
+        try:
+            return self._handle_api_result(await result_store.fetch(seq, timeout))
+        except asyncio.TimeoutError:
+            raise NetworkError(
+                f"WebSocket call api {action_data['action']} timeout"
+            ) from None
 
-            encoded_data = (
-                msgpack.packb(action_data, default=msgpack_encoder)
-                if use_msgpack
-                else json.dumps(action_data, cls=CustomEncoder)
-            )
-            request = Request(
-                "POST",
-                api_url,
-                headers=headers,
-                timeout=timeout,
-                content=encoded_data,
-            )
+    async def _http_request(
+        self,
+        action_data: dict[str, Any],
+        use_msgpack: bool,
+        timeout: float,
+        api_url: str,
+    ) -> Any:
+        assert self.http_sessions is not None
+        encoded_data = (
+            self._packer.pack(action_data)
+            if use_msgpack
+            else self.codec.dumps(action_data)
+        )
+        request = Request(
+            "POST",
+            api_url,
+            headers=MSGPACK_HEADERS if use_msgpack else JSON_HEADERS,
+            timeout=timeout,
+            content=encoded_data,
+        )
 
-            try:
-                response = await self.driver.request(request)
+        try:
+            async with self.http_sessions.use(api_url) as session:
+                response = await session.request(request)
+
+            if 200 <= response.status_code < 300:
+                if not response.content:
+                    raise ValueError("Empty response")
+                if response.headers.get("Content-Type") == "application/msgpack":
+                    result = msgpack.unpackb(
+                        response.content,
+                        use_list=self.onebot_config.onebot_msgpack_use_list,
+                    )
+                else:
+                    result = self.codec.loads(response.content)
+                return self._handle_api_result(result)
+            raise NetworkError(
+                f"HTTP request received unexpected "
+                f"status code: {response.status_code}"
+            )
+        except NetworkError:
+            raise
+        except Exception as e:
+            raise NetworkError("HTTP request failed") from e
 
-                if 200 <= response.status_code < 300:
-                    if not response.content:
-                        raise ValueError("Empty response")
-                    if response.headers.get("Content-Type") == "application/msgpack":
-                        result = msgpack.unpackb(response.content)
-                    else:
-                        result = json.loads(response.content)
-                    return self._handle_api_result(result)
-                raise NetworkError(
-                    f"HTTP request received unexpected "
-                    f"status code: {response.status_code}"
-                )
-            except NetworkError:
-                raise
-            except Exception as e:
-                raise NetworkError("HTTP request failed") from e
-        else:
-            raise ApiNotAvailable
+    @staticmethod
+    def _is_network_error(e: Exception) -> bool:
+        return isinstance(e, NetworkError)
 
     def _handle_api_result(self, result: Any) -> Any:
         """处理 API 请求返回值。
@@ -310,16 +553,23 @@ class Adapter(BaseAdapter):
 
         data = request.content
         if data is not None:
-            json_data = json.loads(data)
+            use_msgpack = request.headers.get("Content-Type") == "application/msgpack"
+            if use_msgpack:
+                json_data = msgpack.unpackb(
+                    data, use_list=self.onebot_config.onebot_msgpack_use_list
+                )
+            else:
+                json_data = self.codec.loads(data)
+            if self._is_ignored(json_data):
+                return Response(204)
             if event := self.json_to_event(json_data, impl):
                 if isinstance(event, StatusUpdateMetaEvent):
                     self._handle_status_update(event, impl)
                 if isinstance(event, MetaEvent):
-                    for bot in self.bots.values():
-                        bot = cast(Bot, bot)
-                        task = asyncio.create_task(bot.handle_event(event))
-                        task.add_done_callback(self.tasks.discard)
-                        self.tasks.add(task)
+                    # 分发时可能有 Bot 连接或断开，使用快照遍历
+                    await self._dispatch_meta(
+                        event, list(cast(dict[str, Bot], self.bots).values())
+                    )
                 else:
                     event = cast(BotEvent, event)
                     self_id = event.self.user_id
@@ -329,11 +579,49 @@ class Adapter(BaseAdapter):
                         self.bot_connect(bot)
                         log("INFO", f"<y>Bot {escape_tag(self_id)}</y> connected")
                     bot = cast(Bot, bot)
-                    task = asyncio.create_task(bot.handle_event(event))
-                    task.add_done_callback(self.tasks.discard)
-                    self.tasks.add(task)
+                    if (
+                        self.onebot_config.onebot_webhook_response_timeout > 0
+                        and isinstance(event, MessageEvent)
+                    ):
+                        return await self._handle_webhook_actions(
+                            bot, event, use_msgpack
+                        )
+                    await self._dispatch(bot, event)
         return Response(204)
 
+    async def _handle_webhook_actions(
+        self, bot: Bot, event: MessageEvent, use_msgpack: bool
+    ) -> Response:
+        """处理消息事件，将等待时间内发送的消息作为响应动作返回。
+
+        响应与上报请求使用相同的编码。
+        """
+        actions = WebhookActions(event)
+        handled = asyncio.get_running_loop().create_future()
+
+        async def _handle() -> None:
+            token = webhook_actions.set(actions)
+            try:
+                await bot.handle_event(event)
+            finally:
+                webhook_actions.reset(token)
+                if not handled.done():
+                    handled.set_result(None)
+
+        if not await self._dispatch(bot, event, handle=_handle):
+            return Response(204)
+        # 超时后仍在处理时，之后发送的消息通过 API 发送
+        await asyncio.wait(
+            (handled,), timeout=self.onebot_config.onebot_webhook_response_timeout
+        )
+        if not (content := actions.close()):
+            return Response(204)
+        if use_msgpack:
+            return Response(
+                200, headers=MSGPACK_HEADERS, content=self._packer.pack(content)
+            )
+        return Response(200, headers=JSON_HEADERS, content=self.codec.dumps(content))
+
     async def _handle_ws(self, websocket: WebSocket) -> None:
         # check access_token
         response = self._check_access_token(websocket.request)
@@ -345,6 +633,12 @@ class Adapter(BaseAdapter):
         await websocket.accept()
 
         bots: dict[str, Bot] = {}
+        unpacker = MsgpackUnpacker(self.onebot_config.onebot_msgpack_use_list)
+        result_store = self.result_stores[websocket] = ResultStore()
+        flow = self._get_flow_control(result_store)
+        backlog = DispatchBacklog(
+            self.onebot_config.onebot_ws_backlog_size, result_store
+        )
         try:
             # 等待 connect 事件
             log(
@@ -353,9 +647,11 @@ class Adapter(BaseAdapter):
             )
             data = await websocket.receive()
             raw_data = (
-                json.loads(data) if isinstance(data, str) else msgpack.unpackb(data)
+                self.codec.loads(data)
+                if isinstance(data, str)
+                else unpacker.unpack(data)
             )
-            event = self.json_to_event(raw_data)
+            event = self.json_to_event(raw_data, result_store=result_store)
             if not isinstance(event, ConnectMetaEvent):
                 log(
                     "WARNING",
@@ -371,37 +667,34 @@ class Adapter(BaseAdapter):
             )
 
             while True:
+                if flow is not None:
+                    await flow.wait()
                 data = await websocket.receive()
                 raw_data = (
-                    json.loads(data) if isinstance(data, str) else msgpack.unpackb(data)
+                    self.codec.loads(data)
+                    if isinstance(data, str)
+                    else unpacker.unpack(data)
                 )
-                if event := self.json_to_event(raw_data, impl):
+                if self._is_ignored(raw_data):
+                    continue
+                if event := self.json_to_event(
+                    raw_data, impl, result_store=result_store
+                ):
                     if isinstance(event, StatusUpdateMetaEvent):
                         self._handle_status_update(event, impl, bots, websocket)
                     if isinstance(event, MetaEvent):
-                        for bot in bots.values():
-                            task = asyncio.create_task(bot.handle_event(event))
-                            task.add_done_callback(self.tasks.discard)
-                            self.tasks.add(task)
+                        await self._dispatch_meta(
+                            event, list(bots.values()), flow, backlog
+                        )
                     else:
                         event = cast(BotEvent, event)
                         self_id = event.self.user_id
                         bot = bots.get(self_id)
                         if not bot:
-                            bot = Bot(self, self_id, impl, event.self.platform)
-                            self.bot_connect(bot)
-                            bots[self_id] = bot
-                            self.connections[self_id] = websocket
-                            log(
-                                "INFO",
-                                (
-                                    f"<y>Bot {escape_tag(event.self.user_id)}</y> "
-                                    "connected"
-                                ),
+                            bot = self._attach_bot(
+                                self_id, impl, event.self.platform, bots, websocket
                             )
-                        task = asyncio.create_task(bot.handle_event(event))
-                        task.add_done_callback(self.tasks.discard)
-                        self.tasks.add(task)
+                        await self._dispatch(bot, event, flow, backlog)
 
         except WebSocketClosed:
             self_id = ", ".join(bots)
@@ -418,9 +711,10 @@ class Adapter(BaseAdapter):
         finally:
             with contextlib.suppress(Exception):
                 await websocket.close()
-            for self_id, bot in bots.items():
-                self.connections.pop(self_id, None)
-                self.bot_disconnect(bot)
+            await backlog.close()
+            self._close_result_store(websocket)
+            for bot in bots.values():
+                self._detach_bot(bot, websocket)
 
     def _check_access_token(self, request: Request) -> Optional[Response]:
         token = get_auth_bearer(request.headers.get("Authorization"))
@@ -452,6 +746,14 @@ class Adapter(BaseAdapter):
                         "DEBUG",
                         f"WebSocket Connection to {escape_tag(str(url))} established",
                     )
+                    unpacker = MsgpackUnpacker(
+                        self.onebot_config.onebot_msgpack_use_list
+                    )
+                    result_store = self.result_stores[ws] = ResultStore()
+                    flow = self._get_flow_control(result_store)
+                    backlog = DispatchBacklog(
+                        self.onebot_config.onebot_ws_backlog_size, result_store
+                    )
                     try:
                         # 等待 connect 事件
                         log(
@@ -460,11 +762,11 @@ class Adapter(BaseAdapter):
                         )
                         data = await ws.receive()
                         raw_data = (
-                            json.loads(data)
+                            self.codec.loads(data)
                             if isinstance(data, str)
-                            else msgpack.unpackb(data)
+                            else unpacker.unpack(data)
                         )
-                        event = self.json_to_event(raw_data)
+                        event = self.json_to_event(raw_data, result_store=result_store)
                         if not isinstance(event, ConnectMetaEvent):
                             raise Exception("Missing connect meta event")
 
@@ -475,42 +777,36 @@ class Adapter(BaseAdapter):
                         )
 
                         while True:
+                            if flow is not None:
+                                await flow.wait()
                             data = await ws.receive()
                             raw_data = (
-                                json.loads(data)
+                                self.codec.loads(data)
                                 if isinstance(data, str)
-                                else msgpack.unpackb(data)
+                                else unpacker.unpack(data)
+                            )
+                            if self._is_ignored(raw_data):
+                                continue
+                            event = self.json_to_event(
+                                raw_data, impl, result_store=result_store
                             )
-                            event = self.json_to_event(raw_data, impl)
                             if not event:
                                 continue
                             if isinstance(event, StatusUpdateMetaEvent):
                                 self._handle_status_update(event, impl, bots, ws)
                             if isinstance(event, MetaEvent):
-                                for bot in bots.values():
-                                    task = asyncio.create_task(bot.handle_event(event))
-                                    task.add_done_callback(self.tasks.discard)
-                                    self.tasks.add(task)
+                                await self._dispatch_meta(
+                                    event, list(bots.values()), flow, backlog
+                                )
                             else:
                                 event = cast(BotEvent, event)
                                 self_id = event.self.user_id
                                 bot = bots.get(self_id)
                                 if not bot:
-                                    bot = Bot(self, self_id, impl, event.self.platform)
-                                    self.bot_connect(bot)
-                                    bots[self_id] = bot
-                                    self.connections[self_id] = ws
-                                    log(
-                                        "INFO",
-                                        (
-                                            "<y>"
-                                            f"Bot {escape_tag(event.self.user_id)}"
-                                            "</y> connected"
-                                        ),
+                                    bot = self._attach_bot(
+                                        self_id, impl, event.self.platform, bots, ws
                                     )
-                                task = asyncio.create_task(bot.handle_event(event))
-                                task.add_done_callback(self.tasks.discard)
-                                self.tasks.add(task)
+                                await self._dispatch(bot, event, flow, backlog)
                     except WebSocketClosed as e:
                         log(
                             "ERROR",
@@ -529,9 +825,10 @@ class Adapter(BaseAdapter):
                             e,
                         )
                     finally:
-                        for self_id, bot in bots.items():
-                            self.connections.pop(self_id, None)
-                            self.bot_disconnect(bot)
+                        await backlog.close()
+                        self._close_result_store(ws)
+                        for bot in bots.values():
+                            self._detach_bot(bot, ws)
                         bots.clear()
 
             except Exception as e:
@@ -559,28 +856,245 @@ class Adapter(BaseAdapter):
                 if bot := self.bots.get(self_id):
                     if bots is not None and websocket is not None:
                         bots.pop(self_id, None)
-                        self.connections.pop(self_id, None)
+                        # 其他连接上仍然在线
+                        if self._remove_connection(self_id, websocket):
+                            continue
                     self.bot_disconnect(bot)
 
                     log(
                         "INFO",
                         f"<y>Bot {escape_tag(self_id)}</y> disconnected",
                     )
+            elif bots is not None and websocket is not None:
+                # 正向与反向 WebSocket 连接需要额外保存连接信息
+                if self_id not in bots and (
+                    self_id not in self.bots
+                    or self.onebot_config.onebot_multi_connection
+                ):
+                    self._attach_bot(
+                        self_id, impl, platform, bots, websocket, bot_status
+                    )
             elif self_id not in self.bots:
                 bot = Bot(self, self_id, impl, platform, bot_status)
-
-                # 先尝试连接，如果失败则不保存连接信息
                 self.bot_connect(bot)
-                # 正向与反向 WebSocket 连接需要额外保存连接信息
-                if bots is not None and websocket is not None:
-                    bots[self_id] = bot
-                    self.connections[self_id] = websocket
 
                 log(
                     "INFO",
                     f"<y>Bot {escape_tag(self_id)}</y> connected",
                 )
 
+    def _attach_bot(
+        self,
+        self_id: str,
+        impl: str,
+        platform: str,
+        bots: dict[str, Bot],
+        websocket: WebSocket,
+        status: Optional[BotStatus] = None,
+    ) -> Bot:
+        """在连接上收到新的 Bot 时连接 Bot，允许多连接时复用已连接的 Bot。"""
+        bot = cast(Optional[Bot], self.bots.get(self_id))
+        if bot is None or not self.onebot_config.onebot_multi_connection:
+            self.connections.pop(self_id, None)
+            self.connection_pools.pop(self_id, None)
+            bot = Bot(self, self_id, impl, platform, status)
+            # 先尝试连接，如果失败则不保存连接信息
+            self.bot_connect(bot)
+            log("INFO", f"<y>Bot {escape_tag(self_id)}</y> connected")
+        else:
+            log("INFO", f"<y>Bot {escape_tag(self_id)}</y> added a connection")
+        bots[self_id] = bot
+        self._add_connection(self_id, websocket)
+        return bot
+
+    def _detach_bot(self, bot: Bot, websocket: WebSocket) -> None:
+        """连接断开时移除 Bot 的连接，没有剩余连接时断开 Bot。"""
+        if not self._remove_connection(bot.self_id, websocket):
+            self.bot_disconnect(bot)
+
+    def _add_connection(self, self_id: str, websocket: WebSocket) -> None:
+        self.connection_pools.setdefault(self_id, EndpointPool()).add(websocket)
+        self.connections.setdefault(self_id, websocket)
+
+    def _remove_connection(self, self_id: str, websocket: WebSocket) -> int:
+        """移除 Bot 的 WebSocket 连接，返回剩余连接数。"""
+        if (websockets := self.connection_pools.get(self_id)) is None:
+            return 0
+        if not (remaining := websockets.remove(websocket)):
+            del self.connection_pools[self_id]
+            self.connections.pop(self_id, None)
+        elif self.connections.get(self_id) is websocket:
+            self.connections[self_id] = next(iter(websockets))
+        return remaining
+
+    def _close_result_store(self, websocket: WebSocket) -> None:
+        """连接断开时使该连接上所有等待中的 API 调用立即失败。"""
+        if result_store := self.result_stores.pop(websocket, None):
+            result_store.close(NetworkError(WS_CLOSED))
+
+    async def _dispatch(
+        self,
+        bot: Bot,
+        event: Event,
+        flow: Optional[FlowControl] = None,
+        backlog: Optional[DispatchBacklog] = None,
+        handle: Optional[Job] = None,
+    ) -> bool:
+        """分发事件，队列已满时按配置等待或丢弃，事件被丢弃时返回 `False`。
+
+        WebSocket 连接传入 `backlog` 时，暂停读取期间读取到的事件
+        与需要等待队列空位的事件在其中排队，读取协程得以继续读取 API 调用结果。
+
+        参数:
+            handle: 处理事件的函数，默认为 `bot.handle_event`
+        """
+        if (directory := self.directories.get(bot.self_id)) is not None:
+            # 在排队与丢弃前更新目录，未被处理的事件同样生效
+            directory.update(event)
+        if self.onebot_config.onebot_use_directory and match_event_name(
+            event.get_event_name(), self.onebot_config.onebot_ignored_events
+        ):
+            return False
+        if handle is None:
+            handle = partial(bot.handle_event, event)
+        dispatcher = self.dispatcher
+        droppable = match_event_name(
+            event.get_event_name(), self.onebot_config.onebot_event_droppable
+        )
+        priority = self._get_priority(event)
+
+        async def _enqueue() -> bool:
+            job = handle
+            if flow is not None:
+                await flow.acquire()
+                job = flow.track(handle)
+            if dispatcher is None:
+                task = asyncio.create_task(job())
+                task.add_done_callback(self.tasks.discard)
+                self.tasks.add(task)
+                return True
+            if await dispatcher.dispatch(
+                job,
+                droppable,
+                self._get_order_key(bot, event),
+                flow.release if flow is not None else None,
+                priority,
+            ):
+                return True
+            log("DEBUG", f"Event queue is full, dropped {event.get_event_name()}")
+            return False
+
+        if backlog is not None and (
+            backlog
+            or (flow is not None and flow.check())
+            or (dispatcher is not None and dispatcher.blocking(droppable, priority))
+        ):
+            if await backlog.put(_enqueue):
+                return True
+            log(
+                "WARNING",
+                "Event backlog is full while waiting for API results, "
+                f"dropped {event.get_event_name()}",
+            )
+            return False
+        return await _enqueue()
+
+    async def _dispatch_meta(
+        self,
+        event: MetaEvent,
+        bots: Collection[Bot],
+        flow: Optional[FlowControl] = None,
+        backlog: Optional[DispatchBacklog] = None,
+    ) -> None:
+        """向连接上的所有 Bot 分发元事件。"""
+        if isinstance(event, HeartbeatMetaEvent):
+            # 心跳在适配器内记录，不为无人处理的心跳逐个 Bot 创建任务
+            for bot in bots:
+                self.liveness.beat(bot.self_id, event.interval)
+            if not self._forward_heartbeat(event):
+                return
+        for bot in bots:
+            await self._dispatch(bot, event, flow, backlog)
+
+    def _forward_heartbeat(self, event: Event) -> bool:
+        """心跳事件是否交给 NoneBot 处理，没有事件响应器与事件处理函数时跳过。"""
+        return self.onebot_config.onebot_forward_heartbeat or is_subscribed(
+            event.get_type()
+        )
+
+    def _get_flow_control(self, result_store: ResultStore) -> Optional[FlowControl]:
+        """创建 WebSocket 连接的读取流量控制，未配置高水位时不启用。"""
+        if (high := self.onebot_config.onebot_ws_high_water) <= 0:
+            return None
+        low = self.onebot_config.onebot_ws_low_water
+        return FlowControl(high, high // 2 if low is None else low, result_store)
+
+    def _get_priority(self, event: Event) -> EventPriority:
+        """获取事件优先级，私聊和提及 Bot 的消息优先于其他消息。"""
+        priority = get_event_priority(
+            event.get_event_name(), self.onebot_config.onebot_event_priorities
+        )
+        if priority == EventPriority.MESSAGE and self._is_mention(event):
+            return EventPriority.MENTION
+        return priority
+
+    @staticmethod
+    def _is_mention(event: Event) -> bool:
+        """消息事件是否为私聊或提及 Bot 的消息。"""
+        if not isinstance(event, MessageEvent):
+            return False
+        if event.detail_type == "private":
+            return True
+        # to_me 在事件处理前才检查，这里检查原始消息
+        return any(
+            segment.type == "mention"
+            and segment.data.get("user_id") == event.self.user_id
+            for segment in event.original_message
+        )
+
+    def _get_order_key(self, bot: Bot, event: Event) -> Optional[Hashable]:
+        """获取事件的会话键，没有会话的事件不保证处理顺序。"""
+        ordering = self.onebot_config.onebot_event_ordering
+        if ordering is None:
+            return None
+        if ordering == "group":
+            if group_id := getattr(event, "group_id", None):
+                return (bot.self_id, "group", group_id)
+            elif channel_id := getattr(event, "channel_id", None):
+                guild_id = getattr(event, "guild_id", None)
+                return (bot.self_id, "channel", guild_id, channel_id)
+        try:
+            return (bot.self_id, event.get_session_id())
+        except ValueError:
+            return None
+
+    def _is_ignored(self, json_data: Any) -> bool:
+        """根据路由键判断是否在完整解析前丢弃事件。
+
+        仅读取 `type` 等路由字段拼接事件名称，API 调用返回数据、
+        连接与状态更新元事件不会被丢弃。
+        """
+        ignored = self.onebot_config.onebot_ignored_events
+        if not ignored or not isinstance(json_data, dict):
+            return False
+
+        route = self.event_models[""].peek(json_data)
+        if route[:2] in UNIGNORABLE_EVENTS:
+            return False
+
+        name = ""
+        matched = False
+        for value in route:
+            if not value:
+                break
+            name = f"{name}.{value}" if name else str(value)
+            matched = matched or name in ignored
+        # 联系人目录依赖的事件仍需解析，更新目录后再丢弃
+        return matched and not (
+            self.onebot_config.onebot_use_directory
+            and match_event_name(name, Directory.events)
+        )
+
     @classmethod
     def add_custom_model(
         cls,
@@ -600,18 +1114,44 @@ class Adapter(BaseAdapter):
                 COLLATOR_KEY,
             )
         cls.event_models[key].add_model(*model)  # type: ignore
+        cls._collator_cache.clear()
 
     @classmethod
-    def get_event_model(
+    def _get_collators(
         cls, data: dict[str, Any], impl: Optional[str] = None
-    ) -> Generator[type[Event], None, None]:
-        """根据事件获取对应 `Event Model` 及 `FallBack Event Model` 列表。"""
+    ) -> tuple[Collator[Event], ...]:
         # 元事件没有 self 字段
         platform = data.get("self", {}).get("platform")
+        try:
+            return cls._collator_cache[(impl, platform)]
+        except (KeyError, TypeError):
+            pass
+
         key = f"/{impl}/{platform}" if impl and platform else ""
-        if key in cls.event_models:
-            yield from cls.event_models[key].get_model(data)
-        yield from cls.event_models[""].get_model(data)
+        collators = (
+            (cls.event_models[key], cls.event_models[""])
+            if key and key in cls.event_models
+            else (cls.event_models[""],)
+        )
+        if isinstance(platform, str) and len(cls._collator_cache) < CACHE_SIZE:
+            cls._collator_cache[(impl, platform)] = collators
+        return collators
+
+    @classmethod
+    def get_event_model(
+        cls, data: dict[str, Any], impl: Optional[str] = None
+    ) -> Generator[type[Event], None, None]:
+        """根据事件获取对应 `Event Model` 及 `FallBack Event Model` 列表。"""
+        for collator in cls._get_collators(data, impl):
+            yield from collator.get_model(data)
+
+    @classmethod
+    def get_event_validator(
+        cls, data: dict[str, Any], impl: Optional[str] = None
+    ) -> Optional[TypeAdapter[Event]]:
+        """根据事件获取按 `get_event_model` 顺序依次尝试各模型的校验器。"""
+        collator, *fallback = cls._get_collators(data, impl)
+        return collator.get_validator(data, *fallback)
 
     @classmethod
     def add_custom_exception(cls, exc: type[ActionFailedWithRetcode]) -> None:
@@ -634,26 +1174,31 @@ class Adapter(BaseAdapter):
 
     @classmethod
     def json_to_event(
-        cls, json_data: Any, impl: Optional[str] = None
+        cls,
+        json_data: Any,
+        impl: Optional[str] = None,
+        *,
+        result_store: Optional[ResultStore] = None,
     ) -> Optional[Event]:
         if not isinstance(json_data, dict):
             return None
 
-        # transform flattened dict to nested
-        json_data = flattened_to_nested(json_data)
-
+        # api response is returned as is
         if "type" not in json_data:
-            cls._result_store.add_result(json_data)
+            (result_store or cls._result_store).add_result(json_data)
             return None
 
+        # transform flattened dict to nested
+        json_data = flattened_to_nested(json_data)
+
         try:
-            for model in cls.get_event_model(json_data, impl):
+            event = None
+            if validator := cls.get_event_validator(json_data, impl):
                 try:
-                    event = type_validate_python(model, json_data)
-                    break
+                    event = validator.validate_python(json_data)
                 except Exception as e:
                     log("DEBUG", "Event Parse Error", e)
-            else:
+            if event is None:
                 event = type_validate_python(Event, json_data)
             return event
 
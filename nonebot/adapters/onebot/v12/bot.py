@@ -6,6 +6,8 @@ FrontMatter:
 """
 
 import re
+from copy import deepcopy
+from itertools import islice
 from typing_extensions import override
 from typing import TYPE_CHECKING, Any, Union, Optional
 
@@ -13,6 +15,7 @@ from nonebot.message import handle_event
 from nonebot.compat import model_dump, type_validate_python
 
 from nonebot.adapters import Bot as BaseBot
+from nonebot.adapters.onebot.scheduler import SendPriority, use_priority
 
 from .utils import log
 from .message import Message, MessageSegment
@@ -22,6 +25,32 @@ if TYPE_CHECKING:
     from .adapter import Adapter
 
 
+def _copy_on_write(event: MessageEvent) -> None:
+    """在修改消息段前，复制 `event.message` 中与 `event.original_message` 共享的消息段。
+
+    参数:
+        event: MessageEvent 对象
+    """
+    shared = {id(seg) for seg in event.original_message}
+    for index, seg in enumerate(event.message):
+        if id(seg) in shared:
+            event.message[index] = MessageSegment(seg.type, deepcopy(seg.data))
+
+
+def _reduce(event: MessageEvent) -> None:
+    """合并 `event.message` 内连续的纯文本段。
+
+    参数:
+        event: MessageEvent 对象
+    """
+    if any(
+        prev.type == "text" and seg.type == "text"
+        for prev, seg in zip(event.message, islice(event.message, 1, None))
+    ):
+        _copy_on_write(event)
+        event.message.reduce()
+
+
 def _check_reply(bot: "Bot", event: MessageEvent) -> None:
     """检查消息中存在的回复，去除并赋值 `event.reply`, `event.to_me`。
 
@@ -42,6 +71,7 @@ def _check_reply(bot: "Bot", event: MessageEvent) -> None:
         log("WARNING", f"Error when getting message reply info: {e!r}", e)
         return
 
+    _copy_on_write(event)
     # ensure string comparation
     if str(event.reply.user_id) == str(event.self.user_id):
         event.to_me = True
@@ -75,6 +105,7 @@ def _check_to_me(bot: "Bot", event: MessageEvent) -> None:
 
     # ensure message not empty
     if not event.message:
+        _copy_on_write(event)
         event.message.append(MessageSegment.text(""))
 
     if event.detail_type == "private":
@@ -90,6 +121,7 @@ def _check_to_me(bot: "Bot", event: MessageEvent) -> None:
         # check the first segment
         if _is_mention_me_seg(event.message[0]):
             event.to_me = True
+            _copy_on_write(event)
             event.message.pop(0)
             if event.message and event.message[0].type == "text":
                 event.message[0].data["text"] = event.message[0].data["text"].lstrip()
@@ -118,6 +150,7 @@ def _check_to_me(bot: "Bot", event: MessageEvent) -> None:
 
             if _is_mention_me_seg(last_msg_seg):
                 event.to_me = True
+                _copy_on_write(event)
                 del event.message[i:]
 
         if not event.message:
@@ -145,7 +178,8 @@ def _check_nickname(bot: "Bot", event: MessageEvent) -> None:
     if m := re.search(rf"^({nickname_regex})([\s,，]*|$)", first_text, re.IGNORECASE):
         log("DEBUG", f"User is calling me {m[1]}")
         event.to_me = True
-        first_msg_seg.data["text"] = first_text[m.end() :]
+        _copy_on_write(event)
+        event.message[0].data["text"] = first_text[m.end() :]
 
 
 async def send(
@@ -205,7 +239,7 @@ class Bot(BaseBot):
     async def handle_event(self, event: Event) -> None:
         """处理收到的事件。"""
         if isinstance(event, MessageEvent):
-            event.message.reduce()
+            _reduce(event)
             _check_reply(self, event)
             _check_to_me(self, event)
             _check_nickname(self, event)
@@ -234,4 +268,5 @@ class Bot(BaseBot):
             ActionFailed: API 调用失败
         """
         send_handler = self.adapter.get_send(self.impl, self.platform)
-        return await send_handler(self, event, message, **kwargs)
+        with use_priority(SendPriority.INTERACTIVE):
+            return await send_handler(self, event, message, **kwargs)
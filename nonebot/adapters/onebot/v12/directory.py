@@ -0,0 +1,232 @@
+"""OneBot v12 联系人目录。
+
+FrontMatter:
+    sidebar_position: 9
+    description: onebot.v12.directory 模块
+"""
+
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from nonebot.adapters.onebot.cache import MISSING
+from nonebot.adapters.onebot.directory import Table
+from nonebot.adapters.onebot.directory import Directory as BaseDirectory
+
+from .event import (
+    Event,
+    ChannelCreateEvent,
+    ChannelDeleteEvent,
+    FriendDecreaseEvent,
+    FriendIncreaseEvent,
+    GroupMemberDecreaseEvent,
+    GroupMemberIncreaseEvent,
+    GuildMemberDecreaseEvent,
+    GuildMemberIncreaseEvent,
+)
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+class Directory(BaseDirectory["Bot"]):
+    """OneBot v12 群、好友、群组与频道目录。
+
+    提供以下 API 的查询结果:
+
+    - `get_group_list`
+    - `get_group_info`
+    - `get_group_member_list`
+    - `get_group_member_info`
+    - `get_friend_list`
+    - `get_guild_list`
+    - `get_guild_info`
+    - `get_channel_list`
+    - `get_channel_info`
+
+    实现不支持的部分将被跳过，对应 API 照常请求。
+    """
+
+    events = frozenset(
+        (
+            "notice.friend_increase",
+            "notice.friend_decrease",
+            "notice.group_member_increase",
+            "notice.group_member_decrease",
+            "notice.guild_member_increase",
+            "notice.guild_member_decrease",
+            "notice.channel_create",
+            "notice.channel_delete",
+        )
+    )
+
+    def __init__(self, bot: "Bot", ttl: float = 0) -> None:
+        super().__init__(bot, "OneBot V12", ttl)
+        self.groups = Table(ttl)
+        self.members: dict[str, Table] = {}
+        self.friends = Table(ttl)
+        self.guilds = Table(ttl)
+        self.channels: dict[str, Table] = {}
+
+    async def warm(self) -> None:
+        await self._run(self._warm_groups())
+        await self._run(self.load_friends())
+        await self._run(self._warm_guilds())
+
+    async def _warm_groups(self) -> None:
+        await self.load_groups()
+        for group_id in list(self.groups.records):
+            await self.load_members(group_id)
+
+    async def _warm_guilds(self) -> None:
+        await self.load_guilds()
+        for guild_id in list(self.guilds.records):
+            await self.load_channels(guild_id)
+
+    async def load_groups(self) -> None:
+        self.invalidate("get_group_list")
+        self.groups.fill(await self.fetch("get_group_list"), "group_id")
+
+    async def load_group(self, group_id: str) -> None:
+        self.invalidate("get_group_list")
+        self.invalidate("get_group_info", group_id=group_id)
+        group = await self.fetch("get_group_info", group_id=group_id)
+        self.groups.put(group_id, group)
+        await self.load_members(group_id)
+
+    async def load_members(self, group_id: str) -> None:
+        self.invalidate("get_group_member_list", group_id=group_id)
+        members = await self.fetch("get_group_member_list", group_id=group_id)
+        self.members.setdefault(group_id, Table(self.ttl)).fill(members, "user_id")
+
+    async def load_member(self, group_id: str, user_id: str) -> None:
+        self.invalidate("get_group_member_list", group_id=group_id)
+        self.invalidate("get_group_member_info", group_id=group_id, user_id=user_id)
+        member = await self.fetch(
+            "get_group_member_info", group_id=group_id, user_id=user_id
+        )
+        if (table := self.members.get(group_id)) is not None:
+            table.put(user_id, member)
+
+    async def load_friends(self) -> None:
+        self.invalidate("get_friend_list")
+        self.friends.fill(await self.fetch("get_friend_list"), "user_id")
+
+    async def load_guilds(self) -> None:
+        self.invalidate("get_guild_list")
+        self.guilds.fill(await self.fetch("get_guild_list"), "guild_id")
+
+    async def load_guild(self, guild_id: str) -> None:
+        self.invalidate("get_guild_list")
+        self.invalidate("get_guild_info", guild_id=guild_id)
+        guild = await self.fetch("get_guild_info", guild_id=guild_id)
+        self.guilds.put(guild_id, guild)
+        await self.load_channels(guild_id)
+
+    async def load_channels(self, guild_id: str) -> None:
+        self.invalidate("get_channel_list", guild_id=guild_id)
+        channels = await self.fetch("get_channel_list", guild_id=guild_id)
+        self.channels.setdefault(guild_id, Table(self.ttl)).fill(channels, "channel_id")
+
+    async def load_channel(self, guild_id: str, channel_id: str) -> None:
+        self.invalidate("get_channel_list", guild_id=guild_id)
+        self.invalidate("get_channel_info", guild_id=guild_id, channel_id=channel_id)
+        channel = await self.fetch(
+            "get_channel_info", guild_id=guild_id, channel_id=channel_id
+        )
+        if (table := self.channels.get(guild_id)) is not None:
+            table.put(channel_id, channel)
+
+    def lookup(self, api: str, params: dict[str, Any]) -> Any:
+        try:
+            if api == "get_group_list":
+                return self.read_list(self.groups, self.load_groups)
+            elif api == "get_group_info":
+                return self.read(self.groups, params["group_id"], self.load_groups)
+            elif api in ("get_group_member_list", "get_group_member_info"):
+                group_id = params["group_id"]
+                table = self._get_table(self.members, group_id)
+                reload = partial(self.load_members, group_id)
+                if api == "get_group_member_list":
+                    return self.read_list(table, reload)
+                return self.read(table, params["user_id"], reload)
+            elif api == "get_friend_list":
+                return self.read_list(self.friends, self.load_friends)
+            elif api == "get_guild_list":
+                return self.read_list(self.guilds, self.load_guilds)
+            elif api == "get_guild_info":
+                return self.read(self.guilds, params["guild_id"], self.load_guilds)
+            elif api == "get_channel_list" and not params.get("joined_only"):
+                guild_id = params["guild_id"]
+                table = self._get_table(self.channels, guild_id)
+                return self.read_list(table, partial(self.load_channels, guild_id))
+            elif api == "get_channel_info":
+                guild_id = params["guild_id"]
+                table = self._get_table(self.channels, guild_id)
+                reload = partial(self.load_channels, guild_id)
+                return self.read(table, params["channel_id"], reload)
+        except (KeyError, TypeError):
+            pass
+        return MISSING
+
+    def update(self, event: Event) -> None:
+        if isinstance(event, FriendIncreaseEvent):
+            # 重新拉取完成前好友列表照常请求
+            self.friends.expire()
+            self.invalidate("get_friend_list")
+            self.spawn(self.load_friends())
+        elif isinstance(event, FriendDecreaseEvent):
+            self.friends.remove(event.user_id)
+            self.invalidate("get_friend_list")
+        elif isinstance(event, GroupMemberIncreaseEvent):
+            if event.user_id == self.bot.self_id:
+                self.spawn(self.load_group(event.group_id))
+            else:
+                self.spawn(self.load_member(event.group_id, event.user_id))
+        elif isinstance(event, GroupMemberDecreaseEvent):
+            if event.user_id == self.bot.self_id:
+                self._remove_group(event.group_id)
+            else:
+                self._remove_member(event.group_id, event.user_id)
+        elif isinstance(event, GuildMemberIncreaseEvent):
+            if event.user_id == self.bot.self_id:
+                self.spawn(self.load_guild(event.guild_id))
+        elif isinstance(event, GuildMemberDecreaseEvent):
+            if event.user_id == self.bot.self_id:
+                self._remove_guild(event.guild_id)
+        elif isinstance(event, ChannelCreateEvent):
+            self.spawn(self.load_channel(event.guild_id, event.channel_id))
+        elif isinstance(event, ChannelDeleteEvent):
+            if (table := self.channels.get(event.guild_id)) is not None:
+                table.remove(event.channel_id)
+            self.invalidate("get_channel_list", guild_id=event.guild_id)
+            self.invalidate(
+                "get_channel_info",
+                guild_id=event.guild_id,
+                channel_id=event.channel_id,
+            )
+
+    @staticmethod
+    def _get_table(tables: dict[str, Table], id: str) -> Table:
+        if (table := tables.get(id)) is None:
+            raise KeyError(id)
+        return table
+
+    def _remove_group(self, group_id: str) -> None:
+        self.groups.remove(group_id)
+        self.members.pop(group_id, None)
+        self.invalidate("get_group_list")
+        self.invalidate("get_group_info", group_id=group_id)
+        self.invalidate("get_group_member_list", group_id=group_id)
+
+    def _remove_member(self, group_id: str, user_id: str) -> None:
+        if (table := self.members.get(group_id)) is not None:
+            table.remove(user_id)
+        self.invalidate("get_group_member_list", group_id=group_id)
+        self.invalidate("get_group_member_info", group_id=group_id, user_id=user_id)
+
+    def _remove_guild(self, guild_id: str) -> None:
+        self.guilds.remove(guild_id)
+        self.channels.pop(guild_id, None)
+        self.invalidate("get_guild_list")
+        self.invalidate("get_guild_info", guild_id=guild_id)
+        self.invalidate("get_channel_list", guild_id=guild_id)
@@ -41,6 +41,13 @@ class MessageSegment(BaseMessageSegment["Message"]):
         )
         return f"[{self.type}{':' if params else ''}{params}]"
 
+    def to_dict(self) -> dict[str, Any]:
+        """转换为协议消息段格式，忽略值为 `None` 的参数。"""
+        return {
+            "type": self.type,
+            "data": {k: v for k, v in self.data.items() if v is not None},
+        }
+
     @override
     def is_text(self) -> bool:
         return self.type == "text"
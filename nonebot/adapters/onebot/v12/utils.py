@@ -6,14 +6,21 @@ FrontMatter:
 """
 
 import datetime
+import operator
 from base64 import b64encode
 from functools import partial
-from typing import Any, TypeVar
 from typing_extensions import override
+from typing import Any, TypeVar, Optional
+from dataclasses import fields, is_dataclass
 
+import msgpack
 from nonebot.compat import PYDANTIC_V2
 from nonebot.utils import DataclassEncoder, logger_wrapper
 
+from nonebot.adapters.onebot.scheduler import SendTarget
+
+from .message import MessageSegment
+
 T = TypeVar("T")
 
 
@@ -21,25 +28,84 @@ log = logger_wrapper("OneBot V12")
 
 
 def flattened_to_nested(data: T) -> T:
-    """将扁平键值转为嵌套字典。"""
-    if isinstance(data, dict):
-        pairs = [
-            (
-                key.split(".") if isinstance(key, str) else key,
-                flattened_to_nested(value),
-            )
-            for key, value in data.items()
-        ]
+    """将扁平键值转为嵌套字典。
+
+    数据中不存在扁平键时直接返回原对象，否则仅重建包含扁平键的部分。
+    """
+    if not _has_flattened_key(data):
+        return data
+
+    # 前序遍历收集所有容器，逆序处理以保证子容器先于父容器完成转换
+    containers: list[Any] = []
+    stack: list[Any] = [data]
+    while stack:
+        container = stack.pop()
+        containers.append(container)
+        values = container.values() if isinstance(container, dict) else container
+        stack.extend(
+            value for value in values if isinstance(value, (dict, list, tuple))
+        )
+
+    converted: dict[int, Any] = {}
+
+    def _convert(value: Any) -> Any:
+        if isinstance(value, (dict, list, tuple)):
+            return converted[id(value)]
+        return value
+
+    for container in reversed(containers):
+        if not isinstance(container, dict):
+            items = [_convert(item) for item in container]
+            if not any(map(operator.is_not, items, container)):
+                converted[id(container)] = container
+            elif isinstance(container, tuple):
+                converted[id(container)] = tuple(items)
+            else:
+                converted[id(container)] = items
+            continue
+
+        if not any(isinstance(key, str) and "." in key for key in container) and all(
+            _convert(value) is value for value in container.values()
+        ):
+            converted[id(container)] = container
+            continue
+
         result = {}
-        for key_list, value in pairs:
+        # 合并时复制复用的原字典，避免修改输入数据
+        created: set[int] = set()
+        for key, value in container.items():
+            key_list = key.split(".") if isinstance(key, str) else (key,)
             target = result
-            for key in key_list[:-1]:
-                target = target.setdefault(key, {})
-            target[key_list[-1]] = value
-        return result  # type: ignore
-    elif isinstance(data, list):
-        return [flattened_to_nested(item) for item in data]  # type: ignore
-    return data
+            for k in key_list[:-1]:
+                nested = target.get(k)
+                if not isinstance(nested, dict):
+                    nested = {}
+                elif id(nested) not in created:
+                    nested = nested.copy()
+                target[k] = nested
+                created.add(id(nested))
+                target = nested
+            target[key_list[-1]] = _convert(value)
+        converted[id(container)] = result
+
+    return converted[id(data)]
+
+
+def _has_flattened_key(data: Any) -> bool:
+    stack: list[Any] = [data]
+    while stack:
+        container = stack.pop()
+        if isinstance(container, dict):
+            for key, value in container.items():
+                if isinstance(key, str) and "." in key:
+                    return True
+                if isinstance(value, (dict, list, tuple)):
+                    stack.append(value)
+        elif isinstance(container, (list, tuple)):
+            stack.extend(
+                item for item in container if isinstance(item, (dict, list, tuple))
+            )
+    return False
 
 
 class CustomEncoder(DataclassEncoder):
@@ -47,6 +113,8 @@ class CustomEncoder(DataclassEncoder):
 
     @override
     def default(self, o):
+        if isinstance(o, MessageSegment):
+            return o.to_dict()
         if isinstance(o, bytes):
             return b64encode(o).decode()
         return super().default(o)
@@ -64,7 +132,7 @@ msgpack_type_encoders = {
 if PYDANTIC_V2:
     from pydantic_core import to_jsonable_python
 
-    def msgpack_encoder(obj: Any):
+    def _jsonable_encoder(obj: Any):
         for type_, encoder in msgpack_type_encoders.items():
             if isinstance(obj, type_):
                 return encoder(obj)
@@ -73,7 +141,63 @@ if PYDANTIC_V2:
 else:
     from pydantic.json import custom_pydantic_encoder
 
-    msgpack_encoder = partial(
+    _jsonable_encoder = partial(
         custom_pydantic_encoder,
         msgpack_type_encoders,  # type: ignore
     )
+
+
+def msgpack_encoder(obj: Any):
+    """msgpack 无法直接编码的对象的转换函数。"""
+    if isinstance(obj, MessageSegment):
+        return obj.to_dict()
+    # 数据类仅展开一层，字段中的 bytes 等类型交由 msgpack 原生编码
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {field.name: getattr(obj, field.name) for field in fields(obj)}
+    return _jsonable_encoder(obj)
+
+
+class MsgpackUnpacker:
+    """复用缓冲区的 msgpack 解码器，每个连接使用独立的实例。
+
+    参数:
+        use_list: 是否将数组解码为 `list`，否则解码为 `tuple`
+    """
+
+    def __init__(self, use_list: bool = True) -> None:
+        self.use_list = use_list
+        self._reset()
+
+    def _reset(self) -> None:
+        self._unpacker = msgpack.Unpacker(raw=False, use_list=self.use_list)
+        self._fed = 0
+
+    def unpack(self, data: bytes) -> Any:
+        """解码一个完整的 msgpack 数据帧。"""
+        self._unpacker.feed(data)
+        self._fed += len(data)
+        try:
+            result = self._unpacker.unpack()
+        except Exception:
+            self._reset()
+            raise
+        if self._unpacker.tell() != self._fed:
+            self._reset()
+            raise ValueError("Invalid msgpack frame with extra data")
+        return result
+
+
+SEND_APIS = frozenset({"send_message"})
+"""发送消息的 API"""
+
+
+def get_send_target(api: str, params: dict[str, Any]) -> Optional[SendTarget]:
+    """获取发送消息 API 调用的发送目标，频道按群限速。"""
+    detail_type = params.get("detail_type")
+    if detail_type == "group" and (group_id := params.get("group_id")) is not None:
+        return ("group", str(group_id))
+    elif detail_type == "channel" and (guild_id := params.get("guild_id")):
+        return ("group", f"{guild_id}/{params.get('channel_id')}")
+    elif (user_id := params.get("user_id")) is not None:
+        return ("user", str(user_id))
+    return None
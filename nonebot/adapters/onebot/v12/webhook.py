@@ -0,0 +1,53 @@
+"""OneBot v12 HTTP Webhook 响应动作。
+
+FrontMatter:
+    sidebar_position: 10
+    description: onebot.v12.webhook 模块
+"""
+
+from typing import Any, Optional
+from contextvars import ContextVar
+
+from .event import BotEvent
+from .utils import SEND_APIS
+
+
+class WebhookActions:
+    """HTTP Webhook 上报事件的响应动作。
+
+    事件处理中该 Bot 发送的消息作为上报请求的响应返回，不再单独调用发送消息 API。
+    上报请求返回后不再接受响应动作。
+
+    参数:
+        event: 上报的事件
+    """
+
+    def __init__(self, event: BotEvent) -> None:
+        self.platform = event.self.platform
+        self.self_id = event.self.user_id
+        self.actions: list[dict[str, Any]] = []
+        self.closed = False
+
+    def add(self, self_id: str, api: str, params: dict[str, Any]) -> bool:
+        """尝试将 API 调用作为响应动作，成功时返回 `True`。"""
+        if self.closed or self_id != self.self_id or api not in SEND_APIS:
+            return False
+        self.actions.append(
+            {
+                "action": api,
+                "params": params,
+                "self": {"platform": self.platform, "user_id": self.self_id},
+            }
+        )
+        return True
+
+    def close(self) -> list[dict[str, Any]]:
+        """停止接受响应动作，返回已添加的动作。"""
+        self.closed = True
+        return self.actions
+
+
+webhook_actions: ContextVar[Optional[WebhookActions]] = ContextVar(
+    "webhook_actions", default=None
+)
+"""当前事件处理的响应动作，仅在 HTTP Webhook 上报时可用"""
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from nonebot.adapters.onebot.balancer import EndpointPool
+
+
+class Unavailable(Exception):
+    pass
+
+
+def is_failure(e: Exception) -> bool:
+    return isinstance(e, Unavailable)
+
+
+@pytest.mark.asyncio
+async def test_pool_least_outstanding():
+    pool = EndpointPool(("a", "b"))
+    release = asyncio.Event()
+    picked: list[str] = []
+
+    async def request(target: str):
+        picked.append(target)
+        await release.wait()
+        return target
+
+    tasks = [asyncio.create_task(pool.call(request, is_failure)) for _ in range(4)]
+    await asyncio.sleep(0)
+    assert sorted(picked) == ["a", "a", "b", "b"]
+    release.set()
+    assert sorted(await asyncio.gather(*tasks)) == ["a", "a", "b", "b"]
+
+    assert pool.remove("a") == 1
+    assert list(pool) == ["b"]
+    pool.add("b")
+    assert len(pool) == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_failure():
+    pool = EndpointPool(("a", "b"))
+
+    async def request(target: str):
+        if target == "a":
+            raise Unavailable
+        return target
+
+    with pytest.raises(Unavailable):
+        await pool.call(request, is_failure)
+    # the failed endpoint is skipped until its cooldown ends
+    assert [await pool.call(request, is_failure) for _ in range(3)] == ["b"] * 3
+
+    # other errors are responses and do not mark the endpoint down
+    async def failed(target: str):
+        raise ValueError(target)
+
+    with pytest.raises(ValueError, match="b"):
+        await pool.call(failed, is_failure)
+    assert await pool.call(request, is_failure) == "b"
+
+    with pytest.raises(LookupError):
+        await EndpointPool().call(request, is_failure)
+
+
+@pytest.mark.asyncio
+async def test_pool_hedge(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("nonebot.adapters.onebot.balancer.MIN_HEDGE_SAMPLES", 1)
+    pool = EndpointPool(("a", "b"))
+    cancelled: list[str] = []
+
+    async def fast(target: str):
+        await asyncio.sleep(0.01)
+        return target
+
+    assert await pool.call(fast, is_failure, hedge=True) == "a"
+    assert pool.hedge_delay() is not None
+
+    async def slow_a(target: str):
+        try:
+            await asyncio.sleep(1 if target == "a" else 0)
+        except asyncio.CancelledError:
+            cancelled.append(target)
+            raise
+        return target
+
+    # the backup request wins and the slow one is cancelled
+    assert await asyncio.wait_for(pool.call(slow_a, is_failure, hedge=True), 0.5) == (
+        "b"
+    )
+    await asyncio.sleep(0)
+    assert cancelled == ["a"]
+    # the cancelled request still counts its elapsed time
+    assert len(pool._latencies) == 2
+    assert pool._latencies[-1] >= pool._latencies[0]
+
+    async def broken_a(target: str):
+        if target == "a":
+            raise Unavailable
+        return target
+
+    # a fast network failure fails over without waiting for the hedge delay
+    pool = EndpointPool(("a", "b"))
+    monkeypatch.setattr(pool, "hedge_delay", lambda: 10)
+    assert await asyncio.wait_for(pool.call(broken_a, is_failure, hedge=True), 1) == (
+        "b"
+    )
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from nonebot.adapters.onebot.cache import ResponseCache
+
+
+@pytest.mark.asyncio
+async def test_cache():
+    cache = ResponseCache({"get_group_info": 60, "get_msg": 0.05}, maxsize=2)
+    calls: list[str] = []
+
+    def request(result: str):
+        async def _request():
+            calls.append(result)
+            await asyncio.sleep(0.01)
+            return result
+
+        return _request
+
+    async def call(self_id: str, api: str, params: dict, result: str = "new"):
+        return await cache.call(self_id, api, params, request(result))
+
+    # concurrent identical calls share one request
+    results = await asyncio.gather(
+        *(call("0", "get_group_info", {"group_id": 1}, "1") for _ in range(5))
+    )
+    assert results == ["1"] * 5
+    assert calls == ["1"]
+    assert await call("0", "get_group_info", {"group_id": 1, "_timeout": 5}) == "1"
+
+    # no_cache bypasses the cached result and refreshes it
+    params = {"group_id": 1, "no_cache": True}
+    assert await call("0", "get_group_info", params, "2") == "2"
+    assert await call("0", "get_group_info", {"group_id": 1}) == "2"
+
+    # apis without ttl and unhashable params are not cached
+    await call("0", "send_msg", {}, "3")
+    await call("0", "get_group_info", {"group_id": {1}}, "4")
+    assert len(cache) == 1
+
+    # entries expire
+    await call("0", "get_msg", {"message_id": 1}, "5")
+    assert await call("0", "get_msg", {"message_id": 1}) == "5"
+    await asyncio.sleep(0.1)
+    assert await call("0", "get_msg", {"message_id": 1}) == "new"
+    cache.delete("0", "get_msg", {"message_id": 1})
+
+    # least recently used entries are evicted
+    await call("0", "get_group_info", {"group_id": 2}, "6")
+    await call("0", "get_group_info", {"group_id": 1})
+    await call("0", "get_group_info", {"group_id": 3}, "7")
+    assert await call("0", "get_group_info", {"group_id": 1}) == "2"
+    assert await call("0", "get_group_info", {"group_id": 2}) == "new"
+
+    cache.delete("0", "get_group_info", {"group_id": 2, "no_cache": True})
+    assert len(cache) == 1
+    assert await call("0", "get_group_info", {"group_id": 2}, "8") == "8"
+
+    await call("1", "get_group_info", {"group_id": 1}, "9")
+    cache.invalidate("0")
+    assert len(cache) == 1
+    assert await call("1", "get_group_info", {"group_id": 1}) == "9"
+
+
+@pytest.mark.asyncio
+async def test_cache_failure():
+    cache = ResponseCache({"get_login_info": 60})
+
+    async def failed():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    tasks = [
+        asyncio.create_task(cache.call("0", "get_login_info", {}, failed))
+        for _ in range(3)
+    ]
+    # cancelling one caller does not affect the others
+    await asyncio.sleep(0)
+    tasks[0].cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert all(isinstance(result, ValueError) for result in results[1:])
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_adapter_cache_disconnect(monkeypatch: pytest.MonkeyPatch):
+    import nonebot
+    from nonebot.adapters.onebot.v11 import Bot, Adapter
+
+    adapter = nonebot.get_adapter(Adapter)
+    cache = ResponseCache({"get_login_info": 60})
+    monkeypatch.setattr(adapter, "response_cache", cache)
+
+    async def request():
+        return {"user_id": 0}
+
+    bot = Bot(adapter, "0")
+    adapter.bot_connect(bot)
+    await cache.call("0", "get_login_info", {}, request)
+    assert len(cache) == 1
+
+    # cached results of a disconnected bot are dropped
+    adapter.bot_disconnect(bot)
+    assert len(cache) == 0
@@ -0,0 +1,85 @@
+import sys
+from typing import Any
+
+import pytest
+from nonebot.utils import DataclassEncoder
+
+from nonebot.adapters.onebot.v11 import Message, MessageSegment
+from nonebot.adapters.onebot.codec import CODECS, Codec, get_codec
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", list(CODECS))
+async def test_codec(name: str):
+    pytest.importorskip(name)
+
+    codec = get_codec(name, DataclassEncoder().default)
+    assert codec.name == name
+
+    data: dict[str, Any] = {
+        "action": "send_msg",
+        "params": {
+            "message": Message([MessageSegment.text("test"), MessageSegment.at(123)])
+        },
+        "echo": "1",
+    }
+    encoded = codec.dumps(data)
+    assert isinstance(encoded, str)
+    assert codec.loads(encoded) == {
+        "action": "send_msg",
+        "params": {
+            "message": [
+                {"type": "text", "data": {"text": "test"}},
+                {"type": "at", "data": {"qq": "123"}},
+            ]
+        },
+        "echo": "1",
+    }
+    assert codec.loads(encoded.encode()) == codec.loads(encoded)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", list(CODECS))
+async def test_codec_segment_none(name: str):
+    pytest.importorskip(name)
+
+    from nonebot.adapters.onebot.v11.adapter import CustomEncoder
+
+    # None parameters are dropped by every codec
+    codec = get_codec(name, CustomEncoder().default)
+    segment = MessageSegment("image", {"file": "a.png", "cache": None})
+    encoded = codec.dumps({"params": {"message": Message(segment)}})
+    assert codec.loads(encoded) == {
+        "params": {"message": [{"type": "image", "data": {"file": "a.png"}}]}
+    }
+
+
+def test_msgspec_codec_prepare():
+    pytest.importorskip("msgspec")
+
+    from nonebot.adapters.onebot.codec import MsgspecCodec
+    from nonebot.adapters.onebot.v11.adapter import CustomEncoder
+
+    codec = MsgspecCodec(CustomEncoder().default)
+    # containers without dataclasses are encoded as is
+    data = {"action": "get_status", "params": {"ids": [1, 2]}, "echo": "1"}
+    assert codec._prepare(data) is data
+
+    message = Message(MessageSegment.text("test"))
+    data = {"params": {"message": message, "ids": [1, 2]}}
+    prepared = codec._prepare(data)
+    assert prepared["params"]["message"] == [{"type": "text", "data": {"text": "test"}}]
+    assert prepared["params"]["ids"] is data["params"]["ids"]
+    assert data["params"]["message"] is message
+
+
+@pytest.mark.asyncio
+async def test_codec_fallback(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+
+    assert type(get_codec("orjson", DataclassEncoder().default)) is Codec
+    assert type(get_codec("msgspec", DataclassEncoder().default)) is Codec
+
+    with pytest.raises(ValueError, match="Unknown codec"):
+        get_codec("unknown", DataclassEncoder().default)
@@ -1,6 +1,7 @@
 from typing import Literal
 
 import pytest
+from pydantic import BaseModel
 
 from nonebot.adapters import Event
 from nonebot.adapters.onebot.collator import SEPARATOR, Collator
@@ -83,3 +84,84 @@ async def test_collator_get_model():
 
     models = collator.get_model({"type": "message", "detail_type": "not_exists"})
     assert models == [MessageModel, TestModel]
+
+
+@pytest.mark.asyncio
+async def test_collator_peek():
+    class TestModel(Event):
+        type: str
+
+    collator = Collator(
+        "test", [TestModel], ("type", ("message_type", "request_type"), "sub_type")
+    )
+
+    assert collator.peek({"type": "message", "message_type": "private"}) == (
+        "message",
+        "private",
+        None,
+    )
+    assert collator.peek(
+        {"type": "request", "request_type": "friend", "sub_type": "add"}
+    ) == ("request", "friend", "add")
+    assert collator.peek({"echo": "1"}) == (None, None, None)
+
+
+@pytest.mark.asyncio
+async def test_collator_get_validator():
+    class TestModel(BaseModel):
+        type: str
+        detail_type: str
+
+    class MessageModel(TestModel):
+        type: Literal["message"]
+
+    class PrivateModel(MessageModel):
+        detail_type: Literal["private"]
+        user_id: int
+
+    collator = Collator(
+        "test",
+        [TestModel, MessageModel],  # type: ignore
+        ("type", "detail_type"),
+    )
+
+    data = {"type": "message", "detail_type": "private", "user_id": 1}
+    validator = collator.get_validator(data)
+    assert validator is not None
+    assert collator.get_validator(data) is validator
+    assert type(validator.validate_python(data)) is MessageModel
+
+    collator.add_model(PrivateModel)
+    validator = collator.get_validator(data)
+    assert validator is not None
+    assert type(validator.validate_python(data)) is PrivateModel
+
+    # fallback to parent model if the specific one fails
+    data = {"type": "message", "detail_type": "private", "user_id": "invalid"}
+    assert type(validator.validate_python(data)) is MessageModel
+
+    assert Collator("empty", [], ("type",)).get_validator({"type": "test"}) is None
+
+
+@pytest.mark.asyncio
+async def test_collator_model_cache():
+    class TestModel(Event):
+        type: str
+        detail_type: str
+
+    class MessageModel(TestModel):
+        type: Literal["message"]
+
+    class PrivateModel(MessageModel):
+        detail_type: Literal["private"]
+
+    collator = Collator("test", [TestModel, MessageModel], ("type", "detail_type"))
+
+    data = {"type": "message", "detail_type": "private"}
+    assert collator.get_model(data) == [MessageModel, TestModel]
+    # returned list must not affect the cache
+    collator.get_model(data).clear()
+    assert collator.get_model(data) == [MessageModel, TestModel]
+
+    collator.add_model(PrivateModel)
+    assert collator.get_model(data) == [PrivateModel, MessageModel, TestModel]
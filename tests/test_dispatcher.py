@@ -0,0 +1,294 @@
+import asyncio
+
+import pytest
+
+from nonebot.adapters.onebot.store import ResultStore
+from nonebot.adapters.onebot.dispatcher import (
+    EventPriority,
+    DispatchBacklog,
+    EventDispatcher,
+    match_event_name,
+    get_event_priority,
+)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_workers():
+    dispatcher = EventDispatcher("test", 2, 10)
+    running = 0
+    peak = 0
+    done: list[int] = []
+
+    async def handle(i: int):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        done.append(i)
+
+    for i in range(6):
+        assert await dispatcher.dispatch(lambda i=i: handle(i))
+    assert dispatcher.stats().queued == 6
+
+    await asyncio.sleep(0.1)
+    assert sorted(done) == list(range(6))
+    assert peak == 2
+    stats = dispatcher.stats()
+    assert stats.dispatched == 6
+    assert stats.max_queued == 6
+    assert stats.dropped == 0
+
+    async def failed():
+        raise ValueError("failed")
+
+    # errors are logged and do not stop the worker
+    await dispatcher.dispatch(failed)
+    await dispatcher.dispatch(lambda: handle(6))
+    await asyncio.sleep(0.05)
+    assert done[-1] == 6
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("overflow", "expected"),
+    [("block", [0, 1, 2, 3]), ("drop_oldest", [0, 2, 3]), ("drop_newest", [0, 1, 2])],
+)
+async def test_dispatcher_overflow(overflow, expected: list[int]):
+    dispatcher = EventDispatcher("test", 1, 2, overflow)
+    release = asyncio.Event()
+    done: list[int] = []
+
+    async def handle(i: int):
+        await release.wait()
+        done.append(i)
+
+    await dispatcher.dispatch(lambda: handle(0))
+    await asyncio.sleep(0)
+    await dispatcher.dispatch(lambda: handle(1))
+    await dispatcher.dispatch(lambda: handle(2))
+
+    # droppable events are dropped regardless of the policy
+    assert not await dispatcher.dispatch(lambda: handle(-1), droppable=True)
+
+    assert dispatcher.blocking(False, EventPriority.MESSAGE) == (overflow == "block")
+    assert not dispatcher.blocking(True, EventPriority.MESSAGE)
+    task = asyncio.create_task(dispatcher.dispatch(lambda: handle(3)))
+    await asyncio.sleep(0)
+    assert task.done() == (overflow != "block")
+    release.set()
+    await asyncio.wait_for(task, 1)
+    await asyncio.sleep(0.01)
+    assert done == expected
+    assert dispatcher.stats().dropped == 1 + (overflow != "block")
+    await dispatcher.close()
+
+
+def test_match_event_name():
+    assert match_event_name("notice.group_upload", {"notice"})
+    assert match_event_name("message.group.normal", {"message.group"})
+    assert not match_event_name("message.group.normal", {"message.private"})
+    assert not match_event_name("notice_x", {"notice"})
+    assert not match_event_name("notice", set())
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_ordered():
+    dispatcher = EventDispatcher("test", 4, 0)
+    running: dict[str, int] = {}
+    peak: dict[str, int] = {}
+    done: list[tuple[str, int]] = []
+
+    async def handle(key: str, i: int):
+        running[key] = running.get(key, 0) + 1
+        peak[key] = max(peak.get(key, 0), running[key])
+        await asyncio.sleep(0.01 if i % 2 else 0.02)
+        running[key] -= 1
+        done.append((key, i))
+
+    for i in range(4):
+        for key in ("a", "b"):
+            await dispatcher.dispatch(lambda key=key, i=i: handle(key, i), key=key)
+    assert dispatcher.stats().lanes == 2
+
+    await asyncio.sleep(0.2)
+    # events of the same session run one at a time and in order
+    assert [i for key, i in done if key == "a"] == [0, 1, 2, 3]
+    assert [i for key, i in done if key == "b"] == [0, 1, 2, 3]
+    assert peak == {"a": 1, "b": 1}
+    # different sessions run in parallel
+    assert done[:2] in ([("a", 0), ("b", 0)], [("b", 0), ("a", 0)])
+    # idle lanes are reclaimed
+    assert dispatcher.stats().lanes == 0
+    await dispatcher.close()
+
+
+def test_get_event_priority():
+    assert get_event_priority("message.group.normal", {}) == EventPriority.MESSAGE
+    assert get_event_priority("notice.group_upload", {}) == EventPriority.NOTICE
+    assert get_event_priority("request.friend", {}) == EventPriority.NOTICE
+    assert get_event_priority("meta_event.heartbeat", {}) == EventPriority.META
+    assert get_event_priority("meta.heartbeat", {}) == EventPriority.META
+    # the longest configured prefix wins
+    priorities = {
+        "notice": EventPriority.META,
+        "notice.group_upload": EventPriority.MESSAGE,
+    }
+    assert get_event_priority("notice.group_upload", priorities) == (
+        EventPriority.MESSAGE
+    )
+    assert get_event_priority("notice.group_ban.ban", priorities) == EventPriority.META
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_priority():
+    dispatcher = EventDispatcher("test", 1, 3, "drop_newest")
+    release = asyncio.Event()
+    done: list[str] = []
+    dropped: list[str] = []
+
+    async def handle(name: str):
+        await release.wait()
+        done.append(name)
+
+    async def dispatch(name: str, priority: EventPriority):
+        return await dispatcher.dispatch(
+            lambda: handle(name),
+            on_drop=lambda: dropped.append(name),
+            priority=priority,
+        )
+
+    assert await dispatch("running", EventPriority.MESSAGE)
+    await asyncio.sleep(0)
+    assert await dispatch("meta", EventPriority.META)
+    assert await dispatch("notice", EventPriority.NOTICE)
+    assert await dispatch("message", EventPriority.MESSAGE)
+
+    # lower priority events are shed first when the queue is full
+    assert await dispatch("mention", EventPriority.MENTION)
+    assert await dispatch("mention2", EventPriority.MENTION)
+    assert dropped == ["meta", "notice"]
+    # no lower priority event to shed, the overflow policy applies
+    assert not await dispatch("message2", EventPriority.MESSAGE)
+    assert dropped == ["meta", "notice", "message2"]
+
+    release.set()
+    await asyncio.sleep(0.01)
+    # more important events are processed first
+    assert done == ["running", "mention", "mention2", "message"]
+    stats = dispatcher.stats()
+    assert stats.dropped == 3
+    assert stats.shed == {
+        EventPriority.MENTION: 0,
+        EventPriority.MESSAGE: 1,
+        EventPriority.NOTICE: 1,
+        EventPriority.META: 1,
+    }
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_priority_drop_oldest():
+    dispatcher = EventDispatcher("test", 1, 2, "drop_oldest")
+    release = asyncio.Event()
+    done: list[str] = []
+
+    async def handle(name: str):
+        await release.wait()
+        done.append(name)
+
+    await dispatcher.dispatch(lambda: handle("running"))
+    await asyncio.sleep(0)
+    await dispatcher.dispatch(lambda: handle("a"), key="a")
+    await dispatcher.dispatch(lambda: handle("mention"), priority=EventPriority.MENTION)
+    # only events of the same priority are dropped
+    await dispatcher.dispatch(lambda: handle("b"), key="b")
+    await dispatcher.dispatch(lambda: handle("meta"), priority=EventPriority.META)
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert done == ["running", "mention", "b"]
+    assert dispatcher.stats().shed[EventPriority.MESSAGE] == 1
+    assert dispatcher.stats().shed[EventPriority.META] == 1
+    assert dispatcher.stats().lanes == 0
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_backlog():
+    dispatcher = EventDispatcher("test", 1, 1)
+    backlog = DispatchBacklog(2)
+    release = asyncio.Event()
+    done: list[int] = []
+
+    async def handle(i: int):
+        await release.wait()
+        done.append(i)
+
+    def enqueue(i: int):
+        return lambda: dispatcher.dispatch(lambda: handle(i))
+
+    await dispatcher.dispatch(lambda: handle(0))
+    await asyncio.sleep(0)
+    await dispatcher.dispatch(lambda: handle(1))
+    assert dispatcher.blocking(False, EventPriority.MESSAGE)
+
+    # events waiting for the queue are kept in order without blocking the caller
+    await asyncio.wait_for(backlog.put(enqueue(2)), 1)
+    await asyncio.wait_for(backlog.put(enqueue(3)), 1)
+    assert len(backlog) == 2
+    put = asyncio.create_task(backlog.put(enqueue(4)))
+    await asyncio.sleep(0)
+    assert not put.done()
+
+    release.set()
+    await asyncio.wait_for(put, 1)
+    await asyncio.sleep(0.01)
+    assert done == [0, 1, 2, 3, 4]
+    assert not backlog
+
+    # pending events are discarded on close
+    release.clear()
+    await dispatcher.dispatch(lambda: handle(5))
+    await asyncio.sleep(0)
+    await dispatcher.dispatch(lambda: handle(6))
+    await backlog.put(enqueue(7))
+    await backlog.close()
+    assert not backlog
+    release.set()
+    await asyncio.sleep(0.01)
+    assert done[-1] == 6
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_backlog_pending():
+    store = ResultStore()
+    dispatcher = EventDispatcher("test", 1, 1)
+    backlog = DispatchBacklog(1, store)
+    done: list[int] = []
+
+    async def handle(i: int):
+        await store.fetch(i, 1)
+        done.append(i)
+
+    def enqueue(i: int):
+        return lambda: dispatcher.dispatch(lambda: handle(i))
+
+    await dispatcher.dispatch(lambda: handle(0))
+    await asyncio.sleep(0)
+    await dispatcher.dispatch(lambda: handle(1))
+    assert store.pending == 1
+
+    # events beyond the backlog are dropped while an api call waits for its result
+    assert await asyncio.wait_for(backlog.put(enqueue(2)), 1)
+    assert not await asyncio.wait_for(backlog.put(enqueue(3)), 1)
+
+    # the reader keeps reading the results the handlers wait for
+    for i in range(3):
+        store.add_result({"echo": str(i)})
+        await asyncio.sleep(0.01)
+    assert done == [0, 1, 2]
+    assert not backlog
+    await dispatcher.close()
@@ -0,0 +1,108 @@
+import asyncio
+from functools import partial
+
+import pytest
+
+from nonebot.adapters.onebot.flow import FlowControl
+from nonebot.adapters.onebot.store import ResultStore
+from nonebot.adapters.onebot.dispatcher import DispatchBacklog, EventDispatcher
+
+
+@pytest.mark.asyncio
+async def test_flow_control():
+    store = ResultStore()
+    flow = FlowControl(3, 1, store)
+    release = asyncio.Event()
+
+    async def handle():
+        await release.wait()
+
+    tasks = [asyncio.create_task(flow.track(handle)()) for _ in range(3)]
+    assert flow.in_flight == 3
+
+    reader = asyncio.create_task(flow.wait())
+    await asyncio.sleep(0)
+    assert flow.paused
+    assert not reader.done()
+
+    # pending api calls keep the reader going
+    fetch = asyncio.create_task(store.fetch(store.get_seq(), None))
+    await asyncio.sleep(0)
+    await asyncio.wait_for(reader, 1)
+    store.add_result({"echo": "1"})
+    await fetch
+
+    # events read meanwhile wait for the reading to resume
+    assert flow.check()
+    parked = asyncio.create_task(flow.acquire())
+    await asyncio.sleep(0)
+    assert not parked.done()
+
+    # still paused until the low water mark is reached
+    reader = asyncio.create_task(flow.wait())
+    release.set()
+    await asyncio.wait_for(reader, 1)
+    await asyncio.wait_for(parked, 1)
+    await asyncio.gather(*tasks)
+    assert flow.in_flight == 0
+    assert not flow.paused
+    assert flow.pauses == 1
+
+
+@pytest.mark.asyncio
+async def test_flow_control_dropped():
+    flow = FlowControl(10, 5, ResultStore())
+    dispatcher = EventDispatcher("test", 1, 1, "drop_oldest")
+    release = asyncio.Event()
+
+    async def handle():
+        await release.wait()
+
+    for _ in range(3):
+        await dispatcher.dispatch(flow.track(handle), on_drop=flow.release)
+        await asyncio.sleep(0)
+    # one running, one queued and one dropped
+    assert flow.in_flight == 2
+    release.set()
+    await asyncio.sleep(0.01)
+    assert flow.in_flight == 0
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_flow_control_backlog():
+    store = ResultStore()
+    flow = FlowControl(2, 1, store)
+    backlog = DispatchBacklog(1, store)
+    done: list[int] = []
+    tasks: list[asyncio.Task] = []
+
+    async def handle(i: int):
+        await store.fetch(i, 1)
+        done.append(i)
+
+    def enqueue(i: int):
+        async def _enqueue():
+            await flow.acquire()
+            tasks.append(asyncio.create_task(flow.track(partial(handle, i))()))
+
+        return _enqueue
+
+    for i in range(2):
+        await enqueue(i)()
+    await asyncio.sleep(0)
+    assert flow.check()
+    assert store.pending == 2
+
+    # reading goes on while paused, events beyond the backlog are dropped
+    await asyncio.wait_for(flow.wait(), 1)
+    assert await asyncio.wait_for(backlog.put(enqueue(2)), 1)
+    assert not await asyncio.wait_for(backlog.put(enqueue(3)), 1)
+
+    for i in range(3):
+        store.add_result({"echo": str(i)})
+        await asyncio.sleep(0.01)
+    assert done == [0, 1, 2]
+    assert not backlog
+    assert flow.in_flight == 0
+    await asyncio.gather(*tasks)
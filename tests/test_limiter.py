@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from nonebot.adapters.onebot.limiter import AIMDLimiter, is_idempotent
+
+
+class Overloaded(Exception):
+    pass
+
+
+def is_overloaded(e: Exception) -> bool:
+    return isinstance(e, Overloaded)
+
+
+@pytest.mark.asyncio
+async def test_limiter_concurrency():
+    limiter = AIMDLimiter(2)
+    running = 0
+    peak = 0
+
+    async def request():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "ok"
+
+    results = await asyncio.gather(
+        *(limiter.call(request, is_overloaded) for _ in range(6))
+    )
+    assert results == ["ok"] * 6
+    assert peak == 2
+    assert limiter.in_flight == 0
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_overload(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("nonebot.adapters.onebot.limiter.BACKOFF_INITIAL", 0.05)
+    limiter = AIMDLimiter(8)
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        if calls <= 2:
+            raise Overloaded
+        return calls
+
+    # overloads inside one backoff window shrink the limit once
+    results = await asyncio.gather(
+        *(limiter.call(request, is_overloaded) for _ in range(2)),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, Overloaded) for r in results)
+    assert limiter.limit == 4
+
+    # new calls wait for the backoff, then the limit grows on success
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    assert await limiter.call(request, is_overloaded) == 3
+    assert loop.time() - start >= 0.04
+    assert limiter.limit == 4.25
+
+    # other failures do not count as overload
+    async def failed():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError, match="failed"):
+        await limiter.call(failed, is_overloaded)
+    assert limiter.limit > 4.25
+
+
+@pytest.mark.asyncio
+async def test_limiter_retry(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("nonebot.adapters.onebot.limiter.BACKOFF_INITIAL", 0.01)
+    limiter = AIMDLimiter(4)
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise Overloaded
+        return "ok"
+
+    assert await limiter.call(request, is_overloaded, retries=2) == "ok"
+    assert calls == 3
+    assert limiter.limit == 1 + 1 / 1
+
+    calls = 0
+    with pytest.raises(Overloaded):
+        await limiter.call(request, is_overloaded, retries=1)
+
+    assert is_idempotent("get_group_list")
+    assert not is_idempotent("send_msg")
+
+
+@pytest.mark.asyncio
+async def test_limiter_cancel():
+    limiter = AIMDLimiter(1)
+    await limiter.acquire()
+    task = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    limiter.release(False)
+    assert limiter.in_flight == 0
+    await asyncio.wait_for(limiter.acquire(), 1)
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_adapter_limiter(monkeypatch: pytest.MonkeyPatch):
+    import nonebot
+    from nonebot.adapters.onebot.utils import WS_CLOSED
+    from nonebot.adapters.onebot.v11 import Bot, Adapter, NetworkError
+
+    adapter = nonebot.get_adapter(Adapter)
+    monkeypatch.setattr(adapter.onebot_config, "onebot_api_max_concurrency", 8)
+
+    # closed connections do not shrink the concurrency window
+    assert adapter._is_overloaded(NetworkError("WebSocket call api timeout"))
+    assert not adapter._is_overloaded(NetworkError(WS_CLOSED))
+
+    bot = Bot(adapter, "0")
+    adapter.bot_connect(bot)
+    assert adapter._get_limiter("0") is not None
+    adapter.bot_disconnect(bot)
+    assert "0" not in adapter.limiters
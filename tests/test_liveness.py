@@ -0,0 +1,110 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from nonebot.message import event_preprocessor, _event_preprocessors
+
+import nonebot
+from nonebot.adapters.onebot import liveness
+from nonebot.adapters.onebot.v11 import Bot, Adapter
+from nonebot.adapters.onebot.liveness import LivenessTracker, is_subscribed
+
+
+def test_liveness_tracker(monkeypatch: pytest.MonkeyPatch):
+    now = 100.0
+    monkeypatch.setattr(liveness, "time", SimpleNamespace(monotonic=lambda: now))
+    tracker = LivenessTracker()
+    assert tracker.is_alive("0") is None
+
+    tracker.beat("0", 5000, True)
+    state = tracker.get("0")
+    assert state is not None
+    assert (state.last_seen, state.interval, state.good) == (100.0, 5.0, True)
+
+    # status is kept when not reported
+    now = 105.0
+    tracker.beat("0", 5000)
+    assert state.good is True
+    assert state.heartbeats == 2
+
+    now = 115.0
+    assert tracker.is_alive("0")
+    now = 115.1
+    assert not tracker.is_alive("0")
+
+    tracker.remove("0")
+    assert tracker.get("0") is None
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_fast_path(monkeypatch: pytest.MonkeyPatch):
+    adapter = nonebot.get_adapter(Adapter)
+    bot = Bot(adapter, "0")
+    handled = []
+
+    async def handle_event(event):
+        handled.append(event)
+
+    monkeypatch.setattr(bot, "handle_event", handle_event)
+    heartbeat = Adapter.json_to_event(
+        {
+            "time": 0,
+            "self_id": 0,
+            "post_type": "meta_event",
+            "meta_event_type": "heartbeat",
+            "status": {"online": True, "good": False},
+            "interval": 5000,
+        }
+    )
+    assert heartbeat is not None
+    assert not is_subscribed("meta_event")
+
+    # heartbeats are only recorded when no matcher handles meta events
+    await adapter._dispatch(bot, heartbeat)
+    assert not handled
+    state = adapter.liveness.get("0")
+    assert state is not None
+    assert state.good is False
+
+    matcher = nonebot.on_metaevent()
+    try:
+        assert is_subscribed("meta_event")
+        await adapter._dispatch(bot, heartbeat)
+        await asyncio.sleep(0.01)
+        assert handled == [heartbeat]
+    finally:
+        matcher.destroy()
+    assert not is_subscribed("meta_event")
+
+    monkeypatch.setattr(adapter.onebot_config, "onebot_forward_heartbeat", True)
+    await adapter._dispatch(bot, heartbeat)
+    await asyncio.sleep(0.01)
+    assert handled == [heartbeat, heartbeat]
+    assert adapter.liveness.bots["0"].heartbeats == 3
+    adapter.liveness.remove("0")
+
+
+def test_is_subscribed(monkeypatch: pytest.MonkeyPatch):
+    assert not is_subscribed("meta_event")
+
+    # the result is kept until matchers are registered or removed
+    matcher = nonebot.on_metaevent()
+    try:
+        assert is_subscribed("meta_event")
+        monkeypatch.setattr(matcher, "type", "message")
+        assert is_subscribed("meta_event")
+    finally:
+        matcher.destroy()
+    assert not is_subscribed("meta_event")
+
+    # event processors also handle heartbeats
+    async def preprocessor():
+        pass
+
+    registered = set(_event_preprocessors)
+    event_preprocessor(preprocessor)
+    try:
+        assert is_subscribed("meta_event")
+    finally:
+        _event_preprocessors.difference_update(_event_preprocessors - registered)
+    assert not is_subscribed("meta_event")
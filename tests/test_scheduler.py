@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from nonebot.adapters.onebot.scheduler import (
+    SendPriority,
+    SendScheduler,
+    use_priority,
+    send_priority,
+)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_rate_limit():
+    scheduler = SendScheduler({"group": 20}, {"group": 2})
+    order: list[str] = []
+
+    async def send(target: str):
+        await scheduler.acquire("0", ("group", target))
+        order.append(target)
+
+    # group 1 is limited after its burst while group 2 is not blocked
+    tasks = [asyncio.create_task(send(t)) for t in ("1", "1", "1", "2")]
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert order == ["1", "1", "2"]
+    await asyncio.wait_for(asyncio.gather(*tasks), 1)
+    assert order == ["1", "1", "2", "1"]
+
+    stats = scheduler.stats("0")
+    assert stats.sent == 4
+    assert stats.queued == {SendPriority.INTERACTIVE: 0, SendPriority.BULK: 0}
+    assert 0 < stats.max_wait <= stats.total_wait
+
+    scheduler.remove("0")
+    assert scheduler.stats("0").sent == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_priority():
+    scheduler = SendScheduler({"bot": 10}, queue_size=2)
+    await scheduler.acquire("0", None)
+    order: list[str] = []
+
+    async def send(name: str, priority: SendPriority):
+        with use_priority(priority):
+            await scheduler.acquire("0", ("user", "1"))
+        order.append(name)
+
+    tasks = [asyncio.create_task(send(f"bulk{i}", SendPriority.BULK)) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(send("reply", SendPriority.INTERACTIVE)))
+    await asyncio.sleep(0)
+    assert send_priority.get() == SendPriority.BULK
+
+    # the third bulk send waits for a queue slot
+    stats = scheduler.stats("0")
+    assert stats.queued == {SendPriority.INTERACTIVE: 1, SendPriority.BULK: 2}
+
+    await asyncio.wait_for(asyncio.gather(*tasks), 2)
+    assert order == ["reply", "bulk0", "bulk1", "bulk2"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_cancel():
+    scheduler = SendScheduler({"user": 10})
+    await scheduler.acquire("0", ("user", "1"))
+    task = asyncio.create_task(scheduler.acquire("0", ("user", "1")))
+    await asyncio.sleep(0)
+    assert scheduler.stats("0").queued[SendPriority.BULK] == 1
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert scheduler.stats("0").queued[SendPriority.BULK] == 0
+    assert await scheduler.acquire("0", ("user", "2")) < 0.05
+
+
+def test_send_target():
+    from nonebot.adapters.onebot.v11.utils import get_send_target as v11_target
+    from nonebot.adapters.onebot.v12.utils import get_send_target as v12_target
+
+    assert v11_target("send_group_msg", {"group_id": 1}) == ("group", "1")
+    assert v11_target("send_msg", {"group_id": 1, "user_id": 2}) == ("group", "1")
+    assert v11_target("send_msg", {"message_type": "private", "user_id": 2}) == (
+        "user",
+        "2",
+    )
+    assert v11_target("send_private_msg", {}) is None
+
+    params = {"detail_type": "channel", "guild_id": "1", "channel_id": "2"}
+    assert v12_target("send_message", params) == ("group", "1/2")
+    params = {"detail_type": "private", "user_id": "3"}
+    assert v12_target("send_message", params) == ("user", "3")
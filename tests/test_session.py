@@ -0,0 +1,139 @@
+import asyncio
+from typing import Any, cast
+
+import pytest
+from nonebot.drivers import HTTPVersion, HTTPClientMixin
+
+from nonebot.adapters.onebot.session import SessionManager
+
+
+class FakeSession:
+    def __init__(self, version: HTTPVersion) -> None:
+        self.version = version
+        self.setup_count = 0
+        self.closed = False
+
+    async def setup(self) -> None:
+        await asyncio.sleep(0)
+        self.setup_count += 1
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeDriver:
+    def __init__(self, support_http2: bool = True) -> None:
+        self.support_http2 = support_http2
+        self.sessions: list[FakeSession] = []
+
+    def get_session(self, headers: Any = None, version: Any = None) -> FakeSession:
+        if version == HTTPVersion.H2 and not self.support_http2:
+            raise RuntimeError(f"Unsupported HTTP version: {version}")
+        session = FakeSession(version)
+        self.sessions.append(session)
+        return session
+
+
+@pytest.mark.asyncio
+async def test_session_manager():
+    driver = FakeDriver()
+    manager = SessionManager("test", cast(HTTPClientMixin, driver))
+
+    first, second = await asyncio.gather(
+        manager.get("http://a/"), manager.get("http://a/")
+    )
+    assert first is second
+    assert await manager.get("http://a/") is first
+    assert "http://a/" in manager
+    # sessions created concurrently are closed
+    assert sum(not session.closed for session in driver.sessions) == 1
+
+    other = await manager.get("http://b/")
+    assert other is not first
+
+    await manager.close("http://a/")
+    assert cast(FakeSession, first).closed
+    assert "http://a/" not in manager
+
+    await manager.close_all()
+    assert cast(FakeSession, other).closed
+    assert "http://b/" not in manager
+
+
+@pytest.mark.asyncio
+async def test_session_manager_http2_fallback():
+    driver = FakeDriver(support_http2=False)
+    manager = SessionManager("test", cast(HTTPClientMixin, driver), http2=True)
+
+    session = cast(FakeSession, await manager.get("http://a/"))
+    assert session.version == HTTPVersion.H11
+    assert manager.version == HTTPVersion.H11
+
+    driver = FakeDriver()
+    manager = SessionManager("test", cast(HTTPClientMixin, driver), http2=True)
+    session = cast(FakeSession, await manager.get("http://a/"))
+    assert session.version == HTTPVersion.H2
+
+
+@pytest.mark.asyncio
+async def test_session_manager_close_waits():
+    driver = FakeDriver()
+    manager = SessionManager("test", cast(HTTPClientMixin, driver))
+
+    await manager.open("http://a/")
+    assert "http://a/" in manager
+    session = cast(FakeSession, await manager.get("http://a/"))
+    assert session.setup_count == 1
+
+    release = asyncio.Event()
+    used: list[FakeSession] = []
+
+    async def request():
+        async with manager.use("http://a/") as current:
+            used.append(cast(FakeSession, current))
+            await release.wait()
+
+    task = asyncio.create_task(request())
+    await asyncio.sleep(0)
+    closing = asyncio.create_task(manager.close("http://a/"))
+    await asyncio.sleep(0.01)
+    # in-flight requests finish before the session is closed
+    assert used == [session]
+    assert not session.closed
+    assert "http://a/" not in manager
+    release.set()
+    await asyncio.wait_for(asyncio.gather(task, closing), 1)
+    assert session.closed
+
+    # waiting is bounded by the timeout
+    release.clear()
+    task = asyncio.create_task(request())
+    await asyncio.sleep(0.01)
+    await manager.close("http://a/", timeout=0.01)
+    assert used[-1] is not session
+    assert used[-1].closed
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_session_opened_on_connect(monkeypatch: pytest.MonkeyPatch):
+    import nonebot
+    from nonebot.adapters.onebot.v11 import Bot, Adapter
+    from nonebot.adapters.onebot.balancer import EndpointPool
+
+    adapter = nonebot.get_adapter(Adapter)
+    driver = FakeDriver()
+    manager = SessionManager("test", cast(HTTPClientMixin, driver))
+    monkeypatch.setattr(adapter, "http_sessions", manager)
+    monkeypatch.setitem(adapter.api_roots, "0", EndpointPool(("http://a/",)))
+
+    bot = Bot(adapter, "0")
+    adapter.bot_connect(bot)
+    await asyncio.sleep(0.01)
+    assert "http://a/" in manager
+    assert len(driver.sessions) == 1
+
+    adapter.bot_disconnect(bot)
+    await asyncio.sleep(0.01)
+    assert "http://a/" not in manager
+    assert driver.sessions[0].closed
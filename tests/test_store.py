@@ -25,3 +25,58 @@ async def test_store():
     resp = await store.fetch(seq, 10.0)
     await task
     assert resp == response_data
+
+
+@pytest.mark.asyncio
+async def test_store_timeout():
+    store = ResultStore()
+
+    slow, fast = store.get_seq(), store.get_seq()
+    slow_task = asyncio.create_task(store.fetch(slow, 0.5))
+    fast_task = asyncio.create_task(store.fetch(fast, 0.1))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await fast_task
+    assert not slow_task.done()
+    with pytest.raises(asyncio.TimeoutError):
+        await slow_task
+
+    # late results are ignored
+    store.add_result({"echo": str(slow)})
+    assert not store._futures
+
+
+@pytest.mark.asyncio
+async def test_store_deadlines_compacted():
+    store = ResultStore()
+
+    pending = asyncio.create_task(store.fetch(store.get_seq(), 60.0))
+    for _ in range(100):
+        seq = store.get_seq()
+        task = asyncio.create_task(store.fetch(seq, 60.0))
+        await asyncio.sleep(0)
+        store.add_result({"echo": str(seq)})
+        await task
+
+    # deadlines of finished calls do not pile up
+    assert len(store._deadlines) <= 2 * store.pending + 1
+    store.add_result({"echo": str(store.current_seq - 101)})
+    await pending
+    assert not store._deadlines
+    assert store._timer is None
+
+
+@pytest.mark.asyncio
+async def test_store_close():
+    store = ResultStore()
+
+    seq = store.get_seq()
+    task = asyncio.create_task(store.fetch(seq, 60.0))
+    await asyncio.sleep(0)
+
+    store.close(ValueError("closed"))
+    assert store.closed
+    with pytest.raises(ValueError, match="closed"):
+        await task
+    with pytest.raises(ValueError, match="closed"):
+        await store.fetch(store.get_seq(), 60.0)
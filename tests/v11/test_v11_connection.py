@@ -1,12 +1,22 @@
 import json
 import asyncio
+from typing import cast
 from pathlib import Path
 
 import pytest
 from nonebug import App
 
 import nonebot
-from nonebot.adapters.onebot.v11 import Adapter
+from nonebot.adapters.onebot.dispatcher import EventDispatcher
+from nonebot.adapters.onebot.v11.history import MessageHistory
+from nonebot.adapters.onebot.v11 import (
+    Bot,
+    Event,
+    Adapter,
+    NetworkError,
+    ApiNotAvailable,
+    GroupMessageEvent,
+)
 
 
 @pytest.mark.asyncio
@@ -50,3 +60,246 @@ async def test_ws(app: App, endpoints: str):
         await asyncio.sleep(1)
         assert "0" not in nonebot.get_bots()
         assert "0" not in adapter.bots
+
+
+@pytest.mark.asyncio
+async def test_ws_api_fail_fast(app: App):
+    async with app.test_server() as ctx:
+        client = ctx.get_client()
+        headers = {"X-Self-ID": "0", "Authorization": "Bearer test1"}
+        async with client.websocket_connect("/onebot/v11/ws", headers=headers) as ws:
+            bot = nonebot.get_bot("0")
+
+            task = asyncio.create_task(bot.call_api("get_login_info"))
+            request = json.loads(await ws.receive_text())
+            assert request["action"] == "get_login_info"
+            await ws.send_text(
+                json.dumps(
+                    {
+                        "status": "ok",
+                        "retcode": 0,
+                        "data": {"user_id": 0},
+                        "echo": request["echo"],
+                    }
+                )
+            )
+            assert await task == {"user_id": 0}
+
+            # pending calls fail as soon as the connection is gone
+            task = asyncio.create_task(bot.call_api("get_login_info", _timeout=60))
+            await ws.receive_text()
+            await ws.close()
+
+        with pytest.raises(NetworkError, match="closed"):
+            await asyncio.wait_for(task, 5)
+
+
+@pytest.mark.asyncio
+async def test_ws_dispatch_backlog(app: App, monkeypatch: pytest.MonkeyPatch):
+    with (Path(__file__).parent / "events.json").open("r") as f:
+        event = json.load(f)[0]
+        event.pop("_model")
+
+    adapter = nonebot.get_adapter(Adapter)
+    dispatcher = EventDispatcher("test", 1, 1)
+    monkeypatch.setattr(adapter, "dispatcher", dispatcher)
+    handled: list[int] = []
+
+    async def handle_event(bot: Bot, event: Event):
+        handled.append(await bot.call_api("get_login_info"))
+
+    monkeypatch.setattr(Bot, "handle_event", handle_event)
+
+    async with app.test_server() as ctx:
+        client = ctx.get_client()
+        headers = {"X-Self-ID": "0", "Authorization": "Bearer test1"}
+        async with client.websocket_connect("/onebot/v11/ws", headers=headers) as ws:
+            # one event running, one queued and one waiting for the full queue
+            for _ in range(3):
+                await ws.send_text(json.dumps(event))
+
+            # api results are still read while the queue is full
+            for i in range(3):
+                request = json.loads(await asyncio.wait_for(ws.receive_text(), 5))
+                await ws.send_text(
+                    json.dumps(
+                        {
+                            "status": "ok",
+                            "retcode": 0,
+                            "data": i,
+                            "echo": request["echo"],
+                        }
+                    )
+                )
+            await asyncio.sleep(0.1)
+            assert handled == [0, 1, 2]
+            await ws.close()
+
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_ws_flow_control(app: App, monkeypatch: pytest.MonkeyPatch):
+    with (Path(__file__).parent / "events.json").open("r") as f:
+        event = json.load(f)[0]
+        event.pop("_model")
+
+    adapter = nonebot.get_adapter(Adapter)
+    monkeypatch.setattr(adapter.onebot_config, "onebot_ws_high_water", 2)
+    monkeypatch.setattr(adapter.onebot_config, "onebot_ws_low_water", 0)
+    running: list[int] = []
+    handled: list[int] = []
+
+    async def handle_event(bot: Bot, event: Event):
+        running.append(1)
+        try:
+            handled.append(await bot.call_api("get_login_info"))
+        finally:
+            running.pop()
+
+    monkeypatch.setattr(Bot, "handle_event", handle_event)
+
+    async with app.test_server() as ctx:
+        client = ctx.get_client()
+        headers = {"X-Self-ID": "0", "Authorization": "Bearer test1"}
+        async with client.websocket_connect("/onebot/v11/ws", headers=headers) as ws:
+            for _ in range(2):
+                await ws.send_text(json.dumps(event))
+            requests = [
+                json.loads(await asyncio.wait_for(ws.receive_text(), 5))
+                for _ in range(2)
+            ]
+
+            # events read for pending api calls wait until reading is resumed
+            for _ in range(3):
+                await ws.send_text(json.dumps(event))
+            await asyncio.sleep(0.1)
+            assert len(running) == 2
+
+            for i in range(5):
+                request = (
+                    requests[i]
+                    if i < 2
+                    else json.loads(await asyncio.wait_for(ws.receive_text(), 5))
+                )
+                await ws.send_text(
+                    json.dumps(
+                        {
+                            "status": "ok",
+                            "retcode": 0,
+                            "data": i,
+                            "echo": request["echo"],
+                        }
+                    )
+                )
+                await asyncio.sleep(0.05)
+                assert len(running) <= 2
+            assert sorted(handled) == [0, 1, 2, 3, 4]
+            await ws.close()
+
+
+@pytest.mark.asyncio
+async def test_ws_multi_connection(app: App, monkeypatch: pytest.MonkeyPatch):
+    adapter = nonebot.get_adapter(Adapter)
+    monkeypatch.setattr(adapter.onebot_config, "onebot_multi_connection", True)
+
+    async with app.test_server() as ctx:
+        client = ctx.get_client()
+        headers = {"X-Self-ID": "0", "Authorization": "Bearer test1"}
+        async with client.websocket_connect("/onebot/v11/ws", headers=headers) as ws1:
+            async with client.websocket_connect(
+                "/onebot/v11/ws", headers=headers
+            ) as ws2:
+                bot = nonebot.get_bot("0")
+                assert len(adapter.connection_pools["0"]) == 2
+                assert adapter.connections["0"] in adapter.connection_pools["0"]
+
+                # the connection with fewer outstanding calls is picked
+                tasks = [
+                    asyncio.create_task(bot.call_api("get_login_info"))
+                    for _ in range(2)
+                ]
+                for ws in (ws1, ws2):
+                    request = json.loads(await ws.receive_text())
+                    await ws.send_text(
+                        json.dumps(
+                            {
+                                "status": "ok",
+                                "retcode": 0,
+                                "data": {"user_id": 0},
+                                "echo": request["echo"],
+                            }
+                        )
+                    )
+                assert await asyncio.gather(*tasks) == [{"user_id": 0}] * 2
+                await ws2.close()
+
+            await asyncio.sleep(1)
+            # the bot stays online while a connection remains
+            assert nonebot.get_bot("0") is bot
+            assert len(adapter.connection_pools["0"]) == 1
+            assert adapter.connections["0"] in adapter.connection_pools["0"]
+            await ws1.close()
+
+        await asyncio.sleep(1)
+        assert "0" not in adapter.bots
+        assert "0" not in adapter.connections
+        assert "0" not in adapter.connection_pools
+
+
+@pytest.mark.asyncio
+async def test_http_quick_operation(app: App, monkeypatch: pytest.MonkeyPatch):
+    with (Path(__file__).parent / "events.json").open("r") as f:
+        test_events = json.load(f)
+
+    adapter = nonebot.get_adapter(Adapter)
+    monkeypatch.setattr(adapter.onebot_config, "onebot_quick_operation_timeout", 1)
+    # quick operations are handled by the event workers
+    dispatcher = EventDispatcher("test", 1, 10)
+    monkeypatch.setattr(adapter, "dispatcher", dispatcher)
+    replies: list[str] = []
+
+    async def handle_event(bot: Bot, event: Event):
+        if not isinstance(event, GroupMessageEvent):
+            return
+        replies.append(await bot.send(event, "hello"))
+        # later sends go through the API after the quick reply
+        try:
+            await bot.send(event, "world")
+        except ApiNotAvailable:
+            replies.append("fallback")
+
+    monkeypatch.setattr(Bot, "handle_event", handle_event)
+
+    async with app.test_server() as ctx:
+        client = ctx.get_client()
+        headers = {"X-Self-ID": "0", "Authorization": "Bearer test1"}
+        event = test_events[1]
+        event.pop("_model")
+        resp = await client.post("/onebot/v11/http", json=event, headers=headers)
+        assert resp.status_code == 200
+        assert resp.json() == {
+            "reply": [{"type": "text", "data": {"text": "hello"}}],
+            "at_sender": False,
+        }
+        await asyncio.sleep(0.1)
+        assert replies == [{}, "fallback"]
+
+        # no reply within the handling falls back to the default response
+        event = test_events[0]
+        event.pop("_model")
+        resp = await client.post("/onebot/v11/http", json=event, headers=headers)
+        assert resp.status_code == 204
+        assert dispatcher.stats().dispatched == 2
+
+        # replies are sent through the API to be kept in the reply cache
+        bot = cast(Bot, nonebot.get_bot("0"))
+        monkeypatch.setattr(bot, "message_history", MessageHistory(10, 60))
+        event = test_events[1]
+        resp = await client.post("/onebot/v11/http", json=event, headers=headers)
+        assert resp.status_code == 204
+        await asyncio.sleep(0.1)
+        assert replies == [{}, "fallback"]
+        adapter.bot_disconnect(bot)
+
+    await dispatcher.close()
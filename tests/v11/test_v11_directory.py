@@ -0,0 +1,221 @@
+import asyncio
+from typing import Any
+from types import SimpleNamespace
+
+import pytest
+
+import nonebot
+from nonebot.adapters.onebot.v11.directory import Directory
+from nonebot.adapters.onebot.v11 import (
+    Bot,
+    Adapter,
+    FriendAddNoticeEvent,
+    GroupAdminNoticeEvent,
+    GroupDecreaseNoticeEvent,
+    GroupIncreaseNoticeEvent,
+)
+
+RESULTS: dict[str, Any] = {
+    "get_group_list": [{"group_id": 1, "group_name": "a"}],
+    "get_group_member_list": [
+        {"group_id": 1, "user_id": 10, "role": "owner"},
+        {"group_id": 1, "user_id": 11, "role": "member"},
+    ],
+    "get_group_member_info": {"group_id": 1, "user_id": 12, "role": "member"},
+    "get_friend_list": [{"user_id": 10, "nickname": "b"}],
+}
+
+
+@pytest.mark.asyncio
+async def test_directory(monkeypatch: pytest.MonkeyPatch):
+    adapter = nonebot.get_adapter(Adapter)
+    bot = Bot(adapter, "0")
+    calls: list[str] = []
+
+    async def _request_api(bot: Bot, api: str, **data: Any) -> Any:
+        calls.append(api)
+        return RESULTS[api]
+
+    monkeypatch.setattr(adapter, "_request_api", _request_api)
+    directory = adapter.directories["0"] = Directory(bot)
+    try:
+        await directory.warm()
+        assert calls == ["get_group_list", "get_group_member_list", "get_friend_list"]
+
+        # lookups are served from the directory
+        calls.clear()
+        assert await bot.get_group_list() == RESULTS["get_group_list"]
+        member = await bot.get_group_member_info(group_id=1, user_id=11)
+        assert member["role"] == "member"
+        assert len(await bot.get_group_member_list(group_id="1")) == 2
+        assert await bot.get_friend_list() == RESULTS["get_friend_list"]
+        assert calls == []
+
+        # unknown entries and no_cache go to the network
+        await bot.get_group_member_info(group_id=1, user_id=12)
+        await bot.get_group_list(no_cache=True)
+        assert calls == ["get_group_member_info", "get_group_list"]
+
+        event = GroupAdminNoticeEvent(
+            time=0,
+            self_id=0,
+            post_type="notice",
+            notice_type="group_admin",
+            sub_type="set",
+            group_id=1,
+            user_id=11,
+        )
+        directory.update(event)
+        member = await bot.get_group_member_info(group_id=1, user_id=11)
+        assert member["role"] == "admin"
+
+        calls.clear()
+        event = GroupIncreaseNoticeEvent(
+            time=0,
+            self_id=0,
+            post_type="notice",
+            notice_type="group_increase",
+            sub_type="approve",
+            group_id=1,
+            user_id=12,
+            operator_id=0,
+        )
+        directory.update(event)
+        await asyncio.gather(*directory.tasks)
+        assert calls == ["get_group_member_info"]
+        assert len(await bot.get_group_member_list(group_id=1)) == 3
+
+        event = GroupDecreaseNoticeEvent(
+            time=0,
+            self_id=0,
+            post_type="notice",
+            notice_type="group_decrease",
+            sub_type="leave",
+            group_id=1,
+            user_id=10,
+            operator_id=10,
+        )
+        directory.update(event)
+        assert len(await bot.get_group_member_list(group_id=1)) == 2
+
+        event = GroupDecreaseNoticeEvent(
+            time=0,
+            self_id=0,
+            post_type="notice",
+            notice_type="group_decrease",
+            sub_type="kick_me",
+            group_id=1,
+            user_id=0,
+            operator_id=10,
+        )
+        directory.update(event)
+        assert await bot.get_group_list() == []
+        assert 1 not in directory.members
+    finally:
+        directory.close()
+        adapter.directories.pop("0", None)
+
+
+@pytest.mark.asyncio
+async def test_directory_refresh(monkeypatch: pytest.MonkeyPatch):
+    from nonebot.adapters.onebot import directory as base
+    from nonebot.adapters.onebot.cache import ResponseCache
+
+    adapter = nonebot.get_adapter(Adapter)
+    bot = Bot(adapter, "0")
+    calls: list[str] = []
+    friends = [{"user_id": 10, "nickname": "b"}]
+
+    async def _request_api(bot: Bot, api: str, **data: Any) -> Any:
+        calls.append(api)
+        return list(friends) if api == "get_friend_list" else RESULTS[api]
+
+    now = 100.0
+    monkeypatch.setattr(base, "time", SimpleNamespace(monotonic=lambda: now))
+    monkeypatch.setattr(adapter, "_request_api", _request_api)
+    monkeypatch.setattr(
+        adapter,
+        "response_cache",
+        ResponseCache({"get_friend_list": 600, "get_group_list": 600}),
+    )
+    directory = adapter.directories["0"] = Directory(bot, ttl=60)
+    try:
+        await directory.warm()
+        assert len(await bot.get_friend_list()) == 1
+
+        # a friend-add notice goes to the network until the list is reloaded
+        calls.clear()
+        friends.append({"user_id": 11, "nickname": "c"})
+        directory.update(
+            FriendAddNoticeEvent(
+                time=0,
+                self_id=0,
+                post_type="notice",
+                notice_type="friend_add",
+                user_id=11,
+            )
+        )
+        assert len(await bot.get_friend_list()) == 2
+        await asyncio.gather(*directory.tasks)
+        assert calls == ["get_friend_list", "get_friend_list"]
+        assert len(directory.friends.list()) == 2
+
+        # expired lists are reloaded in the background
+        calls.clear()
+        now += 60
+        assert await bot.get_group_list() == RESULTS["get_group_list"]
+        await asyncio.gather(*directory.tasks)
+        assert calls == ["get_group_list", "get_group_list"]
+        calls.clear()
+        assert await bot.get_group_list() == RESULTS["get_group_list"]
+        assert calls == []
+    finally:
+        directory.close()
+        adapter.directories.pop("0", None)
+
+
+@pytest.mark.asyncio
+async def test_directory_ignored_events(monkeypatch: pytest.MonkeyPatch):
+    adapter = nonebot.get_adapter(Adapter)
+    bot = Bot(adapter, "0")
+    handled: list[str] = []
+
+    async def _request_api(bot: Bot, api: str, **data: Any) -> Any:
+        return RESULTS[api]
+
+    async def handle_event(event: Any) -> None:
+        handled.append(event.get_event_name())
+
+    monkeypatch.setattr(adapter, "_request_api", _request_api)
+    monkeypatch.setattr(bot, "handle_event", handle_event)
+    monkeypatch.setattr(adapter.onebot_config, "onebot_ignored_events", {"notice"})
+    monkeypatch.setattr(adapter.onebot_config, "onebot_use_directory", True)
+    monkeypatch.setattr(adapter.onebot_config, "onebot_api_max_concurrency", 1)
+    data = {
+        "time": 0,
+        "self_id": 0,
+        "post_type": "notice",
+        "notice_type": "group_decrease",
+        "sub_type": "leave",
+        "group_id": 1,
+        "user_id": 10,
+        "operator_id": 10,
+    }
+    assert adapter._is_ignored({**data, "notice_type": "group_upload"})
+    assert not adapter._is_ignored(data)
+
+    directory = adapter.directories["0"] = Directory(bot)
+    try:
+        await directory.warm()
+        # directory requests share the bot's api limiter
+        assert "0" in adapter.limiters
+        # directory events are parsed for the directory but not handled
+        event = adapter.json_to_event(data)
+        assert event
+        assert not await adapter._dispatch(bot, event)
+        assert 10 not in directory.members[1]
+        assert handled == []
+    finally:
+        directory.close()
+        adapter.directories.pop("0", None)
+        adapter.limiters.pop("0", None)
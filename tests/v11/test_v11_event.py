@@ -6,10 +6,16 @@ import pytest
 from nonebot.log import logger
 from nonebot.compat import model_dump
 
+import nonebot
 from nonebot.adapters.onebot.v11.event import Sender
+from nonebot.adapters.onebot.utils import log_enabled
+from nonebot.adapters.onebot.v11.exception import NoLogException
 from nonebot.adapters.onebot.v11 import (
+    Bot,
     Event,
     Adapter,
+    Message,
+    MessageEvent,
     MessageSegment,
     PrivateMessageEvent,
 )
@@ -36,7 +42,7 @@ async def test_event():
 
 
 @pytest.mark.asyncio
-async def test_event_log():
+async def test_event_log(monkeypatch: pytest.MonkeyPatch):
     msg = (
         MessageSegment.text("[text]")
         + MessageSegment.at(123)
@@ -60,3 +66,318 @@ async def test_event_log():
     logger.opt(colors=True).success(
         f"{event.get_event_name()}: {event.get_event_description()}"
     )
+    assert event.get_log_string()
+
+    def _description(self) -> str:
+        raise AssertionError("description should not be rendered")
+
+    # descriptions are not rendered when the log level is disabled
+    monkeypatch.setattr(nonebot.get_driver().config, "log_level", "WARNING")
+    monkeypatch.setattr(PrivateMessageEvent, "get_event_description", _description)
+    assert not log_enabled("SUCCESS")
+    with pytest.raises(NoLogException):
+        event.get_log_string()
+
+    monkeypatch.setattr(nonebot.get_driver().config, "log_level", "INFO")
+    assert log_enabled("SUCCESS")
+    assert not log_enabled("DEBUG")
+
+    # other sinks are respected, unknown levels are always enabled
+    sink_id = logger.add(lambda _: None, level="DEBUG")
+    try:
+        assert log_enabled("DEBUG")
+    finally:
+        logger.remove(sink_id)
+    assert not log_enabled("DEBUG")
+    assert log_enabled("CUSTOM_LEVEL")
+
+
+def test_sink_level_cached(monkeypatch: pytest.MonkeyPatch):
+    from nonebot.adapters.onebot import utils
+
+    level = utils._sink_level()
+
+    # handlers are only scanned again when loguru replaces the handler set
+    def levelno(_):
+        raise AssertionError("handlers should not be scanned")
+
+    monkeypatch.setattr(utils, "min", levelno, raising=False)
+    assert utils._sink_level() == level
+    monkeypatch.undo()
+
+    sink_id = logger.add(lambda _: None, level="DEBUG")
+    try:
+        assert utils._sink_level() == logger.level("DEBUG").no
+    finally:
+        logger.remove(sink_id)
+    assert utils._sink_level() == level
+
+
+@pytest.mark.asyncio
+async def test_api_log_disabled(monkeypatch: pytest.MonkeyPatch):
+    from nonebot.adapters.onebot.v11 import adapter as adapter_module
+    from nonebot.adapters.onebot.v11.exception import ApiNotAvailable
+
+    adapter = nonebot.get_adapter(Adapter)
+    bot = Bot(adapter, "0")
+    logged: list[str] = []
+    monkeypatch.setattr(
+        adapter_module, "log", lambda level, message, *_: logged.append(message)
+    )
+
+    # no debug message is formatted at INFO
+    monkeypatch.setattr(nonebot.get_driver().config, "log_level", "INFO")
+    for _ in range(100):
+        with pytest.raises(ApiNotAvailable):
+            await adapter._request_api(bot, "get_status")
+    assert not logged
+
+    monkeypatch.setattr(nonebot.get_driver().config, "log_level", "DEBUG")
+    with pytest.raises(ApiNotAvailable):
+        await adapter._request_api(bot, "get_status")
+    assert logged == ["Calling API <y>get_status</y>"]
+
+
+@pytest.mark.asyncio
+async def test_event_ignored(monkeypatch: pytest.MonkeyPatch):
+    adapter = nonebot.get_adapter(Adapter)
+    monkeypatch.setattr(
+        adapter.onebot_config,
+        "onebot_ignored_events",
+        {"meta_event.heartbeat", "notice"},
+    )
+
+    heartbeat = {
+        "time": 0,
+        "self_id": 0,
+        "post_type": "meta_event",
+        "meta_event_type": "heartbeat",
+        "status": {"online": True, "good": True},
+        "interval": 5000,
+    }
+    lifecycle = {
+        "time": 0,
+        "self_id": 0,
+        "post_type": "meta_event",
+        "meta_event_type": "lifecycle",
+        "sub_type": "connect",
+    }
+    notice = {
+        "time": 0,
+        "self_id": 0,
+        "post_type": "notice",
+        "notice_type": "friend_add",
+        "user_id": 1,
+    }
+    assert adapter._is_ignored(heartbeat)
+    assert adapter._is_ignored(notice)
+    assert not adapter._is_ignored(lifecycle)
+    assert not adapter._is_ignored({"status": "ok", "retcode": 0, "echo": "1"})
+
+
+@pytest.mark.asyncio
+async def test_event_priority(monkeypatch: pytest.MonkeyPatch):
+    from nonebot.adapters.onebot.dispatcher import EventPriority
+
+    adapter = nonebot.get_adapter(Adapter)
+    monkeypatch.setattr(
+        adapter.onebot_config,
+        "onebot_event_priorities",
+        {"notice.friend_add": EventPriority.MESSAGE},
+    )
+
+    def group_message(message: list) -> Event:
+        return Adapter.json_to_event(
+            {
+                "time": 0,
+                "self_id": 0,
+                "post_type": "message",
+                "message_type": "group",
+                "sub_type": "normal",
+                "message_id": 1,
+                "group_id": 1,
+                "user_id": 1,
+                "message": message,
+                "raw_message": "",
+                "font": 0,
+                "sender": {"user_id": 1},
+            }
+        )
+
+    text = {"type": "text", "data": {"text": "hello"}}
+    mention = group_message([{"type": "at", "data": {"qq": "0"}}, text])
+    assert adapter._get_priority(mention) == EventPriority.MENTION
+    other = group_message([{"type": "at", "data": {"qq": "2"}}, text])
+    assert adapter._get_priority(other) == EventPriority.MESSAGE
+    heartbeat = Adapter.json_to_event(
+        {
+            "time": 0,
+            "self_id": 0,
+            "post_type": "meta_event",
+            "meta_event_type": "heartbeat",
+            "status": {"online": True, "good": True},
+            "interval": 5000,
+        }
+    )
+    assert adapter._get_priority(heartbeat) == EventPriority.META
+    notice = Adapter.json_to_event(
+        {
+            "time": 0,
+            "self_id": 0,
+            "post_type": "notice",
+            "notice_type": "friend_add",
+            "user_id": 1,
+        }
+    )
+    assert adapter._get_priority(notice) == EventPriority.MESSAGE
+
+
+@pytest.mark.asyncio
+async def test_event_copy_on_write():
+    from nonebot.adapters.onebot.v11.bot import _reduce, _check_at_me, _copy_on_write
+
+    event = Adapter.json_to_event(
+        {
+            "time": 0,
+            "self_id": 0,
+            "post_type": "message",
+            "message_type": "group",
+            "sub_type": "normal",
+            "message_id": 1,
+            "group_id": 1,
+            "user_id": 1,
+            "message": [
+                {"type": "at", "data": {"qq": "0"}},
+                {"type": "text", "data": {"text": " hello"}},
+                {"type": "text", "data": {"text": " world"}},
+            ],
+            "raw_message": "[CQ:at,qq=0] hello world",
+            "font": 0,
+            "sender": {"user_id": 1},
+        }
+    )
+    assert isinstance(event, MessageEvent)
+    assert event.message is not event.original_message
+    assert event.message[0] is event.original_message[0]
+
+    original = Message(
+        [
+            MessageSegment.at(0),
+            MessageSegment.text(" hello"),
+            MessageSegment.text(" world"),
+        ]
+    )
+    bot = Bot(nonebot.get_adapter(Adapter), "0")
+    _reduce(event)
+    _check_at_me(bot, event)
+    assert event.to_me
+    assert event.message == Message("hello world")
+    assert event.original_message == original
+
+    # message without mutation shares the segments
+    event = Adapter.json_to_event(
+        {
+            "time": 0,
+            "self_id": 0,
+            "post_type": "message",
+            "message_type": "private",
+            "sub_type": "friend",
+            "message_id": 1,
+            "user_id": 1,
+            "message": [{"type": "text", "data": {"text": "hello"}}],
+            "raw_message": "hello",
+            "font": 0,
+            "sender": {"user_id": 1},
+        }
+    )
+    assert isinstance(event, MessageEvent)
+    _reduce(event)
+    _check_at_me(bot, event)
+    assert event.to_me
+    assert event.message[0] is event.original_message[0]
+
+    # changes to the message list by plugins keep the original message
+    event.get_message().pop()
+    event.message += MessageSegment.text("world")
+    assert event.original_message == Message("hello")
+
+    # nested data is copied before the adapter changes a segment
+    event.original_message[0].data["extra"] = {"key": "value"}
+    event.message.insert(0, event.original_message[0])
+    _copy_on_write(event)
+    event.message[0].data["extra"]["key"] = "changed"
+    assert event.original_message[0].data["extra"] == {"key": "value"}
+
+
+@pytest.mark.asyncio
+async def test_event_reply_history(monkeypatch: pytest.MonkeyPatch):
+    from nonebot.adapters.onebot.v11.bot import _check_reply
+
+    adapter = nonebot.get_adapter(Adapter)
+    monkeypatch.setattr(adapter.onebot_config, "onebot_reply_cache_size", 2)
+    bot = Bot(adapter, "0")
+    assert bot.message_history is not None
+    calls: list[str] = []
+
+    async def _request_api(bot: Bot, api: str, **data):
+        calls.append(api)
+        if api == "get_msg":
+            return {
+                "time": 0,
+                "message_type": "private",
+                "message_id": data["message_id"],
+                "real_id": data["message_id"],
+                "sender": {"user_id": 2},
+                "message": "remote",
+            }
+        return {"message_id": 5}
+
+    monkeypatch.setattr(adapter, "_request_api", _request_api)
+
+    def make_event(message_id: int, message: Message) -> MessageEvent:
+        event = Adapter.json_to_event(
+            {
+                "time": 0,
+                "self_id": 0,
+                "post_type": "message",
+                "message_type": "group",
+                "sub_type": "normal",
+                "message_id": message_id,
+                "group_id": 1,
+                "user_id": 1,
+                "message": message,
+                "raw_message": str(message),
+                "font": 0,
+                "sender": {"user_id": 1, "nickname": "a"},
+            }
+        )
+        assert isinstance(event, MessageEvent)
+        return event
+
+    # messages sent by the bot are recorded
+    await bot.send_group_msg(group_id=1, message="[CQ:face,id=1]", auto_escape=True)
+    event = make_event(1, MessageSegment.reply(5) + "hello")
+    await _check_reply(bot, event)
+    assert event.reply is not None
+    assert event.reply.message == Message(MessageSegment.text("[CQ:face,id=1]"))
+    assert event.to_me
+    assert event.message == Message("hello")
+    assert calls == ["send_group_msg"]
+
+    # received messages are recorded
+    bot.message_history.add_event(event)
+    reply_event = make_event(2, MessageSegment.reply(1) + "world")
+    await _check_reply(bot, reply_event)
+    assert reply_event.reply is not None
+    assert reply_event.reply.sender.nickname == "a"
+    assert reply_event.reply.message == event.original_message
+    assert reply_event.reply.message is not event.original_message
+    assert not reply_event.to_me
+
+    # unknown messages fall back to get_msg
+    bot.message_history.add_event(reply_event)
+    event = make_event(3, MessageSegment.reply(5) + "again")
+    await _check_reply(bot, event)
+    assert event.reply is not None
+    assert event.reply.sender.user_id == 2
+    assert calls == ["send_group_msg", "get_msg"]
@@ -1,5 +1,12 @@
+import re
+import json
+import random
+
 import pytest
 
+from nonebot.adapters.onebot.codec import get_codec
+from nonebot.adapters.onebot.v11.adapter import CustomEncoder
+from nonebot.adapters.onebot.v11.utils import escape, unescape
 from nonebot.adapters.onebot.v11 import Message, MessageSegment
 
 
@@ -29,3 +36,86 @@ async def test_message_rich_expr():
     assert a.to_rich_text() == "&#91;test&#93;,test"
     b = MessageSegment.at(123)
     assert b.to_rich_text() == "[at:qq=123]"
+
+
+def _legacy_unescape(s: str) -> str:
+    return (
+        s.replace("&#44;", ",")
+        .replace("&#91;", "[")
+        .replace("&#93;", "]")
+        .replace("&amp;", "&")
+    )
+
+
+def _legacy_construct(msg: str) -> list[MessageSegment]:
+    segments: list[MessageSegment] = []
+    text_begin = 0
+    for cqcode in re.finditer(
+        r"\[CQ:(?P<type>[a-zA-Z0-9-_.]+)"
+        r"(?P<params>(?:,[a-zA-Z0-9-_.]+=[^,\]]*)*),?\]",
+        msg,
+    ):
+        if text := msg[text_begin : cqcode.start()]:
+            segments.append(MessageSegment.text(_legacy_unescape(text)))
+        text_begin = cqcode.end()
+        params = filter(None, cqcode.group("params").lstrip(",").split(","))
+        data = {
+            k: _legacy_unescape(v)
+            for k, v in (x.split("=", maxsplit=1) for x in params)
+        }
+        segments.append(MessageSegment(cqcode.group("type"), data))
+    if text := msg[text_begin:]:
+        segments.append(MessageSegment.text(_legacy_unescape(text)))
+    return segments
+
+
+@pytest.mark.asyncio
+async def test_message_parse():
+    assert Message("[CQ:face,id=1]a&#91;b&#93;[CQ:at,qq=123,]") == Message(
+        [
+            MessageSegment.face(1),
+            MessageSegment.text("a[b]"),
+            MessageSegment.at(123),
+        ]
+    )
+    assert Message("[CQ:image,file=a&#44;b,url=]") == Message(
+        MessageSegment("image", {"file": "a,b", "url": ""})
+    )
+    assert Message("[CQ:a,b][CQ:c]") == Message(
+        [MessageSegment.text("[CQ:a,b]"), MessageSegment("c", {})]
+    )
+
+    rng = random.Random(0)
+    alphabet = ["[CQ:", "[", "]", ",", "=", "a", "b", " ", "&", "&#44;", "&amp;"]
+    for _ in range(2000):
+        msg = "".join(rng.choices(alphabet, k=rng.randint(0, 20)))
+        assert list(Message(msg)) == _legacy_construct(msg), msg
+        assert unescape(msg) == _legacy_unescape(msg), msg
+        assert unescape(escape(msg)) == msg
+        assert unescape(escape(msg, escape_comma=False)) == msg
+
+
+@pytest.mark.asyncio
+async def test_message_parse_unterminated():
+    # unterminated cq codes must not cause quadratic backtracking
+    msg = "[CQ:a,b=" * 20000
+    assert Message(msg) == Message(MessageSegment.text(msg))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+async def test_message_to_dict(codec: str):
+    pytest.importorskip(codec)
+
+    segment = MessageSegment("image", {"file": "a.png", "cache": None})
+    assert segment.to_dict() == {"type": "image", "data": {"file": "a.png"}}
+
+    encoded = get_codec(codec, CustomEncoder().default).dumps(
+        {"message": Message([segment, MessageSegment.text("test")])}
+    )
+    assert json.loads(encoded) == {
+        "message": [
+            {"type": "image", "data": {"file": "a.png"}},
+            {"type": "text", "data": {"text": "test"}},
+        ]
+    }
@@ -1,7 +1,17 @@
 import pytest
+import msgpack
 
 import nonebot
-from nonebot.adapters.onebot.v12 import Adapter, BadRequest, ActionFailedWithRetcode
+from nonebot.adapters.onebot.v12.utils import MsgpackUnpacker
+from nonebot.adapters.onebot.v12 import (
+    Adapter,
+    Message,
+    IAmTired,
+    BadRequest,
+    NetworkError,
+    MessageSegment,
+    ActionFailedWithRetcode,
+)
 
 
 @pytest.mark.asyncio
@@ -37,3 +47,51 @@ async def test_api_result_handle():
                 "message": "test message",
             }
         )
+
+
+@pytest.mark.asyncio
+async def test_msgpack():
+    adapter = nonebot.get_adapter(Adapter)
+
+    action = {
+        "action": "upload_file",
+        "params": {
+            "data": b"\x00\xff",
+            "message": Message(MessageSegment("custom", {"data": b"\x01"})),
+        },
+        "echo": "1",
+    }
+    packed = adapter._packer.pack(action)
+    # bytes are encoded as msgpack bin without any conversion
+    assert msgpack.unpackb(packed) == {
+        "action": "upload_file",
+        "params": {
+            "data": b"\x00\xff",
+            "message": [{"type": "custom", "data": {"data": b"\x01"}}],
+        },
+        "echo": "1",
+    }
+
+    unpacker = MsgpackUnpacker()
+    assert unpacker.unpack(packed) == msgpack.unpackb(packed)
+    assert unpacker.unpack(msgpack.packb([1, "a"])) == [1, "a"]
+
+    with pytest.raises(ValueError, match="extra data"):
+        unpacker.unpack(msgpack.packb(1) + msgpack.packb(2))
+    with pytest.raises(msgpack.FormatError):
+        unpacker.unpack(b"\xc1")
+    # the unpacker recovers from invalid frames
+    assert unpacker.unpack(msgpack.packb({"a": 1})) == {"a": 1}
+
+    assert MsgpackUnpacker(use_list=False).unpack(msgpack.packb([[1]])) == ((1,),)
+
+
+@pytest.mark.asyncio
+async def test_api_overloaded(monkeypatch: pytest.MonkeyPatch):
+    adapter = nonebot.get_adapter(Adapter)
+    monkeypatch.setattr(adapter.onebot_config, "onebot_api_overload_retcodes", {61})
+
+    assert adapter._is_overloaded(IAmTired("failed", 36000, "tired", None))
+    assert adapter._is_overloaded(NetworkError("timeout"))
+    assert adapter._is_overloaded(ActionFailedWithRetcode("failed", 61, "", None))
+    assert not adapter._is_overloaded(BadRequest("failed", 10001, "", None))
@@ -3,9 +3,12 @@ import asyncio
 from pathlib import Path
 
 import pytest
+import msgpack
 from nonebug import App
 
 import nonebot
+from nonebot.adapters.onebot.v12 import Bot, Event
+from nonebot.adapters.onebot.v12 import MessageEvent
 from nonebot.adapters.onebot.v11 import Adapter as V11Adapter
 from nonebot.adapters.onebot.v12 import Adapter as V12Adapter
 
@@ -276,3 +279,61 @@ async def test_ws_auth_query(app: App):
 
         await asyncio.sleep(1)
         assert "0" not in nonebot.get_bots()
+
+
+@pytest.mark.asyncio
+async def test_http_webhook_actions(app: App, monkeypatch: pytest.MonkeyPatch):
+    adapter = nonebot.get_adapter(V12Adapter)
+    monkeypatch.setattr(adapter.onebot_config, "onebot_webhook_response_timeout", 1)
+
+    async def handle_event(bot: Bot, event: Event):
+        if isinstance(event, MessageEvent):
+            assert await bot.send(event, "hello") == {}
+            assert await bot.send(event, "world") == {}
+
+    monkeypatch.setattr(Bot, "handle_event", handle_event)
+
+    async with app.test_server() as ctx:
+        client = ctx.get_client()
+        headers = {
+            "X-OneBot-Version": "12",
+            "X-Impl": "test",
+            "Authorization": "Bearer test2",
+        }
+        resp = await client.post(
+            "/onebot/v12/", json=PRIVATE_MESSAGE_EVENT, headers=headers
+        )
+        assert resp.status_code == 200
+        actions = resp.json()
+        assert [action["action"] for action in actions] == ["send_message"] * 2
+        assert actions[0]["params"]["user_id"] == PRIVATE_MESSAGE_EVENT["user_id"]
+        assert actions[1]["params"]["message"] == [
+            {"type": "text", "data": {"text": "world"}}
+        ]
+        assert actions[0]["self"] == PRIVATE_MESSAGE_EVENT["self"]
+
+        # responses use the encoding of the request
+        resp = await client.post(
+            "/onebot/v12/",
+            data=msgpack.packb(PRIVATE_MESSAGE_EVENT),
+            headers={**headers, "Content-Type": "application/msgpack"},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["Content-Type"] == "application/msgpack"
+        actions = msgpack.unpackb(resp.content)
+        assert [action["action"] for action in actions] == ["send_message"] * 2
+
+        # other events are not held for actions
+        notice = {
+            "id": "1",
+            "time": 1632847927.599013,
+            "type": "notice",
+            "detail_type": "friend_increase",
+            "sub_type": "",
+            "self": PRIVATE_MESSAGE_EVENT["self"],
+            "user_id": "1",
+        }
+        resp = await client.post("/onebot/v12/", json=notice, headers=headers)
+        assert resp.status_code == 204
+
+        adapter.bot_disconnect(nonebot.get_bot("0"))
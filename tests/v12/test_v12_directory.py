@@ -0,0 +1,132 @@
+import asyncio
+from typing import Any
+from datetime import datetime
+
+import pytest
+
+import nonebot
+from nonebot.adapters.onebot.v12.event import BotSelf
+from nonebot.adapters.onebot.v12.directory import Directory
+from nonebot.adapters.onebot.v12 import (
+    Bot,
+    Adapter,
+    UnsupportedAction,
+    ChannelCreateEvent,
+    ChannelDeleteEvent,
+    FriendIncreaseEvent,
+    GroupMemberDecreaseEvent,
+)
+
+RESULTS: dict[str, Any] = {
+    "get_group_list": [{"group_id": "1", "group_name": "a"}],
+    "get_group_member_list": [
+        {"user_id": "10", "user_name": "b", "user_displayname": ""},
+    ],
+    "get_guild_list": [{"guild_id": "2", "guild_name": "c"}],
+    "get_channel_list": [{"channel_id": "3", "channel_name": "d"}],
+    "get_channel_info": {"channel_id": "4", "channel_name": "e"},
+}
+
+
+def notice(detail_type: str, **data: Any) -> dict[str, Any]:
+    return {
+        "id": "0",
+        "time": datetime.now(),
+        "type": "notice",
+        "detail_type": detail_type,
+        "sub_type": "",
+        "self": BotSelf(platform="qq", user_id="0"),
+        "operator_id": "10",
+        **data,
+    }
+
+
+@pytest.mark.asyncio
+async def test_directory(monkeypatch: pytest.MonkeyPatch):
+    adapter = nonebot.get_adapter(Adapter)
+    bot = Bot(adapter, "0", "test", "qq")
+    calls: list[str] = []
+
+    async def _request_api(bot: Bot, api: str, **data: Any) -> Any:
+        calls.append(api)
+        if api not in RESULTS:
+            raise UnsupportedAction("failed", 10002, "unsupported", None)
+        return RESULTS[api]
+
+    monkeypatch.setattr(adapter, "_request_api", _request_api)
+    directory = adapter.directories["0"] = Directory(bot)
+    try:
+        # unsupported parts are skipped
+        await directory.warm()
+        assert calls == [
+            "get_group_list",
+            "get_group_member_list",
+            "get_friend_list",
+            "get_guild_list",
+            "get_channel_list",
+        ]
+
+        calls.clear()
+        assert await bot.get_group_info(group_id="1") == {
+            "group_id": "1",
+            "group_name": "a",
+        }
+        assert len(await bot.get_channel_list(guild_id="2")) == 1
+        assert calls == []
+        with pytest.raises(UnsupportedAction):
+            await bot.get_friend_list()
+        # joined_only lists are not tracked
+        await bot.get_channel_list(guild_id="2", joined_only=True)
+        assert calls == ["get_friend_list", "get_channel_list"]
+
+        directory.update(
+            ChannelCreateEvent(**notice("channel_create", guild_id="2", channel_id="4"))
+        )
+        await asyncio.gather(*directory.tasks)
+        assert len(await bot.get_channel_list(guild_id="2")) == 2
+        directory.update(
+            ChannelDeleteEvent(**notice("channel_delete", guild_id="2", channel_id="3"))
+        )
+        assert await bot.get_channel_list(guild_id="2") == [RESULTS["get_channel_info"]]
+
+        directory.update(
+            GroupMemberDecreaseEvent(
+                **notice("group_member_decrease", group_id="1", user_id="10")
+            )
+        )
+        assert await bot.get_group_member_list(group_id="1") == []
+    finally:
+        directory.close()
+        adapter.directories.pop("0", None)
+
+
+@pytest.mark.asyncio
+async def test_directory_friend_increase(monkeypatch: pytest.MonkeyPatch):
+    adapter = nonebot.get_adapter(Adapter)
+    bot = Bot(adapter, "0", "test", "qq")
+    calls: list[str] = []
+    friends = [{"user_id": "10", "user_name": "b", "user_displayname": ""}]
+
+    async def _request_api(bot: Bot, api: str, **data: Any) -> Any:
+        calls.append(api)
+        return list(friends)
+
+    monkeypatch.setattr(adapter, "_request_api", _request_api)
+    directory = adapter.directories["0"] = Directory(bot)
+    try:
+        await directory.load_friends()
+        assert len(await bot.get_friend_list()) == 1
+
+        calls.clear()
+        friends.append({"user_id": "11", "user_name": "c", "user_displayname": ""})
+        directory.update(FriendIncreaseEvent(**notice("friend_increase", user_id="11")))
+        # the stale list is not served while reloading
+        assert len(await bot.get_friend_list()) == 2
+        await asyncio.gather(*directory.tasks)
+        assert calls == ["get_friend_list", "get_friend_list"]
+        calls.clear()
+        assert len(await bot.get_friend_list()) == 2
+        assert calls == []
+    finally:
+        directory.close()
+        adapter.directories.pop("0", None)
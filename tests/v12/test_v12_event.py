@@ -1,18 +1,24 @@
 import json
+import asyncio
 from pathlib import Path
-from typing import Literal
 from datetime import datetime
+from typing import Any, Literal
 
 import pytest
 from nonebot.log import logger
 from pydantic import BaseModel
 
+import nonebot
+from nonebot.adapters.onebot.store import ResultStore
+from nonebot.adapters.onebot.utils import log_enabled
+from nonebot.adapters.onebot.v12.utils import flattened_to_nested
 from nonebot.adapters.onebot.v12 import (
     Event,
     Adapter,
     BotSelf,
     MessageEvent,
     MessageSegment,
+    NoLogException,
     PrivateMessageEvent,
 )
 
@@ -79,7 +85,7 @@ async def test_custom_model():
 
 
 @pytest.mark.asyncio
-async def test_event_log():
+async def test_event_log(monkeypatch: pytest.MonkeyPatch):
     msg = (
         MessageSegment.text("[text]")
         + MessageSegment.mention("123")
@@ -101,3 +107,110 @@ async def test_event_log():
     logger.opt(colors=True).success(
         f"{event.get_event_name()}: {event.get_event_description()}"
     )
+    assert event.get_log_string()
+
+    def _description(self) -> str:
+        raise AssertionError("description should not be rendered")
+
+    # descriptions are not rendered when the log level is disabled
+    monkeypatch.setattr(nonebot.get_driver().config, "log_level", "WARNING")
+    monkeypatch.setattr(PrivateMessageEvent, "get_event_description", _description)
+    assert not log_enabled("SUCCESS")
+    with pytest.raises(NoLogException):
+        event.get_log_string()
+
+    monkeypatch.setattr(nonebot.get_driver().config, "log_level", "INFO")
+    assert log_enabled("SUCCESS")
+    assert not log_enabled("DEBUG")
+
+
+@pytest.mark.asyncio
+async def test_event_ignored(monkeypatch: pytest.MonkeyPatch):
+    with (Path(__file__).parent / "events.json").open("r", encoding="utf8") as f:
+        test_events = json.load(f)
+
+    adapter = nonebot.get_adapter(Adapter)
+    monkeypatch.setattr(adapter.onebot_config, "onebot_ignored_events", {"meta"})
+
+    for event_data in test_events:
+        event_data.pop("_model")
+        # connect and status update events are never ignored
+        assert not adapter._is_ignored(event_data)
+
+    heartbeat = {
+        "id": "0",
+        "time": 0,
+        "type": "meta",
+        "detail_type": "heartbeat",
+        "sub_type": "",
+        "interval": 5000,
+    }
+    assert adapter._is_ignored(heartbeat)
+
+    monkeypatch.setattr(
+        adapter.onebot_config, "onebot_ignored_events", {"message.private"}
+    )
+    assert adapter._is_ignored(test_events[3])
+    assert not adapter._is_ignored({"status": "ok", "retcode": 0, "echo": "1"})
+
+
+def _legacy_flattened_to_nested(data: Any) -> Any:
+    if isinstance(data, dict):
+        result = {}
+        for key, value in data.items():
+            target = result
+            key_list = key.split(".")
+            for k in key_list[:-1]:
+                target = target.setdefault(k, {})
+            target[key_list[-1]] = _legacy_flattened_to_nested(value)
+        return result
+    elif isinstance(data, list):
+        return [_legacy_flattened_to_nested(item) for item in data]
+    return data
+
+
+@pytest.mark.asyncio
+async def test_flattened_to_nested():
+    plain = {"a": [{"b": 1}, {"c": {"d": "e.f"}}], "g": None}
+    assert flattened_to_nested(plain) is plain
+
+    data = {
+        "a": [{"b": 1}, {"c": {"e": 3}, "c.d": 2}],
+        "f.g.h": [1, {"i.j": 2}],
+        "k": {"l": {"m": 4}},
+    }
+    result = flattened_to_nested(data)
+    assert result == _legacy_flattened_to_nested(data)
+    assert result == {
+        "a": [{"b": 1}, {"c": {"d": 2, "e": 3}}],
+        "f": {"g": {"h": [1, {"i": {"j": 2}}]}},
+        "k": {"l": {"m": 4}},
+    }
+    # input is left untouched and unchanged subtrees are reused
+    assert data["a"][1]["c"] == {"e": 3}
+    assert result["a"][0] is data["a"][0]
+    assert result["k"] is data["k"]
+
+    deep: dict[str, Any] = {"x.y": 1}
+    for _ in range(5000):
+        deep = {"z": [deep]}
+    flattened_to_nested(deep)
+
+
+@pytest.mark.asyncio
+async def test_api_response_not_flattened(monkeypatch: pytest.MonkeyPatch):
+    store = ResultStore()
+    monkeypatch.setattr(Adapter, "_result_store", store)
+
+    seq = store.get_seq()
+    response = {
+        "status": "ok",
+        "retcode": 0,
+        "data": [{"user.id": "1"}],
+        "message": "",
+        "echo": str(seq),
+    }
+    task = asyncio.create_task(store.fetch(seq, 10.0))
+    await asyncio.sleep(0)
+    assert Adapter.json_to_event(response) is None
+    assert await task is response
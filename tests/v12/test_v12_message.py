@@ -1,6 +1,10 @@
+import json
+
 import pytest
+import msgpack
 
-from nonebot.adapters.onebot.v12 import MessageSegment
+from nonebot.adapters.onebot.v12 import Message, MessageSegment
+from nonebot.adapters.onebot.v12.utils import CustomEncoder, msgpack_encoder
 
 
 @pytest.mark.asyncio
@@ -9,3 +13,17 @@ async def test_message_rich_expr():
     assert a.to_rich_text() == "&#91;test&#93;,test"
     b = MessageSegment.mention("123")
     assert b.to_rich_text() == "[mention:user_id=123]"
+
+
+@pytest.mark.asyncio
+async def test_message_to_dict():
+    segment = MessageSegment.reply("1", user_id=None)
+    assert segment.to_dict() == {"type": "reply", "data": {"message_id": "1"}}
+
+    message = Message([segment, MessageSegment.text("test")])
+    expected = [
+        {"type": "reply", "data": {"message_id": "1"}},
+        {"type": "text", "data": {"text": "test"}},
+    ]
+    assert json.loads(json.dumps(message, cls=CustomEncoder)) == expected
+    assert msgpack.unpackb(msgpack.packb(message, default=msgpack_encoder)) == expected